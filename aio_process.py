@@ -0,0 +1,280 @@
+import asyncio
+import threading
+import time
+from concurrent import futures
+
+import grpc
+from google.protobuf.empty_pb2 import Empty
+
+from channel_pool import ChannelPool, SERVER_KEEPALIVE_OPTIONS
+from metrics import AsyncMetricsInterceptor
+from process import (DeadlineExceededError, FAILOVER_CODES, Process, ProcessRole, WRITE_ERRORS, WriteMode, deadline_of,
+                     error_status, logger, time_left)
+from protos import process_pb2, process_pb2_grpc
+
+
+# Event loop shared by all asyncio processes of a node, running in a background thread
+class EventLoopThread:
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+
+# Commit waiter for pipelined writes: set() is called by the Commit handler on another thread
+# and wakes up the coroutine awaiting it on the event loop
+class AsyncCommitWaiter:
+    def __init__(self, loop):
+        self.loop = loop
+        self.future = loop.create_future()
+
+    def set(self):
+        self.loop.call_soon_threadsafe(self.resolve)
+
+    def resolve(self):
+        if not self.future.done():
+            self.future.set_result(None)
+
+    def __await__(self):
+        return self.future.__await__()
+
+
+class AsyncWriteGroup:
+    def __init__(self):
+        self.writes = []
+        self.deadlines = []
+        self.full = asyncio.Event()
+        self.done = asyncio.Event()
+        self.error = None
+        self.task = None  # commits the group, started by its first writer
+
+    @property
+    def deadline(self):
+        return None if None in self.deadlines else max(self.deadlines)
+
+
+# Process served by grpc.aio. The hot-path RPCs are coroutines: the simulated delay is an asyncio.sleep and
+# downstream calls are awaited, so slow writes do not hold a thread. A cancelled call cancels the coroutine and with it
+# the call down the chain. The remaining (control) RPCs are inherited
+# from Process and run on the server's migration thread pool
+class AsyncProcess(Process):
+    def __init__(self, name, loop):
+        super().__init__(name)
+        self.loop = loop
+        self.aio_channels = ChannelPool(channel_factory=grpc.aio.insecure_channel, loop=loop)
+        self.async_write_group = None
+
+    def async_stub(self, ip):
+        return self.aio_channels.get_stub(ip, process_pb2_grpc.ProcessStub)
+
+    def channel_pools(self):
+        return [self.channels, self.aio_channels]
+
+    def rebuild_channels(self):
+        super().rebuild_channels()
+        self.aio_channels.rebuild([self.predecessor_ip, self.successor_ip, self.head_ip, self.tail_ip])
+
+    def stop_server(self, grace=0):
+        self.channels.close()
+        self.aio_channels.close()
+        self.metrics.stop_http_server()
+        if self.storage is not None:
+            self.storage.close()
+        asyncio.run_coroutine_threadsafe(self.process_server.stop(grace), self.loop)
+
+    async def Write(self, request, context):
+        logger.debug("Write is in role %s in %s", self.role, self.name)
+        deadline = deadline_of(context)
+        await self.simulate_delay_async(request.delay, deadline, context)
+        if self.role != ProcessRole.HEAD:
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, f"{self.name} is not the head")
+        try:
+            if self.group_commit_max_batch > 1 and request.id not in self.applied_ids:
+                return await self.group_write_async(request, deadline)
+            batch = process_pb2.WriteBatchRequest(writes=[request], delay=request.delay)
+            if self.write_mode == WriteMode.PIPELINED:
+                return await self.pipelined_write_async(batch, deadline=deadline)
+            return await self.sync_write_async(batch, deadline=deadline)
+        except WRITE_ERRORS as e:
+            await context.abort(*error_status(e))
+
+    async def WriteBatch(self, request, context):
+        deadline = deadline_of(context)
+        await self.simulate_delay_async(request.delay, deadline, context)
+        if not self.accepts_batch(request):
+            await context.abort(grpc.StatusCode.FAILED_PRECONDITION, f"{self.name} is not the head")
+        try:
+            if self.write_mode == WriteMode.PIPELINED:
+                return await self.pipelined_write_async(request, deadline=deadline)
+            return await self.sync_write_async(request, deadline=deadline)
+        except WRITE_ERRORS as e:
+            await context.abort(*error_status(e))
+
+    async def simulate_delay_async(self, delay, deadline, context):
+        if delay:
+            await asyncio.sleep(min(delay, time_left(deadline)) if deadline is not None else delay)
+        if deadline is not None and time.monotonic() >= deadline:
+            await context.abort(grpc.StatusCode.DEADLINE_EXCEEDED,
+                                f"Deadline exceeded before the write reached {self.name}")
+
+    async def sync_write_async(self, batch, client_writes=None, deadline=None):
+        is_tail = self.role == ProcessRole.TAIL
+        with self.write_lock:
+            batch.writes.extend(self.apply_batch(batch, is_tail, client_writes))
+            if not batch.writes:
+                return Empty()
+            if not is_tail:
+                self.forwarding += 1
+        if not is_tail:
+            start = time.perf_counter()
+            forwarded = False
+            try:
+                await self.forward_batch_async(batch, deadline)
+                forwarded = True
+            finally:
+                with self.write_lock:
+                    self.forwarding -= 1
+                    if forwarded:
+                        self.mark_clean(batch)
+                    else:
+                        self.unforwarded.put((batch, 0))
+            self.metrics.observe("replication_seconds", time.perf_counter() - start)
+        return Empty()
+
+    # Same as Process.forward_batch: re-sends the batch once a failed successor has been spliced out
+    async def forward_batch_async(self, batch, deadline=None):
+        failover_deadline = time.monotonic() + self.failover_wait
+        if deadline is not None:
+            failover_deadline = min(failover_deadline, deadline)
+        while True:
+            successor_ip = self.successor_ip
+            try:
+                await self.async_stub(successor_ip).WriteBatch(batch, timeout=time_left(deadline))
+                return
+            except grpc.RpcError as e:
+                # A write cancelled by its client cancels this coroutine instead
+                if e.code() not in FAILOVER_CODES:
+                    raise
+                error = e
+            while self.successor_ip == successor_ip and self.role != ProcessRole.TAIL:
+                if time.monotonic() > failover_deadline:
+                    raise error
+                await asyncio.sleep(0.05)
+            if self.role == ProcessRole.TAIL:
+                return
+
+    async def pipelined_write_async(self, batch, client_writes=None, deadline=None):
+        committed = AsyncCommitWaiter(self.loop)
+        if self.apply_pipelined(batch, committed, client_writes):
+            try:
+                await asyncio.wait_for(committed.future, time_left(deadline))
+            except asyncio.TimeoutError:
+                raise DeadlineExceededError("The write was not committed before the deadline, it stays in the pipeline")
+        return Empty()
+
+    # Same protocol as Process.group_write, but the group lives on the event loop and needs no locking. The group is
+    # committed by a task of its own rather than by the call of its first writer: cancelling that call (deadline,
+    # client gone) must neither leave the group open nor keep the other writers waiting
+    async def group_write_async(self, request, deadline=None):
+        group = self.async_write_group
+        if group is None:
+            group = self.async_write_group = AsyncWriteGroup()
+            group.task = asyncio.create_task(self.commit_group_async(group))
+        group.writes.append(request)
+        group.deadlines.append(deadline)
+        if len(group.writes) >= self.group_commit_max_batch:
+            group.full.set()
+        try:
+            if len(group.writes) == 1:
+                await asyncio.wait_for(asyncio.shield(group.task), time_left(deadline))
+            else:
+                await asyncio.wait_for(group.done.wait(), time_left(deadline))
+        except asyncio.TimeoutError:
+            raise DeadlineExceededError("The write group was not committed before the deadline")
+        if group.error is not None:
+            raise group.error
+        return Empty()
+
+    async def commit_group_async(self, group):
+        try:
+            try:
+                await asyncio.wait_for(group.full.wait(), self.group_commit_max_wait)
+            except asyncio.TimeoutError:
+                pass
+            self.async_write_group = None
+            batch = self.coalesce(group.writes)
+            if self.write_mode == WriteMode.PIPELINED:
+                await self.pipelined_write_async(batch, group.writes, group.deadline)
+            else:
+                await self.sync_write_async(batch, group.writes, group.deadline)
+        except asyncio.CancelledError as e:
+            group.error = e  # the server is stopping
+            raise
+        except Exception as e:
+            group.error = e
+        finally:
+            if self.async_write_group is group:
+                self.async_write_group = None
+            group.done.set()
+
+    async def Read(self, request, context):
+        record = self.db.get(request.key)
+        if record is None:
+            return process_pb2.ReadResponse(value=float(0.1), success=False)
+        if not record.pending:
+            return process_pb2.ReadResponse(value=record.value, success=True)
+        committed_version = record.committed_version
+        response = self.cached_read(request.key, committed_version)
+        if response is None:
+            stub = self.async_stub(self.tail_ip)
+            response = self.read_committed_version(record, await stub.VersionQuery(request))
+            if response is None:
+                response = await stub.Read(request)
+            self.cache_read(request.key, response, committed_version)
+        return response
+
+    async def ListBooks(self, request, context):
+        book_lists, dirty_keys = self.local_books(list(self.db))
+        cached, dirty_keys, versions = self.cached_books(dirty_keys)
+        book_lists.update(cached)
+        if dirty_keys:
+            committed = await self.async_stub(self.tail_ip).BulkRead(process_pb2.BulkReadRequest(keys=dirty_keys))
+            book_lists.update(committed.books)
+            self.cache_books(committed.books, versions)
+        return process_pb2.BookList(books=book_lists)
+
+    async def ListBooksStream(self, request, context):
+        page_size = request.page_size or 100
+        cursor = request.cursor
+        remaining = request.limit or float("inf")
+        while remaining > 0:
+            keys = self.key_index.page(cursor, request.prefix, min(page_size, remaining))
+            if not keys:
+                return
+            books, dirty_keys = self.local_books(keys)
+            cached, dirty_keys, versions = self.cached_books(dirty_keys)
+            books.update(cached)
+            if dirty_keys:
+                committed = await self.async_stub(self.tail_ip).BulkRead(process_pb2.BulkReadRequest(keys=dirty_keys))
+                books.update(committed.books)
+                self.cache_books(committed.books, versions)
+            cursor = keys[-1]
+            remaining -= len(keys)
+            yield self.book_page(keys, books)
+
+
+# Starts an asyncio process server on the event loop. Synchronous handlers run on a thread pool of max_workers
+def start_async_server(process, port, event_loop_thread, max_workers):
+    async def start():
+        server = grpc.aio.server(migration_thread_pool=futures.ThreadPoolExecutor(max_workers=max_workers),
+                                 interceptors=[AsyncMetricsInterceptor(process.metrics)],
+                                 options=SERVER_KEEPALIVE_OPTIONS)
+        process_pb2_grpc.add_ProcessServicer_to_server(process, server)
+        server.add_insecure_port(f"[::]:{port}")
+        await server.start()
+        return server
+
+    return event_loop_thread.run(start())
@@ -0,0 +1,200 @@
+# Throughput and latency of a whole deployment: a control panel and a node with chain length * NUM_CHAINS
+# processes on localhost, preloaded with the books and driven through client.Client by concurrent clients
+# running a mix of reads, writes and ListBooks pages on uniform or Zipf-distributed book names.
+# Every combination of chain length, number of books and concurrency runs on a fresh deployment, and the results
+# are written to a JSON file to compare the hot paths across commits. The .env settings (WRITE_MODE, group commit,
+# NUM_CHAINS, ...) apply as usual
+#
+# Usage: python -m benchmarks.cluster [--chain-lengths 2,3,5] [--keys 1000,100000] [--concurrency 1,8,32]
+#                                     [--mix read=90,write=10,list=0] [--distribution uniform|zipf] [--zipf-s 1.1]
+#                                     [--duration 10] [--engine thread|aio] [--multiprocess] [--output file]
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import time
+from collections import defaultdict
+from concurrent import futures
+
+import grpc
+
+from client import Client
+from control_panel import ControlPanel
+from node import Node
+from protos import control_panel_pb2_grpc, process_pb2
+
+OPERATIONS = ("read", "write", "list")
+LIST_PAGE_SIZE = 100  # a list operation reads the first page of the listing
+PRELOAD_BATCH_SIZE = 1000
+
+
+# Picks book names: uniformly, or by a Zipf distribution where the book of rank r is picked with weight 1 / r^s
+class KeyChooser:
+    def __init__(self, n_keys, distribution, zipf_s):
+        self.keys = [f"book {i}" for i in range(n_keys)]
+        self.cum_weights = None
+        if distribution == "zipf":
+            self.cum_weights = list(itertools.accumulate(1 / rank ** zipf_s for rank in range(1, n_keys + 1)))
+
+    def choose(self, rng):
+        if self.cum_weights is None:
+            return self.keys[rng.randrange(len(self.keys))]
+        return rng.choices(self.keys, cum_weights=self.cum_weights)[0]
+
+
+def parse_mix(mix):
+    weights = dict.fromkeys(OPERATIONS, 0)
+    for item in mix.split(","):
+        operation, weight = item.split("=")
+        if operation not in weights:
+            raise ValueError(f"Unknown operation {operation}, expected one of {', '.join(OPERATIONS)}")
+        weights[operation] = float(weight)
+    return weights
+
+
+def start_deployment(base_port, n_processes, engine, multiprocess):
+    control_panel_ip = f"127.0.0.1:{base_port}"
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=32))
+    control_panel_pb2_grpc.add_ControlPanelServicer_to_server(ControlPanel(), server)
+    server.add_insecure_port(control_panel_ip)
+    server.start()
+    node = Node("Bench", f"127.0.0.1:{base_port + 10}", control_panel_ip, engine, multiprocess)
+    node.handle_input(f"Local-store-ps {n_processes}")
+    node.handle_input("Create-chain")
+    return server, node
+
+
+# One client: runs operations until the deadline and returns their latencies by operation and the failures
+def client_loop(control_panel_ip, chooser, mix, deadline, seed):
+    rng = random.Random(seed)
+    operations, cum_weights = list(mix), list(itertools.accumulate(mix.values()))
+    latencies = defaultdict(list)
+    errors = 0
+    client = Client(control_panel_ip, watch=False)
+    while time.perf_counter() < deadline:
+        operation = rng.choices(operations, cum_weights=cum_weights)[0]
+        key = chooser.choose(rng)
+        start = time.perf_counter()
+        try:
+            if operation == "read":
+                client.read(key)
+            elif operation == "write":
+                client.write(key, rng.random() * 100)
+            else:
+                list(client.list_books(prefix="", page_size=LIST_PAGE_SIZE, limit=LIST_PAGE_SIZE))
+        except grpc.RpcError:
+            errors += 1
+            continue
+        latencies[operation].append(time.perf_counter() - start)
+    client.close()
+    return latencies, errors
+
+
+def percentiles(latencies):
+    if len(latencies) < 2:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    cuts = statistics.quantiles(latencies, n=100)
+    return {"p50_ms": cuts[49] * 1000, "p95_ms": cuts[94] * 1000, "p99_ms": cuts[98] * 1000}
+
+
+def run(base_port, chain_length, n_keys, concurrency, mix, args):
+    n_processes = chain_length * int(os.environ.get("NUM_CHAINS", 1))
+    server, node = start_deployment(base_port, n_processes, args.engine, args.multiprocess)
+    control_panel_ip = f"127.0.0.1:{base_port}"
+    chooser = KeyChooser(n_keys, args.distribution, args.zipf_s)
+    client = Client(control_panel_ip, watch=False)
+    client.write_batch([process_pb2.WriteRequest(key=key, value=1.0) for key in chooser.keys], PRELOAD_BATCH_SIZE)
+    client.close()
+
+    deadline = time.perf_counter() + args.duration
+    with futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(lambda i: client_loop(control_panel_ip, chooser, mix, deadline, args.seed + i),
+                                 range(concurrency)))
+    node.handle_input("Clear")
+    server.stop(0)
+
+    latencies = defaultdict(list)
+    for client_latencies, _ in outcomes:
+        for operation, values in client_latencies.items():
+            latencies[operation] += values
+    total = sum(len(values) for values in latencies.values())
+    return {
+        "chain_length": chain_length,
+        "processes": n_processes,
+        "keys": n_keys,
+        "concurrency": concurrency,
+        "throughput": total / args.duration,
+        "errors": sum(errors for _, errors in outcomes),
+        "operations": {operation: {"count": len(values), **percentiles(values)}
+                       for operation, values in latencies.items()},
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result):
+    operations = " ".join(f"{operation} p50/p95/p99 {stats['p50_ms'] or 0:.2f}/{stats['p95_ms'] or 0:.2f}/"
+                          f"{stats['p99_ms'] or 0:.2f} ms" for operation, stats in sorted(result["operations"].items()))
+    print(f"{result['chain_length']:>6} {result['keys']:>8} {result['concurrency']:>6} {result['throughput']:>10.1f} "
+          f"{result['errors']:>6}  {operations}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chain-lengths", default="2,3,5")
+    parser.add_argument("--keys", default="1000,100000")
+    parser.add_argument("--concurrency", default="1,8,32")
+    parser.add_argument("--mix", default="read=90,write=10,list=0")
+    parser.add_argument("--distribution", choices=["uniform", "zipf"], default="uniform")
+    parser.add_argument("--zipf-s", type=float, default=1.1)
+    parser.add_argument("--duration", type=float, default=10, help="seconds of load per combination")
+    parser.add_argument("--engine", choices=["thread", "aio"], default="thread")
+    parser.add_argument("--multiprocess", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--base-port", type=int, default=51000)
+    parser.add_argument("--output", default="benchmark_results.json")
+    args = parser.parse_args()
+    mix = parse_mix(args.mix)
+    combinations = list(itertools.product([int(length) for length in args.chain_lengths.split(",")],
+                                          [int(keys) for keys in args.keys.split(",")],
+                                          [int(concurrency) for concurrency in args.concurrency.split(",")]))
+
+    print(f"{args.mix} on {args.distribution} keys, {args.duration}s per run, {args.engine} engine, "
+          f"{os.environ.get('WRITE_MODE', 'sync')} writes")
+    print(f"{'chain':>6} {'keys':>8} {'conc':>6} {'ops/s':>10} {'errors':>6}  latency")
+    results = []
+    for i, (chain_length, n_keys, concurrency) in enumerate(combinations):
+        # Every run gets fresh ports, the previous deployment may still hold its own for a moment
+        base_port = args.base_port + 100 * i
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = run(base_port, chain_length, n_keys, concurrency, mix, args)
+        print_result(result)
+        results.append(result)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "settings": {**vars(args), "mix": mix},
+        "environment": {name: os.environ[name] for name in ("WRITE_MODE", "NUM_CHAINS", "PROCESS_MAX_WORKERS",
+                                                              "GROUP_COMMIT_MAX_BATCH", "GROUP_COMMIT_MAX_WAIT_MS",
+                                                              "DATA_DIR", "FSYNC_POLICY") if name in os.environ},
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
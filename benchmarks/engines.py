@@ -0,0 +1,84 @@
+# Thread-pool vs asyncio process servers: concurrent slow writes (delay seconds per hop) sent to the head of a
+# 3-process chain while a reader keeps reading from the head, reporting write throughput and read latency
+#
+# Usage: python -m benchmarks.engines [concurrent writers] [write delay]
+import contextlib
+import io
+import statistics
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+from aio_process import AsyncProcess, EventLoopThread, start_async_server
+from channel_pool import SERVER_KEEPALIVE_OPTIONS
+from process import Process, ProcessRole
+from protos import process_pb2, process_pb2_grpc
+
+MAX_WORKERS = 2  # the default thread pool size of a process in sync mode
+
+
+def start_chain(engine, base_port, length=3):
+    event_loop_thread = EventLoopThread() if engine == "aio" else None
+    ips = [f"127.0.0.1:{base_port + i}" for i in range(length)]
+    processes = []
+    for i, ip in enumerate(ips):
+        name = f"{engine}-ps{i}"
+        if engine == "aio":
+            process = AsyncProcess(name, event_loop_thread.loop)
+            server = start_async_server(process, base_port + i, event_loop_thread, MAX_WORKERS)
+        else:
+            process = Process(name)
+            server = grpc.server(futures.ThreadPoolExecutor(max_workers=MAX_WORKERS), options=SERVER_KEEPALIVE_OPTIONS)
+            process_pb2_grpc.add_ProcessServicer_to_server(process, server)
+            server.add_insecure_port(f"[::]:{base_port + i}")
+            server.start()
+        process.ip = ip
+        process.process_server = server
+        role = ProcessRole.HEAD if i == 0 else ProcessRole.TAIL if i == length - 1 else ProcessRole.NONE
+        process.initialize(None, ips[i - 1] if i > 0 else "", ips[i + 1] if i < length - 1 else "",
+                           ips[0] if i > 0 else "", ips[-1] if i < length - 1 else "", role.value)
+        processes.append(process)
+    return processes
+
+
+def run(engine, base_port, writers, delay):
+    processes = start_chain(engine, base_port)
+    stub = process_pb2_grpc.ProcessStub(grpc.insecure_channel(processes[0].ip))
+    stub.Write(process_pb2.WriteRequest(key="warm-up", value=1.0))
+    read_latencies = []
+    writing = threading.Event()
+    writing.set()
+
+    def read_loop():
+        while writing.is_set():
+            start = time.perf_counter()
+            stub.Read(process_pb2.ReadRequest(key="warm-up"))
+            read_latencies.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    reader = threading.Thread(target=read_loop)
+    start = time.perf_counter()
+    reader.start()
+    with futures.ThreadPoolExecutor(max_workers=writers) as pool:
+        list(pool.map(lambda i: stub.Write(process_pb2.WriteRequest(key=f"book {i}", value=float(i), delay=delay)),
+                      range(writers)))
+    elapsed = time.perf_counter() - start
+    writing.clear()
+    reader.join()
+    for process in processes:
+        process.stop_server()
+    return writers / elapsed, statistics.median(read_latencies), max(read_latencies)
+
+
+if __name__ == '__main__':
+    writers = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    delay = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    print(f"{writers} concurrent writes, {delay}s delay per hop, {MAX_WORKERS} workers per process")
+    print(f"{'engine':>8} {'writes/s':>10} {'read p50 (ms)':>14} {'read max (ms)':>14}")
+    for i, engine in enumerate(["thread", "aio"]):
+        with contextlib.redirect_stdout(io.StringIO()):
+            throughput, p50, worst = run(engine, 50200 + 10 * i, writers, delay)
+        print(f"{engine:>8} {throughput:>10.1f} {p50 * 1000:>14.1f} {worst * 1000:>14.1f}")
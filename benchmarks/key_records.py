@@ -0,0 +1,53 @@
+# Memory and read-path latency of the per-key KeyRecord against the old dict of (value, 'clean'/'dirty') tuples
+# A clean KeyRecord holds its committed state in its latest value and version, so it costs what a tuple did plus the
+# version of the book, an int the tuples did not have
+#
+# Usage: python -m benchmarks.key_records [number of keys]
+import sys
+import timeit
+import tracemalloc
+
+from store import KeyRecord
+
+
+def build_tuples(n):
+    return {f"book {i}": (float(i), 'clean') for i in range(n)}
+
+
+def build_records(n):
+    db = {}
+    for i in range(n):
+        record = db[f"book {i}"] = KeyRecord()
+        record.write_committed(float(i), i + 1)
+    return db
+
+
+def measure_memory(build, n):
+    tracemalloc.start()
+    db = build(n)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return db, size
+
+
+def read_tuple(db, key):
+    entry = db[key]
+    if entry[1] == 'clean':
+        return entry[0]
+
+
+def read_record(db, key):
+    record = db[key]
+    if not record.pending:
+        return record.value
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    key = f"book {n // 2}"
+    for name, build, read in [("dict of tuples", build_tuples, read_tuple),
+                              ("dict of KeyRecord", build_records, read_record)]:
+        db, size = measure_memory(build, n)
+        reads = 1000000
+        seconds = timeit.timeit(lambda: read(db, key), number=reads)
+        print(f"{name:>18}: {size / n:6.1f} bytes/key, {seconds / reads * 1e9:6.1f} ns/read")
@@ -0,0 +1,79 @@
+# ListBooks latency on a non-tail replica against the number of dirty keys it holds, comparing one Read per
+# dirty key at the tail (the previous implementation) with a single BulkRead round trip.
+# The per-key loop runs inside the benchmark, so its column does not include shipping the BookList to a client
+#
+# Usage: python -m benchmarks.list_books [total number of keys]
+import sys
+import time
+from concurrent import futures
+
+import grpc
+from google.protobuf.empty_pb2 import Empty
+
+from process import Process, ProcessRole
+from protos import process_pb2, process_pb2_grpc
+from store import new_store
+
+
+def start_process(name, port):
+    process = Process(name)
+    process.ip = f"127.0.0.1:{port}"
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    process_pb2_grpc.add_ProcessServicer_to_server(process, server)
+    server.add_insecure_port(f"[::]:{port}")
+    server.start()
+    process.process_server = server
+    return process
+
+
+# The replica holds every key, the first n_dirty of them with a write the tail has not acknowledged yet
+def fill(replica, tail, n_keys, n_dirty):
+    replica.db, tail.db = new_store(), new_store()
+    batch = process_pb2.WriteBatchRequest(writes=[
+        process_pb2.WriteRequest(key=f"book {i}", value=float(i), seq=i + 1) for i in range(n_keys)
+    ])
+    tail.apply_batch(batch, True)
+    replica.apply_batch(batch, True)
+    dirty = process_pb2.WriteBatchRequest(writes=[
+        process_pb2.WriteRequest(key=f"book {i}", value=float(i) + 0.5, seq=n_keys + i + 1) for i in range(n_dirty)
+    ])
+    replica.apply_batch(dirty, False)
+
+
+def list_books_per_key(replica, tail_stub):
+    books = {}
+    for key, record in replica.db.items():
+        if not record.pending:
+            books[key] = record.value
+        else:
+            books[key] = tail_stub.Read(process_pb2.ReadRequest(key=key)).value
+    return books
+
+
+def timed(function, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+if __name__ == '__main__':
+    n_keys = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    tail = start_process("bench-tail", 50191)
+    replica = start_process("bench-replica", 50192)
+    tail.initialize(None, "127.0.0.1:50192", "", "127.0.0.1:50192", "", ProcessRole.TAIL.value)
+    replica.initialize(None, "", "127.0.0.1:50191", "", "127.0.0.1:50191", ProcessRole.NONE.value)
+    replica_stub = process_pb2_grpc.ProcessStub(grpc.insecure_channel(replica.ip))
+    tail_stub = process_pb2_grpc.ProcessStub(grpc.insecure_channel(tail.ip))
+
+    print(f"{'dirty keys':>10} {'Read per key (ms)':>18} {'BulkRead (ms)':>14}")
+    for n_dirty in [0, 10, 100, 1000, n_keys]:
+        fill(replica, tail, n_keys, min(n_dirty, n_keys))
+        per_key = timed(lambda: list_books_per_key(replica, tail_stub))
+        bulk = timed(lambda: replica_stub.ListBooks(Empty()))
+        print(f"{n_dirty:>10} {per_key * 1000:>18.1f} {bulk * 1000:>14.1f}")
+
+    tail.process_server.stop(0)
+    replica.process_server.stop(0)
@@ -0,0 +1,48 @@
+# Memory per book of the dict of KeyRecord against the compact array-backed store, and the time to export a snapshot
+# of every book as columns (as Reconcile does) and to load it into an empty store (as CatchUp does)
+#
+# Usage: python -m benchmarks.stores [number of books]
+import sys
+import time
+import tracemalloc
+
+from store import CompactStore, DictStore
+
+
+def build(store_class, keys):
+    store = store_class()
+    for i, key in enumerate(keys):
+        store.create(key).write_committed(float(i), i + 1)
+    return store
+
+
+def measure_memory(store_class, n):
+    # The names are built before tracing: both stores keep the same string objects, the compact one interned
+    keys = [sys.intern(f"book {i}") for i in range(n)]
+    tracemalloc.start()
+    store = build(store_class, keys)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, keys, size
+
+
+def timed(function, repeat=3):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    names_size = sum(sys.getsizeof(f"book {i}") for i in range(n))
+    print(f"{n} books, names alone {names_size / n:.1f} bytes/book")
+    print(f"{'store':>10} {'bytes/book':>11} {'(+ names)':>10} {'export (ms)':>12} {'import (ms)':>12}")
+    for name, store_class in [("dict", DictStore), ("compact", CompactStore)]:
+        store, keys, size = measure_memory(store_class, n)
+        export, columns = timed(lambda: store.columns(keys))
+        load, _ = timed(lambda: store_class().load_columns(*columns))
+        print(f"{name:>10} {size / n:>11.1f} {(size + names_size) / n:>10.1f} {export * 1000:>12.1f} "
+              f"{load * 1000:>12.1f}")
@@ -0,0 +1,57 @@
+# Write throughput of a process with the write-ahead log under every fsync policy, against no log at all,
+# and the time it takes to recover the state from the snapshot and the log on restart
+#
+# Usage: python -m benchmarks.wal [number of writes] [writes per batch]
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from persistence import FsyncPolicy
+from process import Process, ProcessRole
+from protos import process_pb2
+
+
+def start_process(data_dir, fsync_policy):
+    if data_dir is None:
+        os.environ.pop("DATA_DIR", None)
+    else:
+        os.environ.update(DATA_DIR=data_dir, FSYNC_POLICY=fsync_policy.value)
+    process = Process("ps0")
+    process.role = ProcessRole.TAIL
+    return process
+
+
+def write(process, n_writes, batch_size):
+    start = time.perf_counter()
+    for first in range(0, n_writes, batch_size):
+        batch = process_pb2.WriteBatchRequest(writes=[
+            process_pb2.WriteRequest(key=f"book {seq % 10000}", value=float(seq), seq=seq + 1)
+            for seq in range(first, min(first + batch_size, n_writes))
+        ])
+        with process.write_lock:
+            process.apply_batch(batch, True)
+    return time.perf_counter() - start
+
+
+if __name__ == '__main__':
+    n_writes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    batch_size = int(sys.argv[2]) if len(sys.argv) > 2 else 1
+    seconds = write(start_process(None, None), n_writes, batch_size)
+    print(f"{'no log':>7}: {n_writes / seconds:9.0f} writes/s")
+    for fsync_policy in FsyncPolicy:
+        data_dir = tempfile.mkdtemp()
+        try:
+            process = start_process(data_dir, fsync_policy)
+            seconds = write(process, n_writes, batch_size)
+            process.storage.close()
+            start = time.perf_counter()
+            recovered = start_process(data_dir, fsync_policy)
+            recovery = time.perf_counter() - start
+            recovered.storage.close()
+            assert recovered.last_seq == n_writes
+            print(f"{fsync_policy.value:>7}: {n_writes / seconds:9.0f} writes/s, "
+                  f"recovery of {len(recovered.db)} keys in {recovery * 1000:.1f} ms")
+        finally:
+            shutil.rmtree(data_dir)
@@ -0,0 +1,103 @@
+# Streaming import and export of the catalog, run by `python node.py import|export <file>`.
+# Import reads the rows of a CSV or JSONL file lazily and sends them to the heads in batches, with a bounded number
+# of batches on their way, so memory stays constant whatever the size of the file. Export writes a snapshot
+# streamed from the tails to a file as it arrives
+import csv
+import json
+import struct
+import threading
+import uuid
+from concurrent import futures
+from enum import Enum
+from itertools import islice
+
+from protos import process_pb2
+
+FLOAT32 = struct.Struct("<f")
+
+
+class FileFormat(Enum):
+    CSV = 'csv'  # "book name,price" rows, optionally after a header row
+    JSONL = 'jsonl'  # one {"name": ..., "price": ...} object per line
+
+
+# The format given, or the one of the file extension
+def file_format(path, format=None):
+    if format:
+        return FileFormat(format)
+    return FileFormat.JSONL if path.endswith((".jsonl", ".ndjson")) else FileFormat.CSV
+
+
+# Yields the (name, price) of the books of the file. A first CSV row without a numeric price is a header
+def read_books(f, format):
+    if format == FileFormat.JSONL:
+        for line in f:
+            if line.strip():
+                book = json.loads(line)
+                yield book["name"], float(book["price"])
+        return
+    rows = csv.reader(f)
+    for row in rows:
+        if row and row[0].strip():
+            try:
+                yield row[0].strip(), float(row[1])
+            except ValueError:
+                pass  # header
+            break
+    for row in rows:
+        if row and row[0].strip():
+            yield row[0].strip(), float(row[1])
+
+
+# Sends the books to the heads of their chains in batches of batch_size, at most max_in_flight batches at a time:
+# reading the file waits while they are all in flight. Every write gets an id, so the batches retried by the client
+# are applied once. Books repeated in the file keep the last price only with max_in_flight=1, concurrent batches
+# may reach a head in any order. Returns the number of books written
+def import_books(client, books, batch_size=1000, max_in_flight=4):
+    prefix = uuid.uuid4().hex
+    slots = threading.BoundedSemaphore(max_in_flight)
+    errors = []
+    count = 0
+
+    def done(future):
+        if future.exception() is not None:
+            errors.append(future.exception())
+        slots.release()
+
+    with futures.ThreadPoolExecutor(max_workers=max_in_flight) as pool:
+        for batch in iter(lambda: list(islice(books, batch_size)), []):
+            slots.acquire()
+            if errors:
+                break
+            writes = [process_pb2.WriteRequest(key=name, value=price, id=f"{prefix}-{count + i}")
+                      for i, (name, price) in enumerate(batch)]
+            count += len(writes)
+            pool.submit(client.write_batch, writes, batch_size).add_done_callback(done)
+    if errors:
+        raise errors[0]
+    return count
+
+
+# Shortest decimal that reads back as the same float32 price, e.g. 12.3 rather than 12.300000190734863
+def format_price(price):
+    for digits in (6, 7, 8):
+        text = f"{price:.{digits}g}"
+        if FLOAT32.unpack(FLOAT32.pack(float(text)))[0] == price:
+            return text
+    return f"{price:.9g}"
+
+
+# Writes the books exported by the client to the file, page by page. Returns the number of books written
+def export_books(client, f, format, page_size=10000):
+    books = client.export_books(page_size)
+    count = 0
+    if format == FileFormat.CSV:
+        writer = csv.writer(f)
+        writer.writerow(["name", "price"])
+    for page in iter(lambda: list(islice(books, page_size)), []):
+        if format == FileFormat.CSV:
+            writer.writerows((name, format_price(price)) for name, price in page)
+        else:
+            f.writelines(f'{{"name": {json.dumps(name)}, "price": {format_price(price)}}}\n' for name, price in page)
+        count += len(page)
+    return count
@@ -0,0 +1,150 @@
+import asyncio
+import threading
+
+import grpc
+
+
+# Keepalive pings let idle channels between chain neighbours stay warm and detect dead peers
+# without waiting for the next write to fail
+KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_time_ms", 10000),
+    ("grpc.keepalive_timeout_ms", 5000),
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+# Servers have to accept the keepalive pings above, otherwise they answer with GOAWAY "too_many_pings"
+SERVER_KEEPALIVE_OPTIONS = [
+    ("grpc.keepalive_permit_without_calls", 1),
+    ("grpc.http2.min_recv_ping_interval_without_data_ms", 5000),
+    ("grpc.http2.max_ping_strikes", 0),
+]
+
+
+# Keeps one long-lived channel per peer address and hands out cached stubs for it,
+# so a chain hop does not pay a TCP + HTTP/2 handshake on every request.
+# A channel that was connected and whose peer has since failed is dropped before it is handed out again: a new
+# channel connects at once to a peer restarted on the same address, where the failed one would wait for its
+# reconnect backoff. A new channel that has not connected yet is kept, so calls to a peer that stays down keep
+# failing fast with UNAVAILABLE instead of running into their deadline while every new channel connects.
+# With channel_factory=grpc.aio.insecure_channel it pools asyncio channels living on the given event loop
+class ChannelPool:
+    def __init__(self, options=None, channel_factory=grpc.insecure_channel, loop=None):
+        self.options = KEEPALIVE_OPTIONS if options is None else options
+        self.channel_factory = channel_factory
+        self.loop = loop
+        self.channels = {}  # ip -> grpc.Channel
+        self.stubs = {}  # (ip, stub class) -> stub
+        self.states = {}  # ip -> last connectivity state reported by the channel
+        self.connected = set()  # ips whose current channel has been ready
+        self.created = 0
+        self.reused = 0
+        self.evicted = 0
+        self.lock = threading.Lock()
+
+    def get_stub(self, ip, stub_class):
+        failed = None
+        with self.lock:
+            channel = self.channels.get(ip)
+            if channel is not None and self.failed(ip):
+                failed = self.drop(ip)
+                self.evicted += 1
+                channel = None
+            stub = self.stubs.get((ip, stub_class))
+            if stub is not None:
+                self.reused += 1
+            else:
+                if channel is None:
+                    channel = self.channel_factory(ip, options=self.options)
+                    self.channels[ip] = channel
+                    self.watch(ip, channel)
+                    self.created += 1
+                else:
+                    self.reused += 1
+                stub = self.stubs[(ip, stub_class)] = stub_class(channel)
+        if failed is not None:
+            self.close_channel(failed)
+        return stub
+
+    # Whether the channel has been closed, or was ready and has lost its peer since. Must hold lock
+    def failed(self, ip):
+        state = self.states.get(ip)
+        return state == grpc.ChannelConnectivity.SHUTDOWN or (
+            state == grpc.ChannelConnectivity.TRANSIENT_FAILURE and ip in self.connected
+        )
+
+    # Follows the connectivity state of the channel: synchronous channels report it through a subscription,
+    # asyncio ones to a task waiting for its changes on the event loop
+    def watch(self, ip, channel):
+        if isinstance(channel, grpc.aio.Channel):
+            asyncio.run_coroutine_threadsafe(self.watch_async(ip, channel), self.loop)
+        else:
+            channel.subscribe(lambda state: self.update(ip, channel, state))
+
+    async def watch_async(self, ip, channel):
+        state = channel.get_state(try_to_connect=False)
+        while self.update(ip, channel, state):
+            try:
+                await channel.wait_for_state_change(state)
+            except Exception:
+                return
+            state = channel.get_state(try_to_connect=False)
+
+    # Records the state of the channel to ip and returns whether it is still the pooled one
+    def update(self, ip, channel, state):
+        with self.lock:
+            if self.channels.get(ip) is not channel:
+                return False
+            self.states[ip] = state
+            if state == grpc.ChannelConnectivity.READY:
+                self.connected.add(ip)
+            return state != grpc.ChannelConnectivity.SHUTDOWN
+
+    # Removes the channel to ip and its stubs and returns it, to be closed outside of the lock. Must hold lock
+    def drop(self, ip):
+        self.states.pop(ip, None)
+        self.connected.discard(ip)
+        for key in [key for key in self.stubs if key[0] == ip]:
+            del self.stubs[key]
+        return self.channels.pop(ip, None)
+
+    # Drops the channel to ip (e.g. after the peer has been restarted)
+    def invalidate(self, ip):
+        with self.lock:
+            channel = self.drop(ip)
+        if channel is not None:
+            self.close_channel(channel)
+
+    # Called when the topology changes: closes channels to peers that are no longer neighbours
+    def rebuild(self, peers):
+        peers = {ip for ip in peers if ip}
+        with self.lock:
+            stale = [ip for ip in self.channels if ip not in peers]
+        for ip in stale:
+            self.invalidate(ip)
+
+    def close(self):
+        with self.lock:
+            channels = list(self.channels.values())
+            self.channels = {}
+            self.stubs = {}
+            self.states = {}
+            self.connected = set()
+        for channel in channels:
+            self.close_channel(channel)
+
+    def close_channel(self, channel):
+        closing = channel.close()
+        if asyncio.iscoroutine(closing):  # asyncio channels are closed on their event loop
+            asyncio.run_coroutine_threadsafe(closing, self.loop)
+
+    def stats(self):
+        with self.lock:
+            return {"created": self.created, "reused": self.reused, "evicted": self.evicted, "open": len(self.channels)}
+
+
+# Adds to the metrics the channels created, the stubs served from an existing channel, the channels dropped after
+# their peer failed and the channels open, summed over the pools returned by pools()
+def add_channel_gauges(metrics, pools):
+    for name in ("created", "reused", "evicted", "open"):
+        metrics.gauge(f"channels_{name}", lambda name=name: sum(pool.stats()[name] for pool in pools()))
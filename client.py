@@ -0,0 +1,241 @@
+import heapq
+import itertools
+import os
+import threading
+import time
+import uuid
+from collections import defaultdict
+from enum import Enum
+
+import grpc
+from dotenv import load_dotenv
+from google.protobuf.empty_pb2 import Empty
+
+from channel_pool import ChannelPool
+from sharding import HashRing
+from protos import control_panel_pb2, control_panel_pb2_grpc, process_pb2, process_pb2_grpc
+
+
+load_dotenv()
+
+# Failures after which the topology is refreshed and the request retried: the process is down,
+# it is no longer the head or too many writes are waiting at the head
+RETRYABLE_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.FAILED_PRECONDITION, grpc.StatusCode.RESOURCE_EXHAUSTED)
+RETRY_BACKOFF = 0.1  # seconds, doubled after every attempt
+
+
+class ReadPolicy(Enum):
+    ROUND_ROBIN = 'round_robin'  # every replica in turn
+    LEAST_OUTSTANDING = 'least_outstanding'  # the replica with the fewest requests in progress from this client
+
+
+class NoChainError(Exception):
+    pass
+
+
+# Client of the store. Caches the topology from the control panel and keeps it up to date through WatchTopology,
+# or refreshes it when a request fails. Every book belongs to the chain the hash ring of the topology maps its
+# name to. Writes go straight to the head of that chain, reads are spread over all of its replicas:
+# every replica serves clean keys locally and asks the tail only for the committed version of dirty ones
+class Client:
+    def __init__(self, control_panel_ip, read_policy=None, watch=True):
+        self.read_policy = ReadPolicy(read_policy or os.environ.get("CLIENT_READ_POLICY", "round_robin"))
+        self.retries = int(os.environ.get("CLIENT_RETRIES", 5))
+        # Deadline in seconds of every read and write, retries included. The processes of the chain give up the
+        # write at the same deadline
+        self.timeout = float(os.environ.get("CLIENT_TIMEOUT", 10))
+        self.channels = ChannelPool()
+        self.control_panel = self.channels.get_stub(control_panel_ip, control_panel_pb2_grpc.ControlPanelStub)
+        self.lock = threading.Lock()
+        self.chains = []  # for every chain, the ips from the head to the tail
+        self.ring = None
+        self.epoch = 0
+        self.next_replica = itertools.count()
+        self.outstanding = {}  # ip -> requests in progress
+        self.closed = False
+        self.watch_call = None
+        self.refresh()
+        if watch:
+            threading.Thread(target=self.watch_topology, daemon=True).start()
+
+    def refresh(self):
+        self.update(self.control_panel.GetTopology(Empty()))
+
+    def update(self, topology):
+        with self.lock:
+            if topology.epoch < self.epoch:
+                return  # a refresh raced with a newer notification
+            self.epoch = topology.epoch
+            self.chains = [[process.ip for process in chain.processes] for chain in topology.chains]
+            self.ring = HashRing([chain.weight for chain in topology.chains], topology.vnodes) if self.chains else None
+
+    def watch_topology(self):
+        while not self.closed:
+            try:
+                self.watch_call = self.control_panel.WatchTopology(
+                    control_panel_pb2.WatchTopologyRequest(epoch=self.epoch))
+                for topology in self.watch_call:
+                    self.update(topology)
+            except grpc.RpcError:
+                if self.closed:
+                    return
+                time.sleep(1)  # the control panel is restarting
+
+    def close(self):
+        self.closed = True
+        if self.watch_call is not None:
+            self.watch_call.cancel()
+        self.channels.close()
+
+    # Returns the index of the chain storing the book
+    def chain_index(self, key):
+        with self.lock:
+            if self.ring is None:
+                raise NoChainError("Chain has not been created yet")
+            return self.ring.chain_for(key)
+
+    def head(self, chain):
+        with self.lock:
+            if chain >= len(self.chains):
+                raise NoChainError("Chain has not been created yet")
+            return self.chains[chain][0]
+
+    def tail(self, chain):
+        with self.lock:
+            if chain >= len(self.chains):
+                raise NoChainError("Chain has not been created yet")
+            return self.chains[chain][-1]
+
+    # Picks the replica of the chain for the next read according to the read policy
+    def read_replica(self, chain):
+        with self.lock:
+            if chain >= len(self.chains):
+                raise NoChainError("Chain has not been created yet")
+            start = next(self.next_replica) % len(self.chains[chain])
+            replicas = self.chains[chain][start:] + self.chains[chain][:start]
+            if self.read_policy == ReadPolicy.ROUND_ROBIN:
+                return replicas[0]
+            # Ties go to the next replica in round-robin order, so an idle chain is still read evenly
+            return min(replicas, key=lambda ip: self.outstanding.get(ip, 0))
+
+    def call(self, ip, method, request, timeout=None):
+        with self.lock:
+            self.outstanding[ip] = self.outstanding.get(ip, 0) + 1
+        try:
+            return getattr(self.channels.get_stub(ip, process_pb2_grpc.ProcessStub), method)(request, timeout=timeout)
+        finally:
+            with self.lock:
+                self.outstanding[ip] -= 1
+
+    # Calls method on the process returned by pick. If it is down, not the head anymore or the book has moved to
+    # another chain, refreshes the topology and retries with exponential backoff, which covers the time the control
+    # panel needs to fail over. All attempts share the deadline of timeout seconds (CLIENT_TIMEOUT by default)
+    def call_with_retries(self, pick, method, request, timeout=None):
+        deadline = time.monotonic() + (timeout or self.timeout)
+        for attempt in range(self.retries + 1):
+            try:
+                return self.call(pick(), method, request, max(deadline - time.monotonic(), 0))
+            except grpc.RpcError as e:
+                backoff = RETRY_BACKOFF * 2 ** attempt
+                out_of_time = time.monotonic() + backoff >= deadline
+                if e.code() not in RETRYABLE_CODES or attempt == self.retries or out_of_time:
+                    raise
+                time.sleep(backoff)
+                self.refresh()
+
+    # Every attempt carries the same id, so a write whose first attempt reached the head is not applied twice
+    def write(self, key, value, timeout=None):
+        self.call_with_retries(lambda: self.head(self.chain_index(key)), "Write",
+                               process_pb2.WriteRequest(key=key, value=value, id=uuid.uuid4().hex), timeout)
+
+    # Sends the writes to the heads of their chains in batches of up to batch_size. Every batch is applied
+    # atomically by one chain. The writes of failed batches are regrouped by the refreshed topology and retried,
+    # with the ids they got on the first attempt
+    def write_batch(self, writes, batch_size=1000):
+        for write in writes:
+            if not write.id:
+                write.id = uuid.uuid4().hex
+        for attempt in range(self.retries + 1):
+            by_chain = defaultdict(list)
+            for write in writes:
+                by_chain[self.chain_index(write.key)].append(write)
+            failed = []
+            for chain, chain_writes in by_chain.items():
+                for i in range(0, len(chain_writes), batch_size):
+                    batch = process_pb2.WriteBatchRequest(writes=chain_writes[i:i + batch_size])
+                    try:
+                        self.call(self.head(chain), "WriteBatch", batch, self.timeout)
+                    except grpc.RpcError as e:
+                        if e.code() not in RETRYABLE_CODES or attempt == self.retries:
+                            raise
+                        failed += batch.writes
+            if not failed:
+                return
+            writes = failed
+            time.sleep(RETRY_BACKOFF * 2 ** attempt)
+            self.refresh()
+
+    # Returns the value of the key, None if it is not in the store
+    def read(self, key, timeout=None):
+        response = self.call_with_retries(lambda: self.read_replica(self.chain_index(key)), "Read",
+                                          process_pb2.ReadRequest(key=key), timeout)
+        return response.value if response.success else None
+
+    # Yields the books sorted by name, merging the listings of all chains. With a limit, only the first limit books
+    def list_books(self, prefix="", page_size=100, limit=0):
+        with self.lock:
+            if not self.chains:
+                raise NoChainError("Chain has not been created yet")
+            chains = len(self.chains)
+        listings = [self.list_chain_books(chain, prefix, page_size, limit) for chain in range(chains)]
+        yield from itertools.islice(heapq.merge(*listings, key=lambda book: book.name), limit or None)
+
+    # Yields the books of the chain sorted by name, leaving out the ones a rebalance has moved to another chain
+    # and the chain has not deleted yet. If the replica fails, the listing resumes after the last book
+    # on another replica
+    def list_chain_books(self, chain, prefix, page_size, limit=0):
+        cursor = ""
+        for attempt in range(self.retries + 1):
+            request = process_pb2.ListBooksRequest(page_size=page_size, cursor=cursor, prefix=prefix, limit=limit)
+            stub = self.channels.get_stub(self.read_replica(chain), process_pb2_grpc.ProcessStub)
+            try:
+                for page in stub.ListBooksStream(request):
+                    yield from (book for book in page.books if self.chain_index(book.name) == chain)
+                    cursor = page.next_cursor
+                return
+            except grpc.RpcError as e:
+                if e.code() not in RETRYABLE_CODES or attempt == self.retries:
+                    raise
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+                self.refresh()
+
+    # Yields the (name, price) of every book sorted by name, from snapshots streamed by the tails of the chains.
+    # The snapshot of every chain is consistent, the chains are independent of each other
+    def export_books(self, page_size=10000):
+        with self.lock:
+            if not self.chains:
+                raise NoChainError("Chain has not been created yet")
+            chains = len(self.chains)
+        listings = [self.export_chain_books(chain, page_size, chains > 1) for chain in range(chains)]
+        yield from listings[0] if chains == 1 else heapq.merge(*listings)
+
+    # A stream that fails before its first page is retried on the tail of the refreshed topology. A snapshot
+    # cannot be resumed, so a later failure fails the export
+    def export_chain_books(self, chain, page_size, sharded):
+        request = process_pb2.ExportRequest(page_size=page_size)
+        for attempt in range(self.retries + 1):
+            started = False
+            stub = self.channels.get_stub(self.tail(chain), process_pb2_grpc.ProcessStub)
+            try:
+                for page in stub.ExportBooks(request):
+                    started = True
+                    books = zip(page.names, page.prices)
+                    if sharded:
+                        books = [book for book in books if self.chain_index(book[0]) == chain]
+                    yield from books
+                return
+            except grpc.RpcError as e:
+                if started or e.code() not in RETRYABLE_CODES or attempt == self.retries:
+                    raise
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+                self.refresh()
@@ -1,17 +1,27 @@
+import logging
 import os
 import random
+import threading
+import time
 from concurrent import futures
 from enum import Enum
-from node import ProcessRole
+from process import ProcessRole
 
 import grpc
 from dotenv import load_dotenv
 
+from channel_pool import ChannelPool, add_channel_gauges
+from metrics import Metrics, MetricsInterceptor, metrics_port
+from sharding import DEFAULT_VNODES
 from protos import control_panel_pb2, control_panel_pb2_grpc, process_pb2, process_pb2_grpc
 from google.protobuf.empty_pb2 import Empty
 
 load_dotenv()
 
+# Failures worth retrying: the process is (re)starting or did not answer within the deadline
+RETRYABLE_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+RETRY_BACKOFF = 0.1  # seconds, doubled after every attempt
+
 
 class ControlPanelState(Enum):
     INITIALIZED = 1,
@@ -21,203 +31,596 @@ class ControlPanelState(Enum):
 class ControlPanel(control_panel_pb2_grpc.ControlPanelServicer):
     def __init__(self):
         self.state = ControlPanelState.INITIALIZED
-        self.processes = []  # list of control_panel_pb2.NameIP(name=name, ip=ip)
-        self.removed_heads = []  # like processes but used while removing and restoring heads
+        self.processes = []  # processes registered before the chains are created, control_panel_pb2.NameIP
+        # Book names are partitioned over NUM_CHAINS independent chains by a consistent hash ring.
+        # Every chain is a list of processes from the head to the tail and has a weight on the ring
+        self.num_chains = int(os.environ.get("NUM_CHAINS", 1))
+        self.vnodes = int(os.environ.get("HASH_RING_VNODES", DEFAULT_VNODES))
+        self.chains = []
+        self.weights = []
+        self.removed_heads = []  # for every chain, its heads removed by RemoveHead that can be restored
+        self.channels = ChannelPool()  # persistent channels to every registered process
+        # Calls to the processes are fanned out on this pool, each with a deadline and retries
+        self.executor = futures.ThreadPoolExecutor(max_workers=int(os.environ.get("CONTROL_PANEL_MAX_WORKERS", 32)))
+        self.rpc_timeout = float(os.environ.get("CONTROL_PANEL_RPC_TIMEOUT", 5))
+        self.rpc_retries = int(os.environ.get("CONTROL_PANEL_RPC_RETRIES", 2))
+        self.reconcile_timeout = float(os.environ.get("CONTROL_PANEL_RECONCILE_TIMEOUT", 600))
+        # Held while a chain is reconfigured, by the RPCs and by the failure detector
+        self.topology_lock = threading.RLock()
+        # Failure detector: every process of the chain gets a heartbeat every interval and is spliced out of the
+        # chain once it has missed them for the suspicion timeout. HEARTBEAT_INTERVAL_MS=0 disables it
+        self.heartbeat_interval = float(os.environ.get("HEARTBEAT_INTERVAL_MS", 500)) / 1000
+        self.suspicion_timeout = float(os.environ.get("HEARTBEAT_SUSPICION_TIMEOUT_MS", 3000)) / 1000
+        self.last_heartbeat = {}  # ip -> time the process last answered a heartbeat
+        # Anti-entropy: every interval, every process but the head compares its hash tree with its predecessor's
+        # and repairs the books that differ. ANTI_ENTROPY_INTERVAL_MS=0 (default) only runs it on request
+        self.anti_entropy_interval = float(os.environ.get("ANTI_ENTROPY_INTERVAL_MS", 0)) / 1000
+        # Incremented on every change of a chain or of the ring, WatchTopology streams wait on topology_cond for it
+        self.epoch = 0
+        self.topology_cond = threading.Condition()
+        # Latency of the RPCs served and of the calls to the processes, failovers and the size of the store
+        self.metrics = Metrics()
+        self.metrics.gauge("chains", lambda: len(self.chains))
+        self.metrics.gauge("processes", lambda: sum(len(chain) for chain in self.chains) or len(self.processes))
+        self.metrics.gauge("removed_heads", lambda: sum(len(heads) for heads in self.removed_heads))
+        self.metrics.gauge("topology_epoch", lambda: self.epoch)
+        add_channel_gauges(self.metrics, lambda: [self.channels])
+        if self.heartbeat_interval > 0:
+            threading.Thread(target=self.detect_failures, daemon=True).start()
+        if self.anti_entropy_interval > 0:
+            threading.Thread(target=self.schedule_anti_entropy, daemon=True).start()
+
+    def process_stub(self, ip):
+        return self.channels.get_stub(ip, process_pb2_grpc.ProcessStub)
+
+    # Calls method of the process with a deadline, retrying with exponential backoff if it is unavailable
+    def call(self, process, method, request, timeout=None):
+        start = time.perf_counter()
+        for attempt in range(self.rpc_retries + 1):
+            try:
+                response = getattr(self.process_stub(process.ip), method)(request, timeout=timeout or self.rpc_timeout)
+                self.metrics.observe("process_call_seconds", time.perf_counter() - start, method=method)
+                return response
+            except grpc.RpcError as e:
+                if e.code() not in RETRYABLE_CODES or attempt == self.rpc_retries:
+                    self.metrics.inc("process_call_errors_total", method=method)
+                    raise
+                self.metrics.inc("process_call_retries_total", method=method)
+                time.sleep(RETRY_BACKOFF * 2 ** attempt)
+
+    # Runs the (process, method, request) calls in parallel. Returns their responses in order (None for the failed
+    # ones) and a description of every failure
+    def fan_out(self, calls, timeout=None):
+        pending = [self.executor.submit(self.call, process, method, request, timeout)
+                   for process, method, request in calls]
+        responses, errors = [], []
+        for (process, method, _), future in zip(calls, pending):
+            try:
+                responses.append(future.result())
+            except grpc.RpcError as e:
+                responses.append(None)
+                errors.append(f"{method} on {process.name} ({process.ip}) failed: {e.code().name} {e.details()}")
+        return responses, errors
 
+    # Prints the failures of an operation and returns them to the caller in one UNAVAILABLE status
+    @staticmethod
+    def report_errors(operation, errors, context):
+        for error in errors:
+            print(error)
+        context.abort(grpc.StatusCode.UNAVAILABLE, f"{operation}: " + "; ".join(errors))
+
+    # Before the chains are created the process is only registered, afterwards the shortest chain is extended
+    # with it
     def AddProcess(self, request, context):
-        if self.state != ControlPanelState.INITIALIZED:
-            print("Processes can only be added in the INITIALIZED state")
+        with self.topology_lock:
+            process = control_panel_pb2.NameIP(name=request.name, ip=request.ip)
+            if self.state == ControlPanelState.CHAIN_CREATED:
+                return self.extend_chain(process, context)
+            self.processes.append(process)
+            print(f"Added process {request.name} with ip {request.ip}")
             return Empty()
-        self.processes.append(control_panel_pb2.NameIP(name=request.name, ip=request.ip))
-        print(f"Added process {request.name} with ip {request.ip}")
+
+    # Appends the process as the new tail while writes keep flowing: it copies the state of the current tail,
+    # then the tail starts forwarding to it and finally sends it the writes applied in between
+    def extend_chain(self, process, context):
+        index = min(range(len(self.chains)), key=lambda i: len(self.chains[i]))
+        chain = self.chains[index]
+        tail, head = chain[-1], chain[0]
+        print(f"Extending chain {index} with {process.name} ({process.ip})...")
+        reconcile_request = process_pb2.ReconcileRequest(
+            sourceProcessID=tail.name,
+            targetProcessID=process.name,
+            targetIP=process.ip
+        )
+        try:
+            # The new process joins disabled behind the tail
+            self.call(process, "Initialize", process_pb2.InitializeRequest(
+                processID=process.name,
+                predecessorIP=tail.ip,
+                headIP=head.ip,
+                role=ProcessRole.DISABLED.value,
+            ))
+            self.call(process, "SetShard", self.shard_request(process, index))
+            # Position of the tail's log before the copy. In sync mode writes can reach the tail out of seq order,
+            # so the writes it applies from here on are sent again after the promotion, whatever their seq
+            copy_position = self.call(tail, "GetNumericalDeviation", process_pb2.NumericalDeviationRequest(
+                processID=tail.name)).log_position
+            # Bulk copy of the tail's state
+            self.call(tail, "Reconcile", reconcile_request, self.reconcile_timeout)
+            # Promote the new process: from here on the old tail forwards every write to it
+            self.call(process, "SetRole", process_pb2.ProcessRole(processID=process.name, role=ProcessRole.TAIL.value))
+            self.call(tail, "SetSuccessorIP", process_pb2.SetSuccessorIPRequest(processID=tail.name, ip=process.ip))
+            self.call(tail, "SetRole", process_pb2.ProcessRole(processID=tail.name, role=ProcessRole.NONE.value))
+            # Writes the old tail applied after the copy and before forwarding
+            reconcile_request.from_position = copy_position
+            self.call(tail, "Reconcile", reconcile_request, self.reconcile_timeout)
+        except grpc.RpcError as e:
+            # The old tail stays the tail
+            self.fan_out([
+                (tail, "SetSuccessorIP", process_pb2.SetSuccessorIPRequest(processID=tail.name)),
+                (tail, "SetRole", process_pb2.ProcessRole(processID=tail.name, role=ProcessRole.TAIL.value)),
+                (process, "SetRole", process_pb2.ProcessRole(processID=process.name, role=ProcessRole.DISABLED.value)),
+            ])
+            self.report_errors("AddProcess", [
+                f"Extending the chain with {process.name} failed: {e.code().name} {e.details()}"
+            ], context)
+        chain.append(process)
+        self.topology_changed()
+        _, errors = self.fan_out([(p, "SetTailIP", process_pb2.SetTailIPRequest(processID=p.name, ip=process.ip))
+                                  for p in chain[:-1]])
+        print(f"Process {process.name} ({process.ip}) is the new tail")
+        print(f"Chain: {self.get_chain(index)}")
+        if errors:
+            self.report_errors("AddProcess", errors, context)
         return Empty()
 
-    # Returns a list of processes in the chain
-    # The first element is the head
-    # The last element is the tail
+    # Splits the registered processes into NUM_CHAINS chains of equal weight. In every chain the first process
+    # is the head and the last one is the tail
     def CreateChain(self, request, context):
-        if self.state == ControlPanelState.INITIALIZED:
-            if len(self.processes) < 2:
-                print("There should be at least 2 processes to create a chain")
-                return control_panel_pb2.CreateChainResponse()
-            random.shuffle(self.processes)
-            # Here you can perform some extra checks
-            # (e.g. reshuffle if subsequent chain elements are on the same node)
-            self.state = ControlPanelState.CHAIN_CREATED
-            print("Chain created!")
-        else:
-            print("Chain has already been created")
-        print(f"Chain: {self.get_chain()}")
-
-        for i in range(len(self.processes)):
-            name, ip = self.processes[i].name, self.processes[i].ip
-            predecessor_ip = self.processes[i - 1].ip if i > 0 else None
-            successor_ip = self.processes[i + 1].ip if i < len(self.processes) - 1 else None
-            tail_ip = self.processes[-1].ip if i != len(self.processes) - 1 else None
-            head_ip = self.processes[0].ip if i != 0 else None
-
-            role = ProcessRole.HEAD if i == 0 else ProcessRole.TAIL if i == len(self.processes) - 1 else ProcessRole.NONE
-
-            with grpc.insecure_channel(ip) as channel:
-                stub = process_pb2_grpc.ProcessStub(channel)
-                res = stub.Initialize(process_pb2.InitializeRequest(
-                    processID=name,
-                    predecessorIP=predecessor_ip,
-                    successorIP=successor_ip,
-                    tailIP=tail_ip,
-                    headIP=head_ip,
-                    role=role.value,
-                ))
+        with self.topology_lock:
+            if self.state == ControlPanelState.INITIALIZED:
+                if len(self.processes) < 2 * self.num_chains:
+                    print(f"There should be at least 2 processes per chain to create {self.num_chains} chains")
+                    return control_panel_pb2.CreateChainResponse()
+                random.shuffle(self.processes)
+                # Here you can perform some extra checks
+                # (e.g. reshuffle if subsequent chain elements are on the same node)
+                self.chains = [self.processes[i::self.num_chains] for i in range(self.num_chains)]
+                self.weights = [1] * self.num_chains
+                self.removed_heads = [[] for _ in self.chains]
+                self.processes = []
+                self.state = ControlPanelState.CHAIN_CREATED
+                print("Chain created!")
+            else:
+                print("Chain has already been created")
+            print(self.describe_chains())
+
+            calls = []
+            for index, chain in enumerate(self.chains):
+                calls += self.initialize_calls(chain)
+                calls += [(p, "SetShard", self.shard_request(p, index)) for p in chain]
+            _, errors = self.fan_out(calls)
+            self.topology_changed()
+            if errors:
+                self.report_errors("CreateChain", errors, context)
+
+            with self.topology_cond:
+                return control_panel_pb2.CreateChainResponse(chains=self.topology().chains)
+
+    # Calls placing every process of the chain in it
+    def initialize_calls(self, chain):
+        calls = []
+        for i in range(len(chain)):
+            name = chain[i].name
+            role, predecessor_ip, successor_ip = self.links(chain, i)
+            tail_ip = chain[-1].ip if i != len(chain) - 1 else None
+            head_ip = chain[0].ip if i != 0 else None
+
+            calls.append((chain[i], "Initialize", process_pb2.InitializeRequest(
+                processID=name,
+                predecessorIP=predecessor_ip,
+                successorIP=successor_ip,
+                tailIP=tail_ip,
+                headIP=head_ip,
+                role=role.value,
+            )))
+        return calls
+
+    # Tells the process the current ring and the chain it belongs to
+    def shard_request(self, process, index):
+        return process_pb2.ShardRequest(processID=process.name, chain=index, weights=self.weights, vnodes=self.vnodes)
 
-        return control_panel_pb2.CreateChainResponse(chain=self.processes)
+    # Creates one more chain out of running processes that are not in any chain. With a weight, the books of
+    # its share of the ring are then moved to it; with weight 0 it stays empty until the next Rebalance
+    def AddChain(self, request, context):
+        with self.topology_lock:
+            if self.state != ControlPanelState.CHAIN_CREATED:
+                context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Chain has not been created yet")
+            if len(request.processes) < 2:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, "There should be at least 2 processes in a chain")
+            in_use = {p.ip for chain in self.chains + self.removed_heads for p in chain}
+            if any(p.ip in in_use for p in request.processes):
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, "The processes of a new chain cannot be in a chain")
+            chain = list(request.processes)
+            index = len(self.chains)
+            self.chains.append(chain)
+            self.weights.append(0)
+            self.removed_heads.append([])
+            _, errors = self.fan_out(self.initialize_calls(chain) + [
+                (p, "SetShard", self.shard_request(p, index)) for p in chain])
+            if errors:
+                self.chains.pop()
+                self.weights.pop()
+                self.removed_heads.pop()
+                self.report_errors("AddChain", errors, context)
+            self.topology_changed()
+            print(f"Chain {index} created: {self.get_chain(index)}")
+            if request.weight:
+                self.rebalance(self.weights[:-1] + [request.weight], context)
+            return control_panel_pb2.Chain(processes=chain, weight=self.weights[index])
+
+    def Rebalance(self, request, context):
+        with self.topology_lock:
+            if self.state != ControlPanelState.CHAIN_CREATED:
+                context.abort(grpc.StatusCode.FAILED_PRECONDITION, "Chain has not been created yet")
+            if len(request.weights) != len(self.chains) or not any(request.weights):
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                              f"Expected {len(self.chains)} weights, at least one of them positive")
+            self.rebalance(list(request.weights), context)
+            return Empty()
+
+    # Moves the books whose chain changes with the new weights. Every process gets the new ring first, so the
+    # heads stop accepting writes to the books they lose and clients route those writes to the new chains.
+    # Then the head of every chain streams the lost books to their new heads, which keep the books written
+    # since the switch, and finally every process deletes the books it has lost. Running it again with the
+    # same weights completes an interrupted migration
+    def rebalance(self, weights, context):
+        print(f"Rebalancing the chains with weights {weights}...")
+        self.weights = weights
+        _, errors = self.fan_out([(p, "SetShard", self.shard_request(p, index))
+                                  for index, chain in enumerate(self.chains) for p in chain])
+        self.topology_changed()
+        if errors:
+            self.report_errors("Rebalance", errors, context)
+        heads = [chain[0].ip for chain in self.chains]
+        moved, errors = self.fan_out([(chain[0], "MigrateKeys", process_pb2.MigrateKeysRequest(heads=heads))
+                                      for chain in self.chains], self.reconcile_timeout)
+        if errors:
+            self.report_errors("Rebalance", errors, context)
+        _, errors = self.fan_out([(p, "DropForeignKeys", Empty()) for chain in self.chains for p in chain])
+        print(f"Moved {sum(response.count for response in moved)} books between the chains")
+        print(self.describe_chains())
+        if errors:
+            self.report_errors("Rebalance", errors, context)
 
     def ListChain(self, request, context):
         if self.state != ControlPanelState.CHAIN_CREATED:
             print("Chain has not been created yet")
             return control_panel_pb2.ListChainResponse()
-        chain = self.get_chain()
-        print(f"Chain: {chain}")
+        chain = self.describe_chains()
+        print(chain)
         return control_panel_pb2.ListChainResponse(chain=chain)
 
     def Clear(self, request, context):
-        processes_ips = set(map(lambda p: p.ip, self.removed_heads + self.processes))
-        for ip in processes_ips:
-            print(f"Clearing process {ip}")
-            with grpc.insecure_channel(ip) as channel:
-                stub = process_pb2_grpc.ProcessStub(channel)
-                stub.Clear(Empty())
-        self.state = ControlPanelState.INITIALIZED
-        self.processes = []
-        self.removed_heads = []
-        print("Chain has been cleared")
-        return Empty()
+        with self.topology_lock:
+            processes = {p.ip: p for chain in self.removed_heads + self.chains + [self.processes]
+                         for p in chain}.values()
+            print(f"Clearing processes {', '.join(p.ip for p in processes)}")
+            _, errors = self.fan_out([(p, "Clear", Empty()) for p in processes])
+            self.channels.close()
+            self.state = ControlPanelState.INITIALIZED
+            self.processes = []
+            self.chains = []
+            self.weights = []
+            self.removed_heads = []
+            self.topology_changed()
+            print("Chain has been cleared")
+            if errors:
+                self.report_errors("Clear", errors, context)
+            return Empty()
 
     def GetHead(self, request, context):
         if self.state != ControlPanelState.CHAIN_CREATED:
             print("Chain has not been created yet")
-            return control_panel_pb2.GetHeadResponse()
-        return control_panel_pb2.GetHeadResponse(head=self.processes[0])
+            return control_panel_pb2.NameIP()
+        return self.chains[self.chain_index(request, context)][0]
+
+    # Returns the index of the chain a ChainRequest refers to
+    def chain_index(self, request, context):
+        if request.chain >= len(self.chains):
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"There are only {len(self.chains)} chains")
+        return request.chain
+
+    def Stats(self, request, context):
+        return self.metrics.snapshot()
+
+    def GetTopology(self, request, context):
+        with self.topology_cond:
+            return self.topology()
+
+    # Streams the topology every time a chain or the ring changes, starting with the current one if the client's
+    # epoch is old
+    def WatchTopology(self, request, context):
+        epoch = request.epoch
+        while context.is_active():
+            with self.topology_cond:
+                # Wakes up every second to notice clients that have gone away
+                if not self.topology_cond.wait_for(lambda: self.epoch != epoch, timeout=1):
+                    continue
+                topology = self.topology()
+            epoch = topology.epoch
+            yield topology
+
+    # Must hold topology_cond
+    def topology(self):
+        chains = [control_panel_pb2.Chain(processes=chain, weight=weight)
+                  for chain, weight in zip(self.chains, self.weights)]
+        return control_panel_pb2.Topology(chains=chains, epoch=self.epoch, vnodes=self.vnodes)
+
+    # Called after every change of self.chains or self.weights
+    def topology_changed(self):
+        with self.topology_cond:
+            self.epoch += 1
+            self.topology_cond.notify_all()
 
     def RemoveHead(self, request, context):
-        print("Removing head...")
-        if self.state != ControlPanelState.CHAIN_CREATED:
-            print("Chain has not been created yet")
-            return Empty()
-        if len(self.processes) == 1:
-            print("There is only one process in the chain")
-            return Empty()
-        # Set the new head
-        self.removed_heads.append(self.processes.pop(0))
-        # Disable the previous head
-        previous_head_name, previous_head_ip = self.removed_heads[-1].name, self.removed_heads[-1].ip
-        with grpc.insecure_channel(previous_head_ip) as channel:
-            stub = process_pb2_grpc.ProcessStub(channel)
-            stub.SetRole(process_pb2.ProcessRole(
-                processID=previous_head_name,
+        with self.topology_lock:
+            print("Removing head...")
+            if self.state != ControlPanelState.CHAIN_CREATED:
+                print("Chain has not been created yet")
+                return Empty()
+            chain = self.chains[self.chain_index(request, context)]
+            if len(chain) == 1:
+                print("There is only one process in the chain")
+                return Empty()
+            # Set the new head
+            previous_head = chain.pop(0)
+            self.removed_heads[request.chain].append(previous_head)
+            new_head = chain[0]
+            # Disable the previous head. It may be down already, so a failure does not stop the removal
+            _, errors = self.fan_out([(previous_head, "SetRole", process_pb2.ProcessRole(
+                processID=previous_head.name,
                 role=ProcessRole.DISABLED.value
-            ))
-
-        new_head_name, new_head_ip = self.processes[0].name, self.processes[0].ip
-        with grpc.insecure_channel(new_head_ip) as channel:
-            stub = process_pb2_grpc.ProcessStub(channel)
-            # Set the next node as a new head
-            stub.SetRole(process_pb2.ProcessRole(
-                processID=new_head_name,
-                role=ProcessRole.HEAD.value
-            ))
-            # Set the new head predecessor's to None
-            stub.SetPredecessorIP(process_pb2.SetPredecessorIPRequest(processID=new_head_name))
-
-        processes_ips = set(map(lambda p: p.ip, self.processes))
-        for ip in processes_ips:
-            with grpc.insecure_channel(ip) as channel:
-                stub = process_pb2_grpc.ProcessStub(channel)
-                stub.SetHeadIP(process_pb2.SetHeadIPRequest(processID=new_head_name, ip=new_head_ip))
-        print(f"Head {previous_head_name} ({previous_head_ip}) has been removed")
-        return Empty()
+            ))])
+            # Set the next node as a new head without predecessor and point every process to it
+            calls = [
+                (new_head, "SetRole", process_pb2.ProcessRole(processID=new_head.name, role=ProcessRole.HEAD.value)),
+                (new_head, "SetPredecessorIP", process_pb2.SetPredecessorIPRequest(processID=new_head.name)),
+            ]
+            calls += [(p, "SetHeadIP", process_pb2.SetHeadIPRequest(processID=new_head.name, ip=new_head.ip))
+                      for p in chain]
+            errors += self.fan_out(calls)[1]
+            self.topology_changed()
+            print(f"Head {previous_head.name} ({previous_head.ip}) has been removed")
+            if errors:
+                self.report_errors("RemoveHead", errors, context)
+            return Empty()
 
     def RestoreHead(self, request, context):
-        print("Restoring head...")
+        with self.topology_lock:
+            print("Restoring head...")
+            if self.state != ControlPanelState.CHAIN_CREATED:
+                print("Chain has not been created yet")
+                return Empty()
+            index = self.chain_index(request, context)
+            chain, removed_heads = self.chains[index], self.removed_heads[index]
+            if len(removed_heads) == 0:
+                print("There are no heads to restore")
+                return Empty()
+            new_head, old_head = removed_heads[-1], chain[0]
+            deviations, errors = self.fan_out([(p, "GetNumericalDeviation", process_pb2.NumericalDeviationRequest(
+                processID=p.name)) for p in (old_head, new_head)])
+            if errors:
+                self.report_errors("RestoreHead", errors, context)
+            behind = deviations[0].deviation - deviations[1].deviation
+            print(f"{new_head.name} is {behind} writes behind {old_head.name}")
+            reconcile_request = process_pb2.ReconcileRequest(
+                sourceProcessID=old_head.name,
+                targetProcessID=new_head.name,
+                targetIP=new_head.ip
+            )
+            try:
+                # Bulk of the catch-up while the current head keeps serving writes
+                self.call(old_head, "Reconcile", reconcile_request, self.reconcile_timeout)
+                # Set the previous head role, so it stops numbering writes
+                self.call(old_head, "SetRole", process_pb2.ProcessRole(
+                    processID=old_head.name,
+                    role=ProcessRole.NONE.value
+                ))
+                # Transfer the writes applied during the first pass
+                self.call(old_head, "Reconcile", reconcile_request, self.reconcile_timeout)
+                # The ring may have changed while the head was removed
+                self.call(new_head, "SetShard", self.shard_request(new_head, index))
+                self.call(new_head, "DropForeignKeys", Empty())
+                # Its successor and the tail may have changed while it was removed, and have to be right
+                # before it takes writes
+                self.call(new_head, "SetSuccessorIP", process_pb2.SetSuccessorIPRequest(processID=new_head.name,
+                                                                                        ip=old_head.ip))
+                self.call(new_head, "SetTailIP", process_pb2.SetTailIPRequest(processID=new_head.name,
+                                                                              ip=chain[-1].ip))
+            except grpc.RpcError as e:
+                # The current head stays in place and the removed head can be restored later
+                self.fan_out([(old_head, "SetRole", process_pb2.ProcessRole(
+                    processID=old_head.name,
+                    role=ProcessRole.HEAD.value
+                ))])
+                self.report_errors("RestoreHead", [
+                    f"Reconciling {new_head.name} from {old_head.name} failed: {e.code().name} {e.details()}"
+                ], context)
+            # Set the removed head as the new head
+            chain.insert(0, removed_heads.pop())
+            calls = [
+                # change the previous head's predecessor to the new head
+                (old_head, "SetPredecessorIP", process_pb2.SetPredecessorIPRequest(processID=old_head.name,
+                                                                                    ip=new_head.ip)),
+                # Enable the new head
+                (new_head, "SetRole", process_pb2.ProcessRole(processID=new_head.name, role=ProcessRole.HEAD.value)),
+            ]
+            calls += [(p, "SetHeadIP", process_pb2.SetHeadIPRequest(processID=new_head.name, ip=new_head.ip))
+                      for p in chain]
+            _, errors = self.fan_out(calls)
+            self.topology_changed()
+            if errors:
+                self.report_errors("RestoreHead", errors, context)
+
+            print(f"Process {new_head.name} ({new_head.ip}) has been restored as the head. "
+                  f"Reconciled successfully.")
+            return Empty()
+
+    def AntiEntropy(self, request, context):
         if self.state != ControlPanelState.CHAIN_CREATED:
             print("Chain has not been created yet")
-            return Empty()
-        if len(self.removed_heads) == 0:
-            print("There are no heads to restore")
-            return Empty()
-        if ControlPanel.compare_numerical_deviation(self.removed_heads[-1], self.processes[0]):
-            node = self.removed_heads.pop()
-            print(f"Numerical deviation is too high. Node {node.name} ({node.ip}) has been permanently removed.")
-            return Empty()
-        print(f"Numerical deviation is acceptable. Restoring head...")
-        # Set the removed head as the new head
-        self.processes.insert(0, self.removed_heads.pop())
-        # Enable the new head
-        new_head_name, new_head_ip = self.processes[0].name, self.processes[0].ip
-        with grpc.insecure_channel(new_head_ip) as channel:
-            stub = process_pb2_grpc.ProcessStub(channel)
-            stub.SetRole(process_pb2.ProcessRole(
-                processID=new_head_name,
-                role=ProcessRole.HEAD.value
-            ))
-        old_head_name, old_head_ip = self.processes[1].name, self.processes[1].ip
-        with grpc.insecure_channel(old_head_ip) as channel:
-            stub = process_pb2_grpc.ProcessStub(channel)
-            # Set the previous head role
-            stub.SetRole(process_pb2.ProcessRole(
-                processID=old_head_name,
-                role=ProcessRole.NONE.value
-            ))
-            # change the current node prev to None
-            stub.SetPredecessorIP(process_pb2.SetPredecessorIPRequest(
-                processID=old_head_name,
-                ip=new_head_ip
-            ))
-            # reconciling
-            stub.Reconcile(process_pb2.ReconcileRequest(
-                sourceProcessID=old_head_name,
-                targetProcessID=new_head_name,
-                targetIP=new_head_ip
-            ))
-        processes_ips = set(map(lambda p: p.ip, self.processes))
-        for ip in processes_ips:
-            with grpc.insecure_channel(ip) as channel:
-                stub = process_pb2_grpc.ProcessStub(channel)
-                stub.SetHeadIP(process_pb2.SetHeadIPRequest(processID=old_head_name, ip=old_head_ip))
-
-        print(f"Process {self.processes[0].name} ({self.processes[0].ip}) has been restored as the head. "
-              f"Reconciled successfully.")
-        return Empty()
+            return control_panel_pb2.AntiEntropyResponse()
+        index = self.chain_index(request, context)
+        try:
+            return self.anti_entropy(index)
+        except grpc.RpcError as e:
+            self.report_errors("AntiEntropy", [f"{e.code().name} {e.details()}"], context)
+
+    def schedule_anti_entropy(self):
+        while True:
+            time.sleep(self.anti_entropy_interval)
+            if self.state != ControlPanelState.CHAIN_CREATED:
+                continue
+            for index in range(len(self.chains)):
+                try:
+                    self.anti_entropy(index)
+                except grpc.RpcError as e:
+                    print(f"Anti-entropy of chain {index} failed: {e.code().name} {e.details()}")
+
+    # Runs anti-entropy from the successor of the head down to the tail, so that the books repaired on a process
+    # are passed on to the next one in the same round
+    def anti_entropy(self, index):
+        report = control_panel_pb2.AntiEntropyResponse()
+        for process in list(self.chains[index])[1:]:
+            response = self.call(process, "AntiEntropy", Empty(), timeout=self.reconcile_timeout)
+            report.divergent_leaves += response.divergent_leaves
+            report.repaired += response.repaired
+            report.removed += response.removed
+        self.metrics.inc("anti_entropy_rounds_total")
+        if report.repaired or report.removed:
+            self.metrics.inc("anti_entropy_repaired_total", report.repaired + report.removed)
+            print(f"Anti-entropy of chain {index}: {report.repaired} books repaired, {report.removed} removed "
+                  f"in {report.divergent_leaves} divergent leaves")
+        return report
 
-    def get_chain(self):
+    def detect_failures(self):
+        while True:
+            time.sleep(self.heartbeat_interval)
+            if self.state != ControlPanelState.CHAIN_CREATED:
+                self.last_heartbeat = {}
+                continue
+            processes = [p for chain in self.chains for p in chain]
+            answered = [self.executor.submit(self.heartbeat, p) for p in processes]
+            answered = [future.result() for future in answered]
+            now = time.monotonic()
+            self.last_heartbeat = {p.ip: self.last_heartbeat.get(p.ip, now) for p in processes}
+            failed = []
+            for p, alive in zip(processes, answered):
+                if alive:
+                    self.last_heartbeat[p.ip] = now
+                elif now - self.last_heartbeat[p.ip] > self.suspicion_timeout:
+                    failed.append(p)
+            if failed:
+                self.splice_out(failed)
+
+    # A heartbeat is missed only if the process cannot be reached. Exceeding the deadline means the connection
+    # is up but every worker of the process is busy (e.g. with slow writes). If the host of the process goes
+    # silent, keepalive pings bring the connection down
+    def heartbeat(self, process):
+        try:
+            self.process_stub(process.ip).Heartbeat(Empty(), timeout=self.heartbeat_interval)
+        except grpc.RpcError as e:
+            return e.code() != grpc.StatusCode.UNAVAILABLE
+        return True
+
+    # Removes failed processes from their chains and tells the remaining ones their new neighbours, head and tail.
+    # The predecessor of a failed process re-sends the writes the failed one may not have passed on
+    def splice_out(self, failed):
+        with self.topology_lock:
+            if self.state != ControlPanelState.CHAIN_CREATED:
+                return
+            for index, previous_chain in enumerate(self.chains):
+                chain_failed = [p for p in previous_chain if p in failed]
+                if not chain_failed:
+                    continue
+                chain = [p for p in previous_chain if p not in failed]
+                if len(chain) < 2:
+                    print(f"Processes {', '.join(p.name for p in chain_failed)} have failed, "
+                          f"but the chain cannot be shorter than 2 processes")
+                    for p in chain_failed:
+                        self.last_heartbeat[p.ip] = time.monotonic()
+                    continue
+                for p in chain_failed:
+                    print(f"Process {p.name} ({p.ip}) has failed and has been removed from chain {index}")
+                self.metrics.inc("processes_failed_total", len(chain_failed))
+                self.chains[index] = chain
+                _, errors = self.fan_out(self.reconfiguration_calls(previous_chain, chain))
+                self.topology_changed()
+                for error in errors:
+                    print(error)
+                print(f"Chain: {self.get_chain(index)}")
+
+    # Returns the (role, predecessor ip, successor ip) of the i-th process of the chain
+    @staticmethod
+    def links(chain, i):
+        role = ProcessRole.HEAD if i == 0 else ProcessRole.TAIL if i == len(chain) - 1 else ProcessRole.NONE
+        predecessor_ip = chain[i - 1].ip if i > 0 else None
+        successor_ip = chain[i + 1].ip if i < len(chain) - 1 else None
+        return role, predecessor_ip, successor_ip
+
+    # Calls moving every process of the new chain from its place in the previous chain to the new one
+    def reconfiguration_calls(self, previous_chain, chain):
+        calls = []
+        head, tail = chain[0], chain[-1]
+        for i, p in enumerate(chain):
+            role, predecessor_ip, successor_ip = self.links(chain, i)
+            previous_role, previous_predecessor_ip, previous_successor_ip = self.links(
+                previous_chain, previous_chain.index(p))
+            if role != previous_role:
+                calls.append((p, "SetRole", process_pb2.ProcessRole(processID=p.name, role=role.value)))
+            if predecessor_ip != previous_predecessor_ip:
+                calls.append((p, "SetPredecessorIP", process_pb2.SetPredecessorIPRequest(
+                    processID=p.name, ip=predecessor_ip)))
+            if successor_ip != previous_successor_ip:
+                calls.append((p, "SetSuccessorIP", process_pb2.SetSuccessorIPRequest(
+                    processID=p.name, ip=successor_ip)))
+            if head != previous_chain[0]:
+                calls.append((p, "SetHeadIP", process_pb2.SetHeadIPRequest(processID=p.name, ip=head.ip)))
+            if tail != previous_chain[-1]:
+                calls.append((p, "SetTailIP", process_pb2.SetTailIPRequest(processID=p.name, ip=tail.ip)))
+        return calls
+
+    def get_chain(self, index=0):
+        chain = self.chains[index]
         string = ""
-        string += f"{self.processes[0].name} (Head)"
-        for p in self.processes[1:-1]:
+        string += f"{chain[0].name} (Head)"
+        for p in chain[1:-1]:
             string += f" -> {p.name}"
-        string += f" -> {self.processes[-1].name} (Tail)"
+        string += f" -> {chain[-1].name} (Tail)"
         return string
 
-    # Returns True if the numerical deviation between the two nodes is greater than 5
-    @staticmethod
-    def compare_numerical_deviation(node1, node2):
-        with grpc.insecure_channel(node1.ip) as channel:
-            stub = process_pb2_grpc.ProcessStub(channel)
-            node1_deviation = stub.GetNumericalDeviation(
-                process_pb2.NumericalDeviationRequest(processID=node1.name)
-            ).deviation
-        with grpc.insecure_channel(node2.ip) as channel:
-            stub = process_pb2_grpc.ProcessStub(channel)
-            node2_deviation = stub.GetNumericalDeviation(
-                process_pb2.NumericalDeviationRequest(processID=node2.name)
-            ).deviation
-        return abs(node1_deviation - node2_deviation) > 5
+    # One line per chain, with its weight on the ring when there are several
+    def describe_chains(self):
+        if len(self.chains) == 1:
+            return f"Chain: {self.get_chain()}"
+        return "\n".join(f"Chain {i} (weight {weight}): {self.get_chain(i)}" for i, weight in enumerate(self.weights))
 
 
 if __name__ == '__main__':
     port = os.environ["CONTROL_PANEL_IP"].split(":")[-1]
 
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
-    control_panel_pb2_grpc.add_ControlPanelServicer_to_server(ControlPanel(), server)
+    # Every client watching the topology holds one of the workers
+    max_workers = int(os.environ.get("CONTROL_PANEL_SERVER_WORKERS", 32))
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+    control_panel = ControlPanel()
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers),
+                         interceptors=[MetricsInterceptor(control_panel.metrics)])
+    control_panel_pb2_grpc.add_ControlPanelServicer_to_server(control_panel, server)
     server.add_insecure_port(f"[::]:{port}")
+    http_port = metrics_port(os.environ["CONTROL_PANEL_IP"], os.environ.get("METRICS_PORT_OFFSET"))
+    if http_port is not None:
+        control_panel.metrics.start_http_server(http_port, {"process": "control_panel"})
     try:
         server.start()
         print(f"Control panel running on port {port}...")
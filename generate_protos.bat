@@ -1,2 +1,3 @@
+python -m grpc_tools.protoc -I . --python_out=. --grpc_python_out=. ./protos/metrics.proto
 python -m grpc_tools.protoc -I . --python_out=. --grpc_python_out=. ./protos/control_panel.proto
 python -m grpc_tools.protoc -I . --python_out=. --grpc_python_out=. ./protos/process.proto
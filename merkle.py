@@ -0,0 +1,60 @@
+import struct
+import zlib
+from hashlib import blake2b
+
+DEFAULT_FANOUT = 16
+DEFAULT_DEPTH = 4  # 65536 leaves
+
+ENTRY = struct.Struct("<Qd")
+
+
+# Hash of the state of a book, name being the encoded book name.
+# A book that has never been written (version 0) adds nothing to the tree
+def entry_hash(name, version, value):
+    if not version:
+        return 0
+    return int.from_bytes(blake2b(ENTRY.pack(version, value) + name, digest_size=8).digest(), "little")
+
+
+# Hash tree over the books of a process, compared between replicas by anti-entropy. Book names are hashed into
+# fanout ** depth leaves. The digest of a leaf is the XOR of the hashes of the (name, version, value) of its books
+# and the digest of an inner node the XOR of its children, so a write updates one node per level and the tree
+# never has to be rehashed. Replicas holding the same books have the same tree whatever the order of the writes
+class MerkleTree:
+    def __init__(self, fanout=DEFAULT_FANOUT, depth=DEFAULT_DEPTH):
+        self.fanout = fanout
+        self.depth = depth
+        self.levels = [[0] * fanout ** level for level in range(depth + 1)]  # from the root to the leaves
+
+    def leaf(self, key):
+        return zlib.crc32(key.encode()) % len(self.levels[-1])
+
+    # XORs the hash into the leaf of the encoded name and into every node above it
+    def toggle(self, name, digest):
+        node = zlib.crc32(name) % len(self.levels[-1])
+        for level in reversed(self.levels):
+            level[node] ^= digest
+            node //= self.fanout
+
+    def add(self, key, version, value):
+        name = key.encode()
+        self.toggle(name, entry_hash(name, version, value))
+
+    # XOR is its own inverse
+    remove = add
+
+    def update(self, key, old_version, old_value, version, value):
+        if old_version != version or old_value != value:
+            name = key.encode()
+            self.toggle(name, entry_hash(name, old_version, old_value) ^ entry_hash(name, version, value))
+
+    def rebuild(self, items):
+        self.levels = [[0] * self.fanout ** level for level in range(self.depth + 1)]
+        for key, record in items:
+            self.add(key, record.version, record.value)
+
+    def digests(self, level, nodes):
+        return [self.levels[level][node] for node in nodes]
+
+    def children(self, nodes):
+        return [node * self.fanout + i for node in nodes for i in range(self.fanout)]
@@ -0,0 +1,222 @@
+import bisect
+import inspect
+import math
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import grpc
+
+from protos import metrics_pb2
+
+# Upper bounds in seconds of the latency buckets, from 100 µs to 10 s
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+# Prometheus series name, e.g. rpc_errors_total{method="Write"}
+def series(name, labels):
+    if not labels:
+        return name
+    return name + "{" + ",".join(f'{label}="{value}"' for label, value in labels) + "}"
+
+
+class Histogram:
+    def __init__(self, bounds=LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+# Counters and latency histograms of a process or of the control panel. Recording one value costs a dict lookup
+# under a lock held for a few increments. Gauges are functions evaluated only when the stats are read
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = {}  # (name, labels) -> value
+        self.histograms = {}  # (name, labels) -> Histogram
+        self.gauges = {}  # name -> function returning the current value
+        self.http_server = None
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(labels.items()))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, tuple(labels.items()))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def gauge(self, name, function):
+        self.gauges[name] = function
+
+    def snapshot(self):
+        gauges = {}
+        for name, function in self.gauges.items():
+            try:
+                gauges[name] = function()
+            except grpc.RpcError:
+                pass  # e.g. the tail is unreachable, the gauge is left out of this snapshot
+        with self.lock:
+            counters = {series(name, labels): value for (name, labels), value in self.counters.items()}
+            histograms = [metrics_pb2.Histogram(name=name, labels=dict(labels), bounds=histogram.bounds,
+                                                counts=histogram.counts, sum=histogram.sum, count=histogram.count)
+                          for (name, labels), histogram in self.histograms.items()]
+        return metrics_pb2.StatsResponse(counters=counters, gauges=gauges, histograms=histograms)
+
+    # Serves the snapshot in the Prometheus text format on http://<host>:<port>/metrics from a daemon thread
+    def start_http_server(self, port, labels):
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = prometheus_text(metrics.snapshot(), labels).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.http_server = ThreadingHTTPServer(("", port), Handler)
+        self.http_server.daemon_threads = True
+        threading.Thread(target=self.http_server.serve_forever, daemon=True).start()
+        print(f"Metrics served on port {port}")
+
+    def stop_http_server(self):
+        if self.http_server is not None:
+            self.http_server.shutdown()
+            self.http_server.server_close()
+            self.http_server = None
+
+
+# Port of the metrics endpoint of a server listening on ip, or None when METRICS_PORT_OFFSET is not set
+def metrics_port(ip, offset):
+    if not offset:
+        return None
+    return int(ip.rsplit(":", 1)[1]) + int(offset)
+
+
+# Renders a StatsResponse in the Prometheus text format, adding the given labels (e.g. the process name)
+# to every series
+def prometheus_text(stats, labels):
+    common = [f'{label}="{value}"' for label, value in labels.items()]
+
+    def line(key, value, *more):
+        name, _, rest = key.partition("{")
+        parts = common + ([rest[:-1]] if rest else []) + list(more)
+        return f"{name}{{{','.join(parts)}}} {value:g}" if parts else f"{name} {value:g}"
+
+    lines = []
+    for kind, values in (("counter", stats.counters), ("gauge", stats.gauges)):
+        typed = set()
+        for key in sorted(values):
+            name = key.partition("{")[0]
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} {kind}")
+            lines.append(line(key, values[key]))
+    typed = set()
+    for histogram in sorted(stats.histograms, key=lambda h: (h.name, sorted(h.labels.items()))):
+        if histogram.name not in typed:
+            typed.add(histogram.name)
+            lines.append(f"# TYPE {histogram.name} histogram")
+        labels = sorted(histogram.labels.items())
+        cumulative = 0
+        for bound, count in zip(list(histogram.bounds) + [math.inf], histogram.counts):
+            cumulative += count
+            le = 'le="+Inf"' if bound == math.inf else f'le="{bound:g}"'
+            lines.append(line(series(histogram.name + "_bucket", labels), cumulative, le))
+        lines.append(line(series(histogram.name + "_sum", labels), histogram.sum))
+        lines.append(line(series(histogram.name + "_count", labels), histogram.count))
+    return "\n".join(lines) + "\n"
+
+
+# Records the latency of every RPC served and counts the failed ones, by method
+class MetricsInterceptor(grpc.ServerInterceptor):
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.handlers = {}  # method -> instrumented handler, the servicer's handlers never change
+
+    def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method
+        if method not in self.handlers:
+            self.handlers[method] = instrument(continuation(handler_call_details), method, self.metrics)
+        return self.handlers[method]
+
+
+# Same as MetricsInterceptor for a grpc.aio server
+class AsyncMetricsInterceptor(grpc.aio.ServerInterceptor):
+    def __init__(self, metrics):
+        self.metrics = metrics
+        self.handlers = {}
+
+    async def intercept_service(self, continuation, handler_call_details):
+        method = handler_call_details.method
+        if method not in self.handlers:
+            self.handlers[method] = instrument(await continuation(handler_call_details), method, self.metrics)
+        return self.handlers[method]
+
+
+# Wraps the behaviour of an RPC handler, keeping it a plain function, a coroutine or an async generator
+# so that grpc.aio still runs synchronous handlers on its thread pool
+def instrument(handler, full_method, metrics):
+    if handler is None:
+        return None
+    method = full_method.rsplit("/", 1)[-1]
+    field = next(name for name in ("unary_unary", "unary_stream", "stream_unary", "stream_stream")
+                 if getattr(handler, name) is not None)
+    behaviour = getattr(handler, field)
+
+    def done(start, failed):
+        metrics.observe("rpc_seconds", time.perf_counter() - start, method=method)
+        if failed:
+            metrics.inc("rpc_errors_total", method=method)
+
+    if inspect.isasyncgenfunction(behaviour):
+        async def wrapped(request, context):
+            start, failed = time.perf_counter(), True
+            try:
+                async for response in behaviour(request, context):
+                    yield response
+                failed = False
+            finally:
+                done(start, failed)
+    elif inspect.iscoroutinefunction(behaviour):
+        async def wrapped(request, context):
+            start, failed = time.perf_counter(), True
+            try:
+                response = await behaviour(request, context)
+                failed = False
+                return response
+            finally:
+                done(start, failed)
+    elif inspect.isgeneratorfunction(behaviour):
+        def wrapped(request, context):
+            start, failed = time.perf_counter(), True
+            try:
+                yield from behaviour(request, context)
+                failed = False
+            finally:
+                done(start, failed)
+    else:
+        def wrapped(request, context):
+            start, failed = time.perf_counter(), True
+            try:
+                response = behaviour(request, context)
+                failed = False
+                return response
+            finally:
+                done(start, failed)
+    return handler._replace(**{field: wrapped})
@@ -1,204 +1,167 @@
+import argparse
+import logging
+import multiprocessing
 import os
+import signal
 import sys
-from concurrent import futures
-from enum import Enum
+import threading
 import time
-from collections import deque
+from concurrent import futures
 
 import grpc
 from dotenv import load_dotenv
 
-from protos import control_panel_pb2, control_panel_pb2_grpc, process_pb2, process_pb2_grpc
+from aio_process import AsyncProcess, EventLoopThread, start_async_server
+from channel_pool import SERVER_KEEPALIVE_OPTIONS
+from bulk import FileFormat, export_books, file_format, import_books, read_books
+from client import Client, NoChainError
+from metrics import MetricsInterceptor, metrics_port, prometheus_text
+from process import Process, ProcessState, WriteMode
+from protos import control_panel_pb2, control_panel_pb2_grpc, process_pb2_grpc
 from google.protobuf.empty_pb2 import Empty
 
 
 load_dotenv()
 
 
-class ProcessState(Enum):
-    INITIALIZED = 1
-    INACTIVE = 2
-    CHAIN_CREATED = 3
-
-
-class ProcessRole(Enum):
-    NONE = 1
-    HEAD = 2
-    TAIL = 3
-    DISABLED = 4
-
-
-# In our case, a process will be a thread on a node
-class Process(process_pb2_grpc.ProcessServicer):
-    def __init__(self, name):
-        super().__init__()
+# LOG_LEVEL=DEBUG also logs every write reaching a process
+def configure_logging():
+    logging.basicConfig(level=os.environ.get("LOG_LEVEL", "INFO").upper(), format="%(message)s")
+
+
+# Creates the process and starts its server on the port of ip
+def serve_process(name, ip, engine, event_loop_thread):
+    if engine == "aio":
+        process = AsyncProcess(name, event_loop_thread.loop)
+    else:
+        process = Process(name)
+    process.ip = ip
+    port = process.ip.split(':')[-1]
+
+    # In pipelined mode a worker is held by the incoming replication stream and by every client write
+    # waiting at the head for its commit, so the pool needs more room than in sync mode
+    default_workers = 2 if process.write_mode == WriteMode.SYNC else 16
+    max_workers = int(os.environ.get("PROCESS_MAX_WORKERS", default_workers))
+    # The commit acks those writes wait for need a worker of the same pool: more waiting writes than workers would
+    # never complete. On the aio engine waiting writes are coroutines and hold no worker
+    if engine != "aio" and process.write_mode == WriteMode.PIPELINED:
+        process.limit_waiting_writes(max_workers)
+    if engine == "aio":
+        server = start_async_server(process, port, event_loop_thread, max_workers)
+    else:
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers),
+                             interceptors=[MetricsInterceptor(process.metrics)], options=SERVER_KEEPALIVE_OPTIONS)
+        process_pb2_grpc.add_ProcessServicer_to_server(process, server)
+        server.add_insecure_port(f"[::]:{port}")
+        server.start()
+    process.process_server = server
+    # Optional Prometheus endpoint on the port of the process + METRICS_PORT_OFFSET
+    http_port = metrics_port(ip, os.environ.get("METRICS_PORT_OFFSET"))
+    if http_port is not None:
+        process.metrics.start_http_server(http_port, {"process": name})
+    return process
+
+
+# Main function of a child process started by ChildProcess. Serves the process until the chain is cleared or
+# the node stops it, mirroring its state into shared memory for the node
+def run_child_process(name, ip, engine, state, ready):
+    configure_logging()
+    stopped = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stopped.set())
+    event_loop_thread = EventLoopThread() if engine == "aio" else None
+    process = serve_process(name, ip, engine, event_loop_thread)
+    ready.set()
+    while process.state != ProcessState.INACTIVE and not stopped.wait(0.05):
+        state.value = process.state.value
+    state.value = ProcessState.INACTIVE.value
+    if stopped.is_set():
+        process.stop_server()
+    # After Clear the server stops by itself once the Clear call has been answered
+    if engine == "aio":
+        event_loop_thread.run(process.process_server.wait_for_termination(5))
+    else:
+        process.process_server.wait_for_termination(5)
+
+
+# Node-side handle of a process served by its own OS process, so that the replicas of a node do not share one
+# interpreter lock. The child is spawned rather than forked, as gRPC does not support fork
+class ChildProcess:
+    def __init__(self, name, ip, engine):
+        context = multiprocessing.get_context("spawn")
         self.name = name
-        self.db = {}
-        # Stores a list of last 5 write operations (key, value) performed on the db.
-        # Used to reconcile a restored head
-        self.last_write_operations = deque([], maxlen=5)
-        # Number of write operations performed on the db.
-        # Used as numerical deviation during head restoration
-        self.num_write_operations = 0
-        self.ip = None
-        self.control_panel_ip = None
-        self.predecessor_ip = None
-        self.successor_ip = None
-        self.tail_ip = None
-        self.head_ip = None
-        self.role = None
-        self.process_server = None
-        self.state = ProcessState.INITIALIZED
-
-    # In local_store_ps, the processes are first created and then during chain creation they are initialized
-    def initialize(self, controlPanel, predecessor, successor, head, tail, role):
-        self.control_panel_ip = controlPanel
-        self.predecessor_ip = predecessor
-        self.successor_ip = successor
-        self.tail_ip = tail
-        self.head_ip = head
-        self.role = ProcessRole(role)
-    
-    def Initialize(self, request, context):
-        self.initialize(self.control_panel_ip, request.predecessorIP,
-                           request.successorIP, request.headIP, request.tailIP, request.role)
-        print(f"Process {request.processID} initialized")
-        self.state = ProcessState.CHAIN_CREATED  # even if one processes is initialized, consider the chain created
-        return Empty()
-    
-    def Clear(self, request, context):
-        print("Clearing...")
-        self.state = ProcessState.INACTIVE
-        self.db = {}
-        self.last_write_operations = deque([], maxlen=5)
-        self.num_write_operations = 0
-        self.process_server.stop(0)
-
-        return Empty()
-
-    def Write(self, request, context):
-        print(f"Write is in role {self.role} in {self.name}")
-        time.sleep(request.timeout)
-        self.num_write_operations += 1
-        self.last_write_operations.append((request.key, request.value))
-        if self.role == ProcessRole.TAIL:
-            self.db[request.key] = (request.value, 'clean')
-        else:
-
-            with grpc.insecure_channel(self.successor_ip) as channel:
-                stub = process_pb2_grpc.ProcessStub(channel)
-                self.db[request.key] = (request.value, 'dirty')
-                stub.Write(request)
-                self.db[request.key] = (request.value, 'clean')
-        return Empty()
-
-    def Read(self, request, context):
-        if request.key in self.db:
-            if self.db[request.key][1] == 'clean':
-                return process_pb2.ReadResponse(value=float(self.db[request.key][0]), success=True)
-            else:
-                with grpc.insecure_channel(self.tail_ip) as channel:
-                    stub = process_pb2_grpc.ProcessStub(channel)
-                    return stub.Read(request)
-        else:
-            return process_pb2.ReadResponse(value=float(0.1), success=False)
-
-    def ListBooks(self, request, context):
-        book_lists = dict()
-        if self.role == ProcessRole.TAIL:
-            for key, value in self.db.items():
-                book_lists[key] = value[0]
-        else:
-            with grpc.insecure_channel(self.tail_ip) as channel:
-                stub = process_pb2_grpc.ProcessStub(channel)
-                for key, value in self.db.items():
-                    if value[1] == 'clean':
-                        book_lists[key] = value[0]
-                    else:
-                        resp = stub.Read(process_pb2.ReadRequest(key=key))
-                        if resp.value is not None:
-                            book_lists[key] = resp.value
-        return process_pb2.BookList(books=book_lists)
-
-    def DataStatus(self, request, context):
-        status = dict()
-        for key, value in self.db.items():
-            status[key] = value[1]
-        return process_pb2.StatusResponse(status=status)
-
-    def SetPredecessorIP(self, request, context):
-        self.predecessor_ip = request.ip
-        return Empty()
-
-    def SetHeadIP(self, request, context):
-        self.head_ip = request.ip
-        return Empty()
-
-    def SetRole(self, request, context):
-        new_role = ProcessRole(request.role)
-        self.role = new_role
-        return Empty()
-
-    def GetNumericalDeviation(self, request, context):
-        return process_pb2.NumericalDeviation(deviation=self.num_write_operations)
-
-    def Reconcile(self, request, context):
-        max_deviation = len(self.last_write_operations)
-        with grpc.insecure_channel(request.targetIP) as channel:
-            stub = process_pb2_grpc.ProcessStub(channel)
-            deviation = stub.GetNumericalDeviation(
-                process_pb2.NumericalDeviationRequest(processID=request.targetProcessID)
-            ).deviation
-            diff = self.num_write_operations - deviation
-            assert 0 <= diff <= max_deviation
-            for i in range(max_deviation - diff, max_deviation):
-                key, value = self.last_write_operations[i]
-                stub.RawWrite(process_pb2.RawWriteRequest(processID=request.targetProcessID, key=key, value=value))
-        return Empty()
-
-    def RawWrite(self, request, context):
-        self.db[request.key] = request.value
-        return Empty()
-    
-    def run(self):
-        if self.control_panel_ip is None:
-            print(f"Control Panel is None for {self.name}. Stopping...")
-            return
-        if self.role == ProcessRole.HEAD and (
-                self.predecessor_ip is not None or self.successor_ip is None or self.tail_ip is None):
-            print(f"Head process incorrectly initialized. Stopping...")
-            return
-        if self.role == ProcessRole.TAIL and (
-                self.predecessor_ip is None or self.successor_ip is not None or self.tail_ip is not None):
-            print(f"Tail process incorrectly initialized. Stopping...")
-            return
-        if self.role == ProcessRole.NONE and (
-                self.predecessor_ip is None or self.successor_ip is None or self.tail_ip is None):
-            print(f"Process incorrectly initialized. Stopping...")
-            return
-        if self.role == ProcessRole.DISABLED:
-            print(f"Process {self.name} is disabled. Requests will not be processed")
-        print(f"Process {self.name} started with role {self.role}")
+        self.ip = ip
+        self.shared_state = context.Value("i", ProcessState.INITIALIZED.value, lock=False)
+        ready = context.Event()
+        self.process_server = context.Process(target=run_child_process, name=name, daemon=True,
+                                              args=(name, ip, engine, self.shared_state, ready))
+        self.stopping = False
+        self.process_server.start()
+        while not ready.wait(0.1):
+            if not self.process_server.is_alive():
+                raise RuntimeError(f"Process {name} failed to start (exit code {self.process_server.exitcode})")
+
+    @property
+    def state(self):
+        if not self.process_server.is_alive():
+            return ProcessState.INACTIVE
+        return ProcessState(self.shared_state.value)
+
+    # True if the child has exited without being cleared or stopped
+    def crashed(self):
+        return (not self.stopping and not self.process_server.is_alive()
+                and self.shared_state.value != ProcessState.INACTIVE.value)
+
+    # Waits for the child to exit after Clear, stops it if it does not
+    def join(self, timeout=5):
+        self.stopping = True
+        self.process_server.join(timeout)
+        if self.process_server.is_alive():
+            self.stop_server()
+
+    # SIGTERM lets the child stop its server and flush its write-ahead log, SIGKILL is the last resort
+    def stop_server(self, timeout=5):
+        self.stopping = True
+        if self.process_server.is_alive():
+            self.process_server.terminate()
+            self.process_server.join(timeout)
+        if self.process_server.is_alive():
+            self.process_server.kill()
+            self.process_server.join()
 
 
 # In our case, a node will be a process on a machine
 class Node():
-    def __init__(self, name, ip, control_panel_ip):
+    # engine is "thread" (a thread-pool gRPC server per process) or "aio" (grpc.aio servers on one event loop).
+    # With multiprocess every process is served by a child OS process instead of a thread of the node
+    def __init__(self, name, ip, control_panel_ip, engine="thread", multiprocess=False):
         self.name = name
         self.ip = ip
         self.control_panel_ip = control_panel_ip
+        self.engine = engine
+        self.multiprocess = multiprocess
+        self.event_loop_thread = EventLoopThread() if engine == "aio" and not multiprocess else None
         self.processes = {}
+        if multiprocess:
+            threading.Thread(target=self.monitor_children, daemon=True).start()
+        self.client = None  # created once the chain exists
         self.cmds = {
             'Local-store-ps': self.local_store_ps,
             'Create-chain': self.create_chain,
+            'Extend-chain': self.extend_chain,
+            'Add-chain': self.add_chain,
+            'Rebalance': self.rebalance,
             'List-chain': self.list_chain,
             'Clear': self.clear,
             'Remove-head': self.remove_head,
             'Restore-head': self.restore_head,
+            'Anti-entropy': self.anti_entropy,
             'Write-operation': self.write_operation,
+            'Write-batch': self.write_batch,
             'Read-operation': self.read_operation,
             'List-books': self.list_books,
-            'Data-status': self.data_status
+            'Data-status': self.data_status,
+            'Stats': self.stats
         }
         # self.cmds = {'l': self.local_store_ps,
         #              'w': self.write_operation,
@@ -216,22 +179,57 @@ class Node():
             return
         self.processes = {}
         for i in range(n):
-            name = f"{self.name}-ps{i}"
-            process = Process(name)
-            process.ip = self.ip.split(":")[0] + f":{int(self.ip.split(':')[-1]) + i + 1}"
+            self.start_process(i)
 
-            server = grpc.server(futures.ThreadPoolExecutor(max_workers=2))
-            process_pb2_grpc.add_ProcessServicer_to_server(process, server)
-            server.add_insecure_port(f"[::]:{process.ip.split(':')[-1]}")
-            server.start()
-            process.process_server = server
+    # Adds a process to the running chain as its new tail
+    def extend_chain(self):
+        if len(self.processes) == 0 or self.processes[next(iter(self.processes))].state != ProcessState.CHAIN_CREATED:
+            print("Chain has not been created yet. "
+                  "Please create a chain with Create-chain command")
+            return
+        self.start_process(len(self.processes))
 
-            with grpc.insecure_channel(self.control_panel_ip) as channel:
-                stub = control_panel_pb2_grpc.ControlPanelStub(channel)
-                req = control_panel_pb2.NameIP(name=name, ip=process.ip)
-                stub.AddProcess(req)
+    # Starts n processes and makes them a new chain, which takes over its share of the books
+    def add_chain(self, n):
+        n = int(n)
+        if len(self.processes) == 0 or self.processes[next(iter(self.processes))].state != ProcessState.CHAIN_CREATED:
+            print("Chain has not been created yet. "
+                  "Please create a chain with Create-chain command")
+            return
+        start = len(self.processes)
+        processes = [self.start_process(i, register=False) for i in range(start, start + n)]
+        with grpc.insecure_channel(self.control_panel_ip) as channel:
+            stub = control_panel_pb2_grpc.ControlPanelStub(channel)
+            chain = stub.AddChain(control_panel_pb2.AddChainRequest(
+                processes=[control_panel_pb2.NameIP(name=p.name, ip=p.ip) for p in processes],
+                weight=1,
+            ))
+        print(f"Chain {' -> '.join(p.name for p in chain.processes)} added")
+
+    # Sets the weight of every chain on the hash ring, e.g. "Rebalance 1,1,2", and moves the books accordingly
+    def rebalance(self, weights):
+        weights = [int(weight) for weight in weights.split(',')]
+        with grpc.insecure_channel(self.control_panel_ip) as channel:
+            stub = control_panel_pb2_grpc.ControlPanelStub(channel)
+            stub.Rebalance(control_panel_pb2.RebalanceRequest(weights=weights))
+
+    # Starts the server of the i-th process of this node and registers it with the control panel
+    def start_process(self, i, register=True):
+        name = f"{self.name}-ps{i}"
+        ip = self.ip.split(":")[0] + f":{int(self.ip.split(':')[-1]) + i + 1}"
+        if self.multiprocess:
+            process = ChildProcess(name, ip, self.engine)
+        else:
+            process = serve_process(name, ip, self.engine, self.event_loop_thread)
+        self.processes[name] = process
+        if not register:
+            return process
 
-            self.processes[name] = process
+        with grpc.insecure_channel(self.control_panel_ip) as channel:
+            stub = control_panel_pb2_grpc.ControlPanelStub(channel)
+            req = control_panel_pb2.NameIP(name=name, ip=process.ip)
+            stub.AddProcess(req)
+        return process
 
     def create_chain(self):
         if len(self.processes) == 0 or self.processes[next(iter(self.processes))].state == ProcessState.INACTIVE:
@@ -261,18 +259,40 @@ class Node():
         with grpc.insecure_channel(self.control_panel_ip) as channel:
             stub = control_panel_pb2_grpc.ControlPanelStub(channel)
             stub.Clear(Empty())
+        if self.multiprocess:
+            for process in self.processes.values():
+                process.join()
+
+    # Reports child processes that have died, e.g. killed by the OS. The control panel's failure detector
+    # splices them out of their chain
+    def monitor_children(self):
+        while True:
+            time.sleep(1)
+            for process in list(self.processes.values()):
+                if process.crashed():
+                    print(f"Process {process.name} ({process.ip}) exited with code {process.process_server.exitcode}")
+                    process.stopping = True
+
+    def remove_head(self, chain=0):
+        with grpc.insecure_channel(self.control_panel_ip) as channel:
+            stub = control_panel_pb2_grpc.ControlPanelStub(channel)
+            stub.RemoveHead(control_panel_pb2.ChainRequest(chain=int(chain)))
 
-    def remove_head(self):
+    def restore_head(self, chain=0):
         with grpc.insecure_channel(self.control_panel_ip) as channel:
             stub = control_panel_pb2_grpc.ControlPanelStub(channel)
-            stub.RemoveHead(Empty())
+            stub.RestoreHead(control_panel_pb2.ChainRequest(chain=int(chain)))
 
-    def restore_head(self):
+    # Repairs the processes of the chain whose books differ from their predecessor's
+    def anti_entropy(self, chain=0):
         with grpc.insecure_channel(self.control_panel_ip) as channel:
             stub = control_panel_pb2_grpc.ControlPanelStub(channel)
-            stub.RestoreHead(Empty())
+            report = stub.AntiEntropy(control_panel_pb2.ChainRequest(chain=int(chain)))
+        print(f"{report.divergent_leaves} divergent leaves, {report.repaired} books repaired, "
+              f"{report.removed} removed")
 
-    def write_operation(self, bp_pair, timeout):
+    # The timeout is the deadline of the write in seconds, CLIENT_TIMEOUT by default
+    def write_operation(self, bp_pair, timeout=0):
         if self.processes[next(iter(self.processes))].state != ProcessState.CHAIN_CREATED:
             print("Chain has not been created yet. "
                   "Please create a chain with Create-chain command")
@@ -291,14 +311,35 @@ class Node():
         bname = bname.strip('""')
         try:
             price = float(price)
-            timeout = int(timeout)
+            timeout = float(timeout)
         except Exception as e:
             print(e)
             print("Invalid input")
             return
-        with grpc.insecure_channel(self.processes[next(iter(self.processes))].head_ip) as channel:
-            stub = process_pb2_grpc.ProcessStub(channel)
-            stub.Write(process_pb2.WriteRequest(key=bname, value=price, timeout=timeout))
+        self.get_client().write(bname, price, timeout or None)
+
+    # Streams "book name,price" rows from a CSV file to the heads in batches of WRITE_BATCH_SIZE
+    def write_batch(self, path):
+        if self.processes[next(iter(self.processes))].state != ProcessState.CHAIN_CREATED:
+            print("Chain has not been created yet. "
+                  "Please create a chain with Create-chain command")
+            return
+        batch_size = int(os.environ.get("WRITE_BATCH_SIZE", 1000))
+        try:
+            with open(path.strip(), newline='') as f:
+                count = import_books(self.get_client(), read_books(f, FileFormat.CSV), batch_size)
+        except (OSError, ValueError, IndexError) as e:
+            print(e)
+            print("Invalid input")
+            return
+        print(f"Written {count} books in {(count + batch_size - 1) // batch_size} batches")
+
+    # The client follows the topology of the chains: writes go to the head of the book's chain and reads are spread
+    # over its replicas
+    def get_client(self):
+        if self.client is None:
+            self.client = Client(self.control_panel_ip)
+        return self.client
 
     def read_operation(self, bname):
         if self.processes[next(iter(self.processes))].state != ProcessState.CHAIN_CREATED:
@@ -307,21 +348,17 @@ class Node():
             return
         # NO SPACES IN INPUT
         bname = bname.strip('" ')
-        ip = self.processes[next(iter(self.processes))].ip
-        with grpc.insecure_channel(ip) as channel:
-            stub = process_pb2_grpc.ProcessStub(channel)
-            response = stub.Read(process_pb2.ReadRequest(key=bname))
-            if response.success:
-                print(f"Book name: {bname}, price: {round(response.value, 2)} EUR")
-            else:
-                print("Not yet in the stock")
-
-    def list_books(self):
-        with grpc.insecure_channel(self.processes[next(iter(self.processes))].ip) as channel:
-            stub = process_pb2_grpc.ProcessStub(channel)
-            response = stub.ListBooks(Empty())
-            for b,p in response.books.items():
-                print(f"Book name: {b}, price: {round(p, 2)} EUR")
+        value = self.get_client().read(bname)
+        if value is not None:
+            print(f"Book name: {bname}, price: {round(value, 2)} EUR")
+        else:
+            print("Not yet in the stock")
+
+    # Prints the books page by page as they are streamed, optionally only the names starting with a prefix
+    def list_books(self, prefix=''):
+        page_size = int(os.environ.get("LIST_BOOKS_PAGE_SIZE", 100))
+        for book in self.get_client().list_books(prefix.strip('"'), page_size):
+            print(f"Book name: {book.name}, price: {round(book.price, 2)} EUR")
 
     def data_status(self, pname):
         # NO SPACES IN INPUT
@@ -335,14 +372,32 @@ class Node():
                 response = stub.DataStatus(Empty())
                 print(response.status)
 
+    # Metrics of the process, or of the control panel without a name, in the Prometheus text format
+    def stats(self, pname=None):
+        if pname is None:
+            with grpc.insecure_channel(self.control_panel_ip) as channel:
+                response = control_panel_pb2_grpc.ControlPanelStub(channel).Stats(Empty())
+            print(prometheus_text(response, {"process": "control_panel"}), end="")
+            return
+        if pname not in self.processes:
+            print("Invalid input")
+            return
+        with grpc.insecure_channel(self.processes[pname].ip) as channel:
+            response = process_pb2_grpc.ProcessStub(channel).Stats(Empty())
+        print(prometheus_text(response, {"process": pname}), end="")
+
     def handle_input(self, inp):
         inp = inp.strip().split(' ')
         try:
             self.cmds[inp[0]](*inp[1:])
         except KeyError:
             print('Invalid command.')
-        except TypeError:
+        except (TypeError, ValueError):
             print('Invalid arguments to the command.')
+        except grpc.RpcError as e:
+            print(f"Request failed: {e.details()}")
+        except NoChainError as e:
+            print(e)
 
     @staticmethod
     def print_help():
@@ -350,23 +405,71 @@ class Node():
 Commands:
     Local-store-ps <number of processes>
     Create-chain
+    Extend-chain
+    Add-chain <number of processes>
+    Rebalance <weight of every chain, e.g. 1,1,2>
     List-chain
     Clear
-    Remove-head
-    Restore-head
-    Write-operation <book name, price> <timeout>
+    Remove-head [chain]
+    Restore-head [chain]
+    Anti-entropy [chain]
+    Write-operation <book name, price> [timeout]
+    Write-batch <csv file with book name,price rows>
     Read-operation <book name>
     Data-status <process name>
-    List-books
+    List-books [book name prefix]
+    Stats [process name]
     ''')
 
 
+# Non-interactive import and export of the catalog through the chains of the control panel in CONTROL_PANEL_IP
+def run_bulk(argv):
+    parser = argparse.ArgumentParser(prog="node.py")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="write the books of a CSV or JSONL file through the heads")
+    importer.add_argument("file")
+    importer.add_argument("--format", choices=[f.value for f in FileFormat], help="by default from the extension")
+    importer.add_argument("--batch-size", type=int, default=int(os.environ.get("WRITE_BATCH_SIZE", 1000)))
+    importer.add_argument("--max-in-flight", type=int, default=4, help="batches sent and not acknowledged yet")
+    exporter = commands.add_parser("export", help="write a snapshot of the books from the tails to a file")
+    exporter.add_argument("file")
+    exporter.add_argument("--format", choices=[f.value for f in FileFormat], help="by default from the extension")
+    exporter.add_argument("--page-size", type=int, default=10000, help="books per streamed page")
+    args = parser.parse_args(argv)
+    client = Client(os.environ["CONTROL_PANEL_IP"], watch=False)
+    start = time.perf_counter()
+    try:
+        if args.command == "import":
+            with open(args.file, newline="") as f:
+                books = read_books(f, file_format(args.file, args.format))
+                count = import_books(client, books, args.batch_size, args.max_in_flight)
+        else:
+            with open(args.file, "w", newline="") as f:
+                count = export_books(client, f, file_format(args.file, args.format), args.page_size)
+    finally:
+        client.close()
+    seconds = time.perf_counter() - start
+    print(f"{args.command.capitalize()}ed {count} books in {seconds:.1f}s ({count / seconds:.0f} books/s)")
+
+
 if __name__ == '__main__':
-    name = f"Node{sys.argv[1]}"
+    if sys.argv[1:2] in (["import"], ["export"]):
+        configure_logging()
+        run_bulk(sys.argv[1:])
+        sys.exit()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("node_id")
+    parser.add_argument("--engine", choices=["thread", "aio"], default="thread",
+                        help="gRPC server used by the processes of this node")
+    parser.add_argument("--multiprocess", action="store_true",
+                        help="serve every process of this node from its own OS process")
+    args = parser.parse_args()
+    configure_logging()
+    name = f"Node{args.node_id}"
     ip = os.environ[f"{name}_IP"]
     port = ip.split(":")[-1]
-    print(f"Starting node {name} with ip {ip}")
-    n = Node(name, ip, os.environ["CONTROL_PANEL_IP"])
+    print(f"Starting node {name} with ip {ip} ({args.engine} engine{', multiprocess' if args.multiprocess else ''})")
+    n = Node(name, ip, os.environ["CONTROL_PANEL_IP"], args.engine, args.multiprocess)
     n.print_help()
 
     while True:
@@ -377,9 +480,11 @@ if __name__ == '__main__':
                 continue
             n.handle_input(inp)
         except KeyboardInterrupt:
+            if n.client is not None:
+                n.client.close()
             for process in n.processes.values():
                 if process.process_server:
-                    process.process_server.stop(0)
+                    process.stop_server()
             exit()
     for process in n.processes.values():
-        process.process_server.stop(0)
+        process.stop_server()
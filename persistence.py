@@ -0,0 +1,188 @@
+import mmap
+import os
+import struct
+import threading
+import zlib
+from enum import Enum
+
+
+class FsyncPolicy(Enum):
+    ALWAYS = 'always'  # fsync after every logged batch
+    GROUP = 'group'  # a background thread fsyncs the log every few milliseconds
+    OFF = 'off'  # only flush to the OS page cache
+
+
+# Kinds of log records
+WRITE = 0
+COALESCED = 1  # writes coalesced away by group commit, the count is stored in the seq field
+SNAPSHOT = 2  # yielded for entries loaded from the snapshot, never written to the log
+DELETE = 3  # key moved to another chain by a rebalance, seq and value are unused
+
+# Log record: crc32 of the rest, kind, seq, value (float32 like the proto), key length, then the utf-8 key
+RECORD = struct.Struct("<IBQfH")
+# Snapshot entry: seq, value, key length, then the utf-8 key
+ENTRY = struct.Struct("<QfH")
+# Snapshot header: magic, log generation it covers, last seq, number of write operations, number of entries
+HEADER = struct.Struct("<4sIQQQ")
+MAGIC = b"CRSN"
+
+
+# Append-only write-ahead log of the writes applied by a process plus periodic compacted snapshots.
+# Logs are split in generations: a snapshot of generation g contains everything logged before wal.g,
+# so recovery loads the snapshot and replays only wal.g and newer
+class DurableStorage:
+    def __init__(self, directory, fsync_policy=FsyncPolicy.GROUP, snapshot_every=100000, group_interval=0.005):
+        self.directory = directory
+        self.fsync_policy = fsync_policy
+        self.snapshot_every = snapshot_every
+        self.group_interval = group_interval
+        self.generation = 0
+        self.records_since_snapshot = 0
+        self.log = None
+        self.lock = threading.Lock()
+        self.unsynced = False
+        self.snapshot_thread = None
+        os.makedirs(directory, exist_ok=True)
+        if fsync_policy == FsyncPolicy.GROUP:
+            self.closed = threading.Event()
+            threading.Thread(target=self.sync_periodically, daemon=True).start()
+
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    def log_generations(self):
+        return sorted(int(name.split(".")[1]) for name in os.listdir(self.directory) if name.startswith("wal."))
+
+    # Returns (last seq, number of write operations, iterator of (kind, seq, key, value)) and opens the log for
+    # appending. The iterator has to be consumed before new records are appended
+    def recover(self):
+        last_seq, num_writes, entries, generation = 0, 0, iter(()), 0
+        if os.path.exists(self.path("snapshot")):
+            generation, last_seq, num_writes, entries = self.load_snapshot()
+        generations = [g for g in self.log_generations() if g >= generation]
+        self.generation = generations[-1] if generations else generation
+        self.log = open(self.path(f"wal.{self.generation}"), "ab")
+        return last_seq, num_writes, self.replay(entries, generations)
+
+    def replay(self, snapshot_entries, generations):
+        yield from snapshot_entries
+        for generation in generations:
+            path = self.path(f"wal.{generation}")
+            with open(path, "rb") as f:
+                data = f.read()
+            offset = 0
+            while offset < len(data):
+                end = offset + RECORD.size
+                if end <= len(data):
+                    crc, kind, seq, value, key_length = RECORD.unpack_from(data, offset)
+                    end += key_length
+                if end > len(data) or zlib.crc32(data[offset + 4:end]) != crc:
+                    # Torn write at the end of the log: cut it off so that new records follow the last valid one
+                    os.truncate(path, offset)
+                    break
+                key = data[offset + RECORD.size:end].decode()
+                offset = end
+                self.records_since_snapshot += 1
+                yield kind, seq, key, value
+
+    # The snapshot is memory-mapped, so entries are decoded straight from the page cache
+    def load_snapshot(self):
+        with open(self.path("snapshot"), "rb") as f:
+            snapshot = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, generation, last_seq, num_writes, count = HEADER.unpack_from(snapshot, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path('snapshot')} is not a snapshot")
+
+        def entries():
+            offset = HEADER.size
+            for _ in range(count):
+                seq, value, key_length = ENTRY.unpack_from(snapshot, offset)
+                offset += ENTRY.size
+                key = snapshot[offset:offset + key_length].decode()
+                offset += key_length
+                yield SNAPSHOT, seq, key, value
+            snapshot.close()
+
+        return generation, last_seq, num_writes, entries()
+
+    # Appends (kind, seq, key, value) records. The caller serializes appends (Process holds its write lock)
+    def append(self, records):
+        data = bytearray()
+        for kind, seq, key, value in records:
+            key = key.encode()
+            body = RECORD.pack(0, kind, seq, value, len(key))[4:] + key
+            data += struct.pack("<I", zlib.crc32(body)) + body
+        with self.lock:
+            self.log.write(data)
+            self.log.flush()
+            if self.fsync_policy == FsyncPolicy.ALWAYS:
+                os.fsync(self.log.fileno())
+            else:
+                self.unsynced = True
+        self.records_since_snapshot += len(records)
+
+    def sync_periodically(self):
+        while not self.closed.wait(self.group_interval):
+            with self.lock:
+                if self.unsynced and self.log is not None:
+                    os.fsync(self.log.fileno())
+                    self.unsynced = False
+
+    def needs_snapshot(self):
+        return self.records_since_snapshot >= self.snapshot_every and self.snapshot_thread is None
+
+    # Starts a new log generation and writes the snapshot of items ((key, seq, value) covering everything logged
+    # so far) in the background. Older generations are deleted once the snapshot is in place
+    def snapshot(self, items, last_seq, num_writes):
+        with self.lock:
+            if self.fsync_policy != FsyncPolicy.OFF:
+                os.fsync(self.log.fileno())
+            self.log.close()
+            self.generation += 1
+            self.log = open(self.path(f"wal.{self.generation}"), "ab")
+            self.records_since_snapshot = 0
+        self.snapshot_thread = threading.Thread(
+            target=self.write_snapshot, args=(items, self.generation, last_seq, num_writes), daemon=True)
+        self.snapshot_thread.start()
+
+    def write_snapshot(self, items, generation, last_seq, num_writes):
+        tmp_path = self.path("snapshot.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, generation, last_seq, num_writes, len(items)))
+            for key, seq, value in items:
+                key = key.encode()
+                f.write(ENTRY.pack(seq, value, len(key)))
+                f.write(key)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path("snapshot"))
+        for old_generation in self.log_generations():
+            if old_generation < generation:
+                os.remove(self.path(f"wal.{old_generation}"))
+        self.snapshot_thread = None
+
+    # Deletes the log and the snapshot, e.g. when the chain is cleared
+    def reset(self):
+        if self.snapshot_thread is not None:
+            self.snapshot_thread.join()
+        with self.lock:
+            if self.log is not None:
+                self.log.close()
+            for name in os.listdir(self.directory):
+                os.remove(self.path(name))
+            self.generation = 0
+            self.records_since_snapshot = 0
+            self.unsynced = False
+            self.log = open(self.path("wal.0"), "ab")
+
+    def close(self):
+        if self.fsync_policy == FsyncPolicy.GROUP:
+            self.closed.set()
+        if self.snapshot_thread is not None:
+            self.snapshot_thread.join()
+        with self.lock:
+            if self.log is not None:
+                if self.fsync_policy != FsyncPolicy.OFF:
+                    os.fsync(self.log.fileno())
+                self.log.close()
+                self.log = None
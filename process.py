@@ -0,0 +1,1205 @@
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict, deque, OrderedDict
+from contextlib import contextmanager
+from enum import Enum
+from itertools import islice
+
+import grpc
+from dotenv import load_dotenv
+
+from channel_pool import ChannelPool, add_channel_gauges
+from merkle import DEFAULT_DEPTH, DEFAULT_FANOUT, MerkleTree
+from metrics import Metrics
+from persistence import DurableStorage, FsyncPolicy, WRITE, COALESCED, SNAPSHOT, DELETE
+from read_cache import ReadCache
+from sharding import HashRing
+from store import SortedKeyIndex, new_store
+from protos import process_pb2, process_pb2_grpc
+from google.protobuf.empty_pb2 import Empty
+
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# grpc reports this much time remaining (about 292 years) for a call without a deadline
+NO_DEADLINE = 10 ** 9
+RESEND_BACKOFF = 0.1  # seconds, doubled after every failed attempt to re-send a batch, up to RESEND_MAX_BACKOFF
+RESEND_MAX_BACKOFF = 5
+
+
+class ProcessState(Enum):
+    INITIALIZED = 1
+    INACTIVE = 2
+    CHAIN_CREATED = 3
+
+
+class ProcessRole(Enum):
+    NONE = 1
+    HEAD = 2
+    TAIL = 3
+    DISABLED = 4
+
+
+# Writes that reached the head within one group-commit window. The first writer of the group (the leader)
+# propagates the whole group and wakes up the others
+class WriteGroup:
+    def __init__(self):
+        self.writes = []
+        self.deadlines = []  # of every writer, None for the ones without a deadline
+        self.done = threading.Event()
+        self.error = None
+
+    # The group is propagated for as long as any of its writers waits for it
+    @property
+    def deadline(self):
+        return None if None in self.deadlines else max(self.deadlines)
+
+
+# Raised at the head for a write to a book that the hash ring maps to another chain
+class WrongChainError(Exception):
+    pass
+
+
+# Raised when a write is not committed before the deadline of the client's call
+class DeadlineExceededError(Exception):
+    pass
+
+
+# Absolute time.monotonic() deadline of the call, None if the caller has not set one
+def deadline_of(context):
+    remaining = context.time_remaining()
+    if remaining is None or remaining > NO_DEADLINE:
+        return None
+    return time.monotonic() + remaining
+
+
+# Seconds left until the deadline, None without a deadline
+def time_left(deadline):
+    return None if deadline is None else max(deadline - time.monotonic(), 0)
+
+
+# Status code and details of an error raised while writing, returned to the caller of Write or WriteBatch
+def error_status(error):
+    if isinstance(error, WrongChainError):
+        return grpc.StatusCode.FAILED_PRECONDITION, str(error)
+    if isinstance(error, DeadlineExceededError):
+        return grpc.StatusCode.DEADLINE_EXCEEDED, str(error)
+    if isinstance(error, grpc.FutureCancelledError):
+        return grpc.StatusCode.CANCELLED, "The write was cancelled"
+    return error.code(), error.details()
+
+
+# Workers of the thread engine's server kept free of client writes waiting for their commit in pipelined mode,
+# for the commit acks, the replication stream and the control RPCs
+RESERVED_WORKERS = 4
+
+# Errors a write reports to its caller with error_status
+WRITE_ERRORS = (WrongChainError, DeadlineExceededError, grpc.RpcError, grpc.FutureCancelledError)
+
+# Status codes of a forward after which the write waits for the control panel to replace the successor and sends it
+# again. A successor killed during the call often fails it as CANCELLED rather than UNAVAILABLE
+FAILOVER_CODES = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.CANCELLED)
+
+
+class WriteMode(Enum):
+    SYNC = 'sync'  # every hop waits for the rest of the chain before returning
+    PIPELINED = 'pipelined'  # hops forward asynchronously, the tail acks commits back upstream
+
+
+# In our case, a process will be a thread on a node
+class Process(process_pb2_grpc.ProcessServicer):
+    def __init__(self, name):
+        super().__init__()
+        self.name = name
+        self.db = new_store()  # book name -> KeyRecord, or a compact store with STORE_BACKEND=compact
+        self.key_index = SortedKeyIndex()  # sorted keys of db, used for paginated and prefix listing
+        # Hash tree of db, compared with the predecessor's by AntiEntropy to find the books that differ
+        self.tree_fanout = int(os.environ.get("ANTI_ENTROPY_TREE_FANOUT", DEFAULT_FANOUT))
+        self.tree_depth = int(os.environ.get("ANTI_ENTROPY_TREE_DEPTH", DEFAULT_DEPTH))
+        self.tree = MerkleTree(self.tree_fanout, self.tree_depth)
+        # Stores the last RECONCILE_LOG_SIZE write operations (key, value, seq) performed on the db.
+        # Used to reconcile a restored head: the log holds every write with seq > log_start_seq it has not evicted
+        self.reconcile_log_size = int(os.environ.get("RECONCILE_LOG_SIZE", 100000))
+        self.reconcile_chunk_size = int(os.environ.get("RECONCILE_CHUNK_SIZE", 1000))
+        self.last_write_operations = deque([], maxlen=self.reconcile_log_size)
+        self.log_start_seq = 0
+        # Number of writes ever appended to the log. A write's position stays valid once the log is cleared
+        # or the write is evicted, so a reconcile can resume from the writes applied after a given point
+        self.log_appended = 0
+        # Number of write operations performed on the db.
+        # Used as numerical deviation during head restoration
+        self.num_write_operations = 0
+        self.ip = None
+        self.control_panel_ip = None
+        self.predecessor_ip = None
+        self.successor_ip = None
+        self.tail_ip = None
+        self.head_ip = None
+        self.role = None
+        # Hash ring of the store and the chain of this process, set by the control panel. The head only accepts
+        # writes to the books of its chain. None until the control panel has created the chains
+        self.ring = None
+        self.chain = 0
+        self.process_server = None
+        self.state = ProcessState.INITIALIZED
+        # Persistent channels to the other processes, rebuilt whenever the topology changes
+        self.channels = ChannelPool()
+        self.write_mode = WriteMode(os.environ.get("WRITE_MODE", WriteMode.SYNC.value))
+        # Highest sequence number applied on this process. The head assigns seq = last_seq + 1
+        self.last_seq = 0
+        self.write_lock = threading.Lock()
+        # Pipelined mode: batches applied here but not yet committed by the tail (seq of the last write -> batch),
+        # clients waiting at the head for their commit (seq -> Event),
+        # and queues drained by the forwarding / commit-ack threads
+        self.in_flight = OrderedDict()
+        self.in_flight_started = {}  # seq -> time the head or hop applied the batch, for replication latency
+        self.commit_waiters = {}  # seq -> waiters
+        self.forward_queue = queue.Queue()
+        self.commit_queue = queue.Queue()
+        self.replication_threads = []
+        self.replication_call = None  # the open Replicate stream to the successor
+        # How long a write waits for the control panel to splice a failed successor out of the chain
+        self.failover_wait = float(os.environ.get("FAILOVER_WAIT_MS", 10000)) / 1000
+        # Sync mode: batches whose forward to the successor failed (deadline, cancellation, successor down), re-sent
+        # by a background thread until the rest of the chain has them
+        self.unforwarded = queue.Queue()
+        self.resend_thread = None
+        # Ids of the last IDEMPOTENCY_CACHE_SIZE writes applied here -> their seq. Every hop keeps them, so a write
+        # sent again by a client or a predecessor is not applied twice, also after the head has changed
+        self.idempotency_cache_size = int(os.environ.get("IDEMPOTENCY_CACHE_SIZE", 100000))
+        self.applied_ids = OrderedDict()
+        # Group commit: concurrent writes reaching the head within the window are propagated as one batch.
+        # Disabled when the max batch size is 1
+        self.group_commit_max_batch = int(os.environ.get("GROUP_COMMIT_MAX_BATCH", 1))
+        self.group_commit_max_wait = float(os.environ.get("GROUP_COMMIT_MAX_WAIT_MS", 5)) / 1000
+        self.group_cond = threading.Condition()
+        self.write_group = WriteGroup()
+        # Thread engine, pipelined mode: the client writes that may wait at the head at a time. Each holds a worker
+        # of the server until the commit ack of the successor comes back, which needs a worker as well. None when
+        # unlimited, set by the node from the size of the pool with limit_waiting_writes
+        self.write_slots = None
+        # Sync mode: batches being forwarded to the successor
+        self.forwarding = 0
+        self.metrics = Metrics()
+        self.metrics.gauge("books", lambda: len(self.db))
+        self.metrics.gauge("dirty_books", lambda: self.db.dirty_count())
+        self.metrics.gauge("in_flight_batches", lambda: len(self.in_flight) + self.forwarding)
+        self.metrics.gauge("last_seq", lambda: self.last_seq)
+        self.metrics.gauge("tail_seq_gap", self.tail_seq_gap)
+        add_channel_gauges(self.metrics, self.channel_pools)
+        # Optional LRU cache of the committed values of up to READ_CACHE_SIZE dirty books read from the tail, served
+        # for READ_CACHE_LEASE_MS milliseconds. Disabled when the size is 0
+        self.read_cache = None
+        read_cache_size = int(os.environ.get("READ_CACHE_SIZE", 0))
+        if read_cache_size:
+            lease = float(os.environ.get("READ_CACHE_LEASE_MS", 50)) / 1000
+            self.read_cache = ReadCache(read_cache_size, lease, self.metrics)
+            self.metrics.gauge("read_cache_books", lambda: len(self.read_cache))
+        # Optional write-ahead log and snapshots in DATA_DIR/<process name>, replayed when the process starts.
+        # Last, as replaying it goes through write_record and drop_record, which use the state above
+        self.storage = None
+        if os.environ.get("DATA_DIR"):
+            self.storage = DurableStorage(
+                os.path.join(os.environ["DATA_DIR"], name),
+                FsyncPolicy(os.environ.get("FSYNC_POLICY", FsyncPolicy.GROUP.value)),
+                int(os.environ.get("SNAPSHOT_EVERY", 100000)),
+            )
+            self.recover()
+
+    def recover(self):
+        start = time.perf_counter()
+        last_seq, num_writes, entries = self.storage.recover()
+        for kind, seq, key, value in entries:
+            if kind == COALESCED:
+                num_writes += seq
+                continue
+            if kind == DELETE:
+                self.drop_record(key)
+                continue
+            self.write_record(key, value, seq, True)
+            last_seq = max(last_seq, seq)
+            if kind != SNAPSHOT:
+                num_writes += 1
+        self.last_seq = self.log_start_seq = last_seq
+        self.num_write_operations = num_writes
+        if self.db:
+            print(f"Process {self.name} recovered {len(self.db)} books up to seq {last_seq} "
+                  f"in {time.perf_counter() - start:.2f}s")
+
+    # Logs the applied writes and starts a compacted snapshot when enough records have been logged.
+    # Must hold write_lock, so the log follows the order in which writes are applied
+    def persist(self, records):
+        self.storage.append(records)
+        if self.storage.needs_snapshot():
+            items = [(key, record.version, record.value) for key, record in self.db.items()]
+            self.storage.snapshot(items, self.last_seq, self.num_write_operations)
+
+    # In local_store_ps, the processes are first created and then during chain creation they are initialized
+    def initialize(self, controlPanel, predecessor, successor, head, tail, role):
+        self.control_panel_ip = controlPanel
+        self.predecessor_ip = predecessor
+        self.successor_ip = successor
+        self.tail_ip = tail
+        self.head_ip = head
+        self.role = ProcessRole(role)
+        self.rebuild_channels()
+        if self.write_mode == WriteMode.PIPELINED and not self.replication_threads:
+            self.replication_threads = [
+                threading.Thread(target=self.forward_writes, daemon=True),
+                threading.Thread(target=self.send_commits, daemon=True),
+            ]
+            for thread in self.replication_threads:
+                thread.start()
+        if self.write_mode == WriteMode.SYNC and self.resend_thread is None:
+            self.resend_thread = threading.Thread(target=self.resend_unforwarded, daemon=True)
+            self.resend_thread.start()
+
+    def process_stub(self, ip):
+        return self.channels.get_stub(ip, process_pb2_grpc.ProcessStub)
+
+    def channel_pools(self):
+        return [self.channels]
+
+    def rebuild_channels(self):
+        self.channels.rebuild([self.predecessor_ip, self.successor_ip, self.head_ip, self.tail_ip])
+
+    def Initialize(self, request, context):
+        self.initialize(self.control_panel_ip, request.predecessorIP,
+                           request.successorIP, request.headIP, request.tailIP, request.role)
+        print(f"Process {request.processID} initialized")
+        self.state = ProcessState.CHAIN_CREATED  # even if one processes is initialized, consider the chain created
+        return Empty()
+    
+    def Clear(self, request, context):
+        print("Clearing...")
+        self.state = ProcessState.INACTIVE
+        self.db = new_store()
+        self.key_index = SortedKeyIndex()
+        self.tree = MerkleTree(self.tree_fanout, self.tree_depth)
+        self.last_write_operations = deque([], maxlen=self.reconcile_log_size)
+        self.log_start_seq = 0
+        self.num_write_operations = 0
+        self.last_seq = 0
+        self.ring = None
+        self.applied_ids = OrderedDict()
+        if self.read_cache is not None:
+            self.read_cache.clear()
+        if self.storage is not None:
+            self.storage.reset()
+        self.in_flight = OrderedDict()
+        self.in_flight_started = {}
+        self.wake_commit_waiters()
+        if self.replication_threads:
+            self.replication_threads = []
+            self.forward_queue.put(None)
+            self.commit_queue.put(None)
+        if self.resend_thread is not None:
+            self.resend_thread = None
+            self.unforwarded.put(None)
+        # The grace period lets this Clear call itself complete instead of being cancelled by the shutdown
+        self.stop_server(grace=1)
+
+        return Empty()
+
+    def stop_server(self, grace=0):
+        self.channels.close()
+        self.metrics.stop_http_server()
+        if self.storage is not None:
+            self.storage.close()
+        self.process_server.stop(grace)
+
+    # The deadline of the client's call bounds the whole write: every hop forwards with the time left and aborts
+    # before applying anything once it has passed
+    def Write(self, request, context):
+        logger.debug("Write is in role %s in %s", self.role, self.name)
+        with self.write_slot(context):
+            deadline = deadline_of(context)
+            self.simulate_delay(request.delay, deadline, context)
+            # Clients write to the head only, the other hops receive WriteBatch or Replicate
+            if self.role != ProcessRole.HEAD:
+                context.abort(grpc.StatusCode.FAILED_PRECONDITION, f"{self.name} is not the head")
+            try:
+                # A retried write skips the group, it is only re-sent if it is not committed yet
+                if self.group_commit_max_batch > 1 and request.id not in self.applied_ids:
+                    return self.group_write(request, deadline)
+                batch = process_pb2.WriteBatchRequest(writes=[request], delay=request.delay)
+                if self.write_mode == WriteMode.PIPELINED:
+                    return self.pipelined_write(batch, deadline=deadline)
+                return self.sync_write(batch, deadline=deadline, context=context)
+            except WRITE_ERRORS as e:
+                context.abort(*error_status(e))
+
+    # Applies the whole batch at once on every hop and forwards it to the successor as a single message
+    def WriteBatch(self, request, context):
+        with self.write_slot(context):
+            deadline = deadline_of(context)
+            self.simulate_delay(request.delay, deadline, context)
+            if not self.accepts_batch(request):
+                context.abort(grpc.StatusCode.FAILED_PRECONDITION, f"{self.name} is not the head")
+            try:
+                if self.write_mode == WriteMode.PIPELINED:
+                    return self.pipelined_write(request, deadline=deadline)
+                return self.sync_write(request, deadline=deadline, context=context)
+            except WRITE_ERRORS as e:
+                context.abort(*error_status(e))
+
+    # Clients send their batches to the head. The other hops only take the batches forwarded down the chain in sync
+    # mode, whose writes all carry the seq assigned by the head: a client batch applied there would be ignored
+    def accepts_batch(self, batch):
+        if self.role == ProcessRole.HEAD:
+            return True
+        return self.write_mode == WriteMode.SYNC and all(write.seq for write in batch.writes)
+
+    # Lets at most workers - RESERVED_WORKERS client writes hold a worker at a time, so that the commit acks they
+    # wait for always find a free one
+    def limit_waiting_writes(self, workers):
+        self.write_slots = threading.BoundedSemaphore(max(workers - RESERVED_WORKERS, 1))
+
+    # Holds one of the write slots for the call, or fails it at once with RESOURCE_EXHAUSTED when they are all
+    # taken: waiting for one would hold a worker as well. Clients retry after a backoff
+    @contextmanager
+    def write_slot(self, context):
+        if self.write_slots is None:
+            yield
+            return
+        if not self.write_slots.acquire(blocking=False):
+            context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED,
+                          f"Too many writes waiting for their commit at {self.name}")
+        try:
+            yield
+        finally:
+            self.write_slots.release()
+
+    # Sleeps for the simulated processing time of a write, but not past the end of the call (deadline or
+    # cancellation), and aborts the write before it is applied if the call has ended
+    def simulate_delay(self, delay, deadline, context):
+        if delay:
+            ended = threading.Event()
+            context.add_callback(ended.set)
+            ended.wait(delay)
+        if deadline is not None and time.monotonic() >= deadline:
+            context.abort(grpc.StatusCode.DEADLINE_EXCEEDED, f"Deadline exceeded before the write reached {self.name}")
+        if not context.is_active():
+            context.abort(grpc.StatusCode.CANCELLED, f"The write was cancelled before it reached {self.name}")
+
+    # context is the client's call: if it is cancelled, so is the call to the successor
+    def sync_write(self, batch, client_writes=None, deadline=None, context=None):
+        is_tail = self.role == ProcessRole.TAIL
+        with self.write_lock:
+            batch.writes.extend(self.apply_batch(batch, is_tail, client_writes))
+            if not batch.writes:
+                return Empty()  # writes retried by a client that the chain has already committed
+            if not is_tail:
+                self.forwarding += 1
+        if not is_tail:
+            start = time.perf_counter()
+            forwarded = False
+            try:
+                self.forward_batch(batch, deadline, context)
+                forwarded = True
+            finally:
+                with self.write_lock:
+                    self.forwarding -= 1
+                    if forwarded:
+                        self.mark_clean(batch)
+                    else:
+                        self.unforwarded.put((batch, 0))
+            self.metrics.observe("replication_seconds", time.perf_counter() - start)
+        return Empty()
+
+    # Sends the batch to the successor within the deadline. If the successor is down, waits until the control panel
+    # has spliced it out of the chain and re-sends the batch to the new successor. Returns if this process becomes
+    # the tail
+    def forward_batch(self, batch, deadline=None, context=None):
+        failover_deadline = time.monotonic() + self.failover_wait
+        if deadline is not None:
+            failover_deadline = min(failover_deadline, deadline)
+        while True:
+            successor_ip = self.successor_ip
+            try:
+                call = self.process_stub(successor_ip).WriteBatch.future(batch, timeout=time_left(deadline))
+                if context is not None:
+                    context.add_callback(call.cancel)
+                call.result()
+                return
+            except grpc.RpcError as e:
+                # A write cancelled by its client is not sent again
+                if e.code() not in FAILOVER_CODES or context is not None and not context.is_active():
+                    raise
+                if not self.wait_for_new_successor(successor_ip, failover_deadline):
+                    raise
+            if self.role == ProcessRole.TAIL:
+                return
+
+    # Re-sends the batches whose forward has failed, with their original seq and ids, until the rest of the chain has
+    # them. Hops that already applied a write skip it by its id, and writes committed in the meantime (e.g. sent
+    # again by a client) are left out, so that no key stays dirty after a failed or cancelled write
+    def resend_unforwarded(self):
+        while True:
+            item = self.unforwarded.get()
+            if item is None:
+                return
+            batch, attempt = item
+            with self.write_lock:
+                writes = [write for write in batch.writes if self.is_pending(write.key, write.seq)]
+            if not writes or self.role in (ProcessRole.TAIL, ProcessRole.DISABLED):
+                continue  # the new tail commits every write it has, a removed head is caught up when restored
+            batch = process_pb2.WriteBatchRequest(writes=writes)
+            try:
+                self.forward_batch(batch, time.monotonic() + self.failover_wait)
+            except grpc.RpcError as e:
+                print(f"Re-sending {len(writes)} writes from {self.name} failed ({e.code()}). Retrying...")
+                time.sleep(min(RESEND_BACKOFF * 2 ** attempt, RESEND_MAX_BACKOFF))
+                self.unforwarded.put((batch, attempt + 1))
+                continue
+            with self.write_lock:
+                self.mark_clean(batch)
+
+    # Returns True once the successor has changed or this process has become the tail, False after the deadline
+    def wait_for_new_successor(self, successor_ip, deadline):
+        while self.successor_ip == successor_ip and self.role != ProcessRole.TAIL:
+            if time.monotonic() > deadline:
+                return False
+            time.sleep(0.05)
+        return True
+
+    # Joins the current write group at the head. The leader waits until the group is full or the window
+    # has passed, then propagates it; the other writers wait for the leader
+    def group_write(self, request, deadline=None):
+        with self.group_cond:
+            group = self.write_group
+            group.writes.append(request)
+            group.deadlines.append(deadline)
+            is_leader = len(group.writes) == 1
+            if len(group.writes) >= self.group_commit_max_batch:
+                self.group_cond.notify_all()
+        if is_leader:
+            with self.group_cond:
+                self.group_cond.wait_for(lambda: len(group.writes) >= self.group_commit_max_batch,
+                                         timeout=self.group_commit_max_wait)
+                self.write_group = WriteGroup()
+            try:
+                self.commit_group(group)
+            except Exception as e:
+                group.error = e
+            group.done.set()
+        elif not group.done.wait(time_left(deadline)):
+            raise DeadlineExceededError("The write group was not committed before the deadline")
+        if group.error is not None:
+            raise group.error
+        return Empty()
+
+    def commit_group(self, group):
+        batch = self.coalesce(group.writes)
+        if self.write_mode == WriteMode.PIPELINED:
+            self.pipelined_write(batch, group.writes, group.deadline)
+        else:
+            self.sync_write(batch, group.writes, group.deadline)
+
+    # Builds the batch propagated for a write group: only the last write to every key goes down the chain
+    @staticmethod
+    def coalesce(writes):
+        latest = {}
+        for write in writes:
+            latest.pop(write.key, None)
+            latest[write.key] = write
+        return process_pb2.WriteBatchRequest(
+            writes=latest.values(),
+            delay=max(write.delay for write in writes),
+            coalesced=len(writes) - len(latest),
+        )
+
+    # Assigns sequence numbers (on the head) and applies every write of the batch. Must hold write_lock.
+    # Writes coalesced away by group commit are still counted on every hop, so the numerical deviation keeps matching
+    # the client's writes, and their ids are kept with the seq of the write that replaced them.
+    # The reconcile log only gets the writes that changed their record, with their own seq: in sync mode a write may
+    # reach a hop after a newer one to the same book, and replaying it would overwrite the newer value.
+    # Returns the writes retried by a client that the head has applied but the chain has not committed yet
+    def apply_batch(self, batch, committed, client_writes=None):
+        is_head = self.role == ProcessRole.HEAD
+        retried = []
+        if is_head and batch.migration:
+            self.skip_present(batch)
+        elif is_head:
+            foreign = [write.key for write in batch.writes if not self.owns(write.key)]
+            if foreign:
+                raise WrongChainError(f"Chain {self.chain} does not store {', '.join(foreign)}")
+            retried = self.take_retried(batch, client_writes)
+        applied = []
+        for write in batch.writes:
+            if write.id and write.id in self.applied_ids:
+                continue  # re-sent by the predecessor, already applied here
+            if is_head:
+                write.seq = self.last_seq + 1
+            self.last_seq = max(self.last_seq, write.seq)
+            if self.write_record(write.key, write.value, write.seq, committed):
+                self.last_write_operations.append((write.key, write.value, write.seq))
+                self.log_appended += 1
+            applied.append(write)
+        if not applied:
+            return retried
+        self.num_write_operations += len(applied) + batch.coalesced
+        self.metrics.inc("writes_applied_total", len(applied))
+        seqs = {write.key: write.seq for write in applied}
+        for write in client_writes or applied:
+            if write.id:
+                self.applied_ids[write.id] = write.seq or seqs[write.key]
+        while len(self.applied_ids) > self.idempotency_cache_size:
+            self.applied_ids.popitem(last=False)
+        if self.storage is not None:
+            records = [(WRITE, write.seq, write.key, write.value) for write in applied]
+            if batch.coalesced:
+                records.append((COALESCED, batch.coalesced, "", 0.0))
+            self.persist(records)
+        return retried
+
+    # Removes from the batch the writes a client has sent again with the id of a write the head has already
+    # applied. Returns the ones the chain has not committed yet, with their original seq, to be sent down the chain
+    # again. Must hold write_lock
+    def take_retried(self, batch, client_writes):
+        retried, fresh = [], []
+        for write in batch.writes:
+            seq = self.applied_ids.get(write.id) if write.id else None
+            if seq is None:
+                fresh.append(write)
+            elif self.is_pending(write.key, seq):
+                retried.append(process_pb2.WriteRequest(key=write.key, value=self.db[write.key].pending[seq],
+                                                        seq=seq, id=write.id))
+        if len(fresh) < len(batch.writes):
+            del batch.writes[:]
+            batch.writes.extend(fresh)
+            if client_writes is not None:
+                client_writes[:] = [write for write in client_writes if write.id not in self.applied_ids]
+        return retried
+
+    # Whether the write of the key with this seq has been applied here and not committed yet. Must hold write_lock
+    def is_pending(self, key, seq):
+        record = self.db.get(key)
+        return record is not None and record.pending is not None and seq in record.pending
+
+    def owns(self, key):
+        return self.ring is None or self.ring.chain_for(key) == self.chain
+
+    # Leaves out the migrated books that have been written since the rebalance routed them to this chain:
+    # those writes are newer than the value from the previous chain. Must hold write_lock
+    def skip_present(self, batch):
+        absent = [write for write in batch.writes if write.key not in self.db]
+        if len(absent) < len(batch.writes):
+            del batch.writes[:]
+            batch.writes.extend(absent)
+
+    # Returns the record of the key, creating it if needed. Must hold write_lock
+    def get_record(self, key):
+        record = self.db.get(key)
+        if record is None:
+            record = self.db.create(key)
+            self.key_index.add(key)
+        return record
+
+    # Applies a write to the record of the key and to the hash tree. Returns False if the record already had a newer
+    # version and ignored it. Must hold write_lock
+    def write_record(self, key, value, version, committed):
+        record = self.get_record(key)
+        old_version, old_value = record.version, record.value
+        if committed:
+            record.write_committed(value, version)
+        else:
+            record.write(value, version)
+        self.tree.update(key, old_version, old_value, record.version, record.value)
+        return record.version == version
+
+    # Must hold write_lock
+    def drop_record(self, key):
+        record = self.db.get(key)
+        if record is not None:
+            self.tree.remove(key, record.version, record.value)
+            self.db.pop(key)
+            self.key_index.remove(key)
+            if self.read_cache is not None:
+                self.read_cache.discard(key)
+
+    # Commits the versions written by the batch. A key stays dirty while newer writes to it are pending.
+    # Keys dropped since the batch was applied (DropForeignKeys, anti-entropy repair) are skipped.
+    # Must hold write_lock
+    def mark_clean(self, batch):
+        for write in batch.writes:
+            record = self.db.get(write.key)
+            if record is not None:
+                record.commit(write.seq)
+
+    # Applies the batch locally and hands it to the forwarding thread. Only the head blocks,
+    # until the tail's commit ack for the batch's last sequence number comes back up the chain
+    def pipelined_write(self, batch, client_writes=None, deadline=None):
+        committed = threading.Event()
+        if self.apply_pipelined(batch, committed, client_writes) and not committed.wait(time_left(deadline)):
+            raise DeadlineExceededError("The write was not committed before the deadline, it stays in the pipeline")
+        return Empty()
+
+    # Returns True if the caller has to wait for the committed waiter (anything with a set() method)
+    def apply_pipelined(self, batch, committed, client_writes=None):
+        if not batch.writes:
+            return False
+        is_head = self.role == ProcessRole.HEAD
+        with self.write_lock:
+            if not is_head and batch.writes[-1].seq <= self.last_seq:
+                # Already applied, e.g. re-sent by the predecessor. The tail acks it again, as the predecessor
+                # may be waiting for it
+                if self.role == ProcessRole.TAIL:
+                    self.commit_queue.put(batch.writes[-1].seq)
+                return False
+            is_tail = self.role == ProcessRole.TAIL
+            retried = self.apply_batch(batch, is_tail, client_writes)
+            if not batch.writes:
+                # A migration batch with only books the head already has, or writes retried by a client. These are
+                # still in the pipeline if they are not committed: wait for the batch that carries them
+                if not retried:
+                    return False
+                retried_seq = max(write.seq for write in retried)
+                seq = next(seq for seq in self.in_flight if seq >= retried_seq)
+                self.commit_waiters.setdefault(seq, []).append(committed)
+                return True
+            seq = batch.writes[-1].seq
+            if is_tail:
+                self.commit_queue.put(seq)
+                return False
+            self.in_flight[seq] = batch
+            self.in_flight_started[seq] = time.perf_counter()
+            if is_head:
+                self.commit_waiters.setdefault(seq, []).append(committed)
+            self.forward_queue.put(batch)
+        return is_head
+
+    # Receiving end of the predecessor's replication stream. A single stream per hop keeps batches in sequence order
+    def Replicate(self, request_iterator, context):
+        for batch in request_iterator:
+            time.sleep(batch.delay)
+            self.pipelined_write(batch)
+        return Empty()
+
+    # Streams writes to the successor without waiting for each one to be applied. If the stream breaks,
+    # it is reopened and every uncommitted write is re-sent; the successor skips the ones it already has
+    def forward_writes(self):
+        while self.replication_threads:
+            if not self.successor_ip or self.role == ProcessRole.DISABLED:
+                time.sleep(0.1)  # the tail and a removed head have nobody to forward to
+                continue
+            try:
+                self.replication_call = self.process_stub(self.successor_ip).Replicate.future(
+                    self.replication_stream())
+                self.replication_call.result()
+            except grpc.FutureCancelledError:
+                pass  # the successor has changed
+            except grpc.RpcError as e:
+                print(f"Replication stream from {self.name} failed ({e.code()}: {e.details()}). Reconnecting...")
+            else:
+                continue
+            # The generator of the broken stream may still be blocked on the queue, wake it up so that
+            # it does not take a batch meant for the new stream
+            self.forward_queue.put(None)
+            time.sleep(0.1)
+
+    def replication_stream(self):
+        with self.write_lock:
+            pending = list(self.in_flight.values())
+        yield from pending
+        while True:
+            request = self.forward_queue.get()
+            if request is None:
+                return
+            yield request
+
+    # Sends commit acks to the predecessor. Acks are cumulative, so queued acks are collapsed into the highest one
+    def send_commits(self):
+        while True:
+            seq = self.commit_queue.get()
+            if seq is None:
+                return
+            while not self.commit_queue.empty():
+                next_seq = self.commit_queue.get_nowait()
+                if next_seq is None:
+                    return
+                seq = max(seq, next_seq)
+            while self.predecessor_ip and self.state != ProcessState.INACTIVE:
+                try:
+                    self.process_stub(self.predecessor_ip).Commit(process_pb2.CommitRequest(seq=seq))
+                    break
+                except grpc.RpcError as e:
+                    print(f"Sending commit {seq} from {self.name} failed ({e.code()}). Retrying...")
+                    time.sleep(0.1)
+
+    def Commit(self, request, context):
+        with self.write_lock:
+            while self.in_flight:
+                seq = next(iter(self.in_flight))
+                if seq > request.seq:
+                    break
+                self.mark_clean(self.in_flight.pop(seq))
+                self.metrics.observe("replication_seconds", time.perf_counter() - self.in_flight_started.pop(seq))
+                for waiter in self.commit_waiters.pop(seq, ()):
+                    waiter.set()
+        if self.role != ProcessRole.HEAD:
+            self.commit_queue.put(request.seq)
+        return Empty()
+
+    def Read(self, request, context):
+        record = self.db.get(request.key)
+        if record is None:
+            return process_pb2.ReadResponse(value=float(0.1), success=False)
+        if not record.pending:
+            return process_pb2.ReadResponse(value=record.value, success=True)
+        return self.read_dirty(record, request)
+
+    # Serves a dirty key from the read cache while its lease holds. Otherwise asks the tail only for the committed
+    # version of the key and serves the value of that version locally, or falls back to a full Read at the tail
+    # if this process no longer holds that version
+    def read_dirty(self, record, request):
+        committed_version = record.committed_version
+        response = self.cached_read(request.key, committed_version)
+        if response is None:
+            response = self.read_committed_version(record, self.process_stub(self.tail_ip).VersionQuery(request))
+            if response is None:
+                response = self.process_stub(self.tail_ip).Read(request)
+            self.cache_read(request.key, response, committed_version)
+        return response
+
+    # The value of a dirty book in the read cache, None if it has to be read from the tail
+    def cached_read(self, key, committed_version):
+        if self.read_cache is None:
+            return None
+        value = self.read_cache.get(key, committed_version)
+        return None if value is None else process_pb2.ReadResponse(value=value, success=True)
+
+    def cache_read(self, key, response, committed_version):
+        if self.read_cache is not None and response.success:
+            self.read_cache.put(key, response.value, committed_version)
+
+    # Splits dirty books into the values found in the read cache and the books to resolve at the tail, along with
+    # the local committed versions the values returned by the tail are cached against
+    def cached_books(self, dirty_keys):
+        if self.read_cache is None:
+            return {}, dirty_keys, None
+        versions = {}
+        for key in dirty_keys:
+            record = self.db.get(key)
+            versions[key] = 0 if record is None else record.committed_version
+        books, missing = self.read_cache.get_many(versions)
+        return books, missing, versions
+
+    def cache_books(self, books, versions):
+        if self.read_cache is not None:
+            self.read_cache.put_many(books, versions)
+
+    # Returns the response for the version committed at the tail, or None if this process does not hold it
+    def read_committed_version(self, record, committed):
+        if not committed.success:
+            return process_pb2.ReadResponse(value=float(0.1), success=False)
+        with self.write_lock:
+            if committed.version == record.committed_version:
+                return process_pb2.ReadResponse(value=record.committed_value, success=True)
+            if record.pending and committed.version in record.pending:
+                value = record.pending[committed.version]
+                record.commit(committed.version)  # the tail has it, so it is committed on the whole chain
+                return process_pb2.ReadResponse(value=value, success=True)
+        return None
+
+    def VersionQuery(self, request, context):
+        record = self.db.get(request.key)
+        if record is None or record.committed_version == 0:
+            return process_pb2.VersionResponse(success=False)
+        return process_pb2.VersionResponse(version=record.committed_version, success=True)
+
+    def ListBooks(self, request, context):
+        book_lists, dirty_keys = self.local_books(self.db)
+        cached, dirty_keys, versions = self.cached_books(dirty_keys)
+        book_lists.update(cached)
+        # All dirty keys missing from the read cache are resolved at the tail in a single round trip
+        if dirty_keys:
+            committed = self.process_stub(self.tail_ip).BulkRead(process_pb2.BulkReadRequest(keys=dirty_keys))
+            book_lists.update(committed.books)
+            self.cache_books(committed.books, versions)
+        return process_pb2.BookList(books=book_lists)
+
+    # Returns the clean values of the keys and the dirty keys that have to be resolved at the tail
+    def local_books(self, keys):
+        return self.db.local_values(keys, self.role == ProcessRole.TAIL)
+
+    # Streams the books in name order, one page at a time, starting after the cursor (a book name) and
+    # optionally only the names starting with a prefix. Dirty keys of a page missing from the read cache are
+    # resolved with one BulkRead
+    def ListBooksStream(self, request, context):
+        page_size = request.page_size or 100
+        cursor = request.cursor
+        remaining = request.limit or float("inf")
+        while remaining > 0:
+            keys = self.key_index.page(cursor, request.prefix, min(page_size, remaining))
+            if not keys:
+                return
+            books, dirty_keys = self.local_books(keys)
+            cached, dirty_keys, versions = self.cached_books(dirty_keys)
+            books.update(cached)
+            if dirty_keys:
+                committed = self.process_stub(self.tail_ip).BulkRead(process_pb2.BulkReadRequest(keys=dirty_keys))
+                books.update(committed.books)
+                self.cache_books(committed.books, versions)
+            cursor = keys[-1]
+            remaining -= len(keys)
+            yield self.book_page(keys, books)
+
+    # Keys the tail has not committed yet are left out of the page
+    @staticmethod
+    def book_page(keys, books):
+        return process_pb2.BookPage(
+            books=[process_pb2.Book(name=key, price=books[key]) for key in keys if key in books],
+            next_cursor=keys[-1],
+        )
+
+    # Returns the committed values of the requested keys. Keys that have not been committed yet are left out
+    def BulkRead(self, request, context):
+        books = dict()
+        for key in request.keys:
+            record = self.db.get(key)
+            if record is not None and record.committed_version:
+                books[key] = record.committed_value
+        return process_pb2.BookList(books=books)
+
+    # Streams a consistent snapshot of the books in name order, as columns of up to page_size books. Only the tail
+    # serves it, as it holds committed values only. The names and values are copied in one pass under the lock,
+    # which new writes wait for, and sent outside of it
+    def ExportBooks(self, request, context):
+        if self.role != ProcessRole.TAIL:
+            context.abort(grpc.StatusCode.FAILED_PRECONDITION, f"{self.name} is not the tail")
+        with self.write_lock:
+            names, prices, _ = self.db.columns(self.key_index.snapshot())
+            last_seq = self.last_seq
+        page_size = request.page_size or 10000
+        for start in range(0, len(names), page_size):
+            yield process_pb2.BookColumns(names=names[start:start + page_size],
+                                          prices=prices[start:start + page_size], last_seq=last_seq)
+
+    def SetShard(self, request, context):
+        ring = HashRing(request.weights, request.vnodes)
+        with self.write_lock:
+            self.ring, self.chain = ring, request.chain
+        return Empty()
+
+    # Sends the books that the ring has moved to other chains to the heads of those chains, in batches of
+    # RECONCILE_CHUNK_SIZE. Called on the head after SetShard, which stops it from accepting writes to them
+    def MigrateKeys(self, request, context):
+        with self.write_lock:
+            moved = [(key, record.value) for key, record in self.db.items() if not self.owns(key)]
+        by_chain = defaultdict(list)
+        for key, value in moved:
+            by_chain[self.ring.chain_for(key)].append(process_pb2.WriteRequest(key=key, value=value))
+        for chain, writes in by_chain.items():
+            # The heads of other chains are not neighbours, so the pool does not keep channels to them
+            with grpc.insecure_channel(request.heads[chain]) as channel:
+                stub = process_pb2_grpc.ProcessStub(channel)
+                for i in range(0, len(writes), self.reconcile_chunk_size):
+                    stub.WriteBatch(process_pb2.WriteBatchRequest(
+                        writes=writes[i:i + self.reconcile_chunk_size], migration=True))
+            print(f"Process {self.name} moved {len(writes)} books to chain {chain}")
+        return process_pb2.KeyCount(count=len(moved))
+
+    # Deletes the books that have been moved to other chains. Books with uncommitted writes are kept
+    # and dropped by a later rebalance
+    def DropForeignKeys(self, request, context):
+        with self.write_lock:
+            keys = [key for key, record in self.db.items() if not record.pending and not self.owns(key)]
+            for key in keys:
+                self.drop_record(key)
+            if self.storage is not None and keys:
+                self.persist([(DELETE, 0, key, 0.0) for key in keys])
+        return process_pb2.KeyCount(count=len(keys))
+
+    def Stats(self, request, context):
+        return self.metrics.snapshot()
+
+    def TreeDigests(self, request, context):
+        with self.write_lock:
+            digests = self.tree.digests(request.level, request.nodes)
+        return process_pb2.TreeDigestsResponse(digests=digests, fanout=self.tree_fanout, depth=self.tree_depth)
+
+    # The books of the leaves of the hash tree and the last seq applied before they were listed:
+    # a book missing from the response may have been written after it, but not before
+    def LeafEntries(self, request, context):
+        with self.write_lock:
+            last_seq = self.last_seq
+        keys = self.leaf_keys(request.leaves)
+        response = process_pb2.LeafEntriesResponse(last_seq=last_seq)
+        with self.write_lock:
+            for key in keys:
+                record = self.db.get(key)
+                if record is not None:
+                    response.keys.append(key)
+                    response.values.append(record.value)
+                    response.versions.append(record.version)
+                    response.dirty.append(bool(record.pending))
+        return response
+
+    # Names of the books in the leaves of the hash tree. The names are copied and hashed outside of the lock
+    def leaf_keys(self, leaves):
+        leaves, leaf = set(leaves), self.tree.leaf
+        return [key for key in list(self.db) if leaf(key) in leaves]
+
+    # Compares the hash tree with the predecessor's from the root down, one level per call and only below the nodes
+    # that differ, then repairs the books of the leaves that differ. The transfer is proportional to the number
+    # of differences times the depth of the tree
+    def AntiEntropy(self, request, context):
+        if self.role in (None, ProcessRole.HEAD, ProcessRole.DISABLED) or not self.predecessor_ip:
+            return process_pb2.AntiEntropyReport()
+        stub = self.process_stub(self.predecessor_ip)
+        nodes = [0]
+        for level in range(self.tree_depth + 1):
+            remote = stub.TreeDigests(process_pb2.TreeDigestsRequest(level=level, nodes=nodes))
+            if (remote.fanout, remote.depth) != (self.tree_fanout, self.tree_depth):
+                context.abort(grpc.StatusCode.FAILED_PRECONDITION,
+                              f"{self.name} and its predecessor have hash trees of different shapes")
+            with self.write_lock:
+                local = self.tree.digests(level, nodes)
+            nodes = [node for node, digest, remote_digest in zip(nodes, local, remote.digests)
+                     if digest != remote_digest]
+            if not nodes:
+                return process_pb2.AntiEntropyReport()
+            if level < self.tree_depth:
+                nodes = self.tree.children(nodes)
+        repaired, removed = self.repair(nodes, stub.LeafEntries(process_pb2.LeafEntriesRequest(leaves=nodes)))
+        self.metrics.inc("anti_entropy_divergent_leaves_total", len(nodes))
+        self.metrics.inc("anti_entropy_repaired_total", repaired + removed)
+        if repaired or removed:
+            print(f"Anti-entropy repaired {repaired} and removed {removed} books of {self.name} "
+                  f"in {len(nodes)} divergent leaves")
+        return process_pb2.AntiEntropyReport(divergent_leaves=len(nodes), repaired=repaired, removed=removed)
+
+    # Makes the books of the leaves match the predecessor's, which holds every write that reached this process.
+    # Left alone: books dirty on either side, which replication is still working on, and books written here after
+    # the predecessor listed its own
+    def repair(self, leaves, source):
+        local_keys = self.leaf_keys(leaves)
+        present = set(source.keys)
+        records, repaired, removed = [], 0, 0
+        with self.write_lock:
+            for key, value, version, dirty in zip(source.keys, source.values, source.versions, source.dirty):
+                record = self.db.get(key)
+                if dirty or record is not None and (record.pending or record.version > source.last_seq):
+                    continue
+                if record is not None and (record.version, record.value) == (version, value):
+                    continue
+                if record is not None and record.version >= version:
+                    # a write the chain never had, or another value for the version: they would be ignored otherwise
+                    self.drop_record(key)
+                    records.append((DELETE, 0, key, 0.0))
+                self.write_record(key, value, version, True)
+                records.append((WRITE, version, key, value))
+                repaired += 1
+            for key in local_keys:
+                record = self.db.get(key)
+                if key in present or record is None or record.pending or record.version > source.last_seq:
+                    continue
+                self.drop_record(key)
+                records.append((DELETE, 0, key, 0.0))
+                removed += 1
+            if self.storage is not None and records:
+                self.persist(records)
+        return repaired, removed
+
+    # How many writes the tail has yet to apply: the write gap between this process and the tail
+    def tail_seq_gap(self):
+        if self.role in (None, ProcessRole.TAIL) or not self.tail_ip:
+            return 0
+        tail = self.process_stub(self.tail_ip).GetNumericalDeviation(
+            process_pb2.NumericalDeviationRequest(processID=self.name), timeout=1)
+        return max(self.last_seq - tail.last_seq, 0)
+
+    def DataStatus(self, request, context):
+        status = dict()
+        for key, record in self.db.items():
+            status[key] = record.status
+        return process_pb2.StatusResponse(status=status)
+
+    def SetPredecessorIP(self, request, context):
+        self.predecessor_ip = request.ip
+        self.rebuild_channels()
+        return Empty()
+
+    def SetHeadIP(self, request, context):
+        self.head_ip = request.ip
+        self.rebuild_channels()
+        return Empty()
+
+    def SetSuccessorIP(self, request, context):
+        self.successor_ip = request.ip
+        self.rebuild_channels()
+        if self.replication_call is not None:
+            self.replication_call.cancel()  # reopened to the new successor, re-sending the uncommitted writes
+        return Empty()
+
+    def SetTailIP(self, request, context):
+        self.tail_ip = request.ip
+        self.rebuild_channels()
+        return Empty()
+
+    def SetRole(self, request, context):
+        new_role = ProcessRole(request.role)
+        previous_role, self.role = self.role, new_role
+        self.rebuild_channels()
+        if new_role == ProcessRole.DISABLED and self.replication_threads:
+            self.forward_queue.put(None)  # closes the replication stream to the successor
+        if new_role == ProcessRole.TAIL and previous_role != ProcessRole.TAIL:
+            self.commit_applied()
+        return Empty()
+
+    # Called when this process becomes the tail after the old one has failed: every write it has applied
+    # is now in the whole chain, so it is committed and acked upstream
+    def commit_applied(self):
+        with self.write_lock:
+            for record in self.db.values():
+                if record.pending:
+                    record.commit(record.version)
+            self.in_flight = OrderedDict()
+            self.in_flight_started = {}
+            self.wake_commit_waiters()
+            if self.write_mode == WriteMode.PIPELINED:
+                self.commit_queue.put(self.last_seq)
+
+    def wake_commit_waiters(self):
+        for waiters in self.commit_waiters.values():
+            for waiter in waiters:
+                waiter.set()
+        self.commit_waiters = {}
+
+    def Heartbeat(self, request, context):
+        return Empty()
+
+    def GetNumericalDeviation(self, request, context):
+        return process_pb2.NumericalDeviation(deviation=self.num_write_operations, last_seq=self.last_seq,
+                                              log_position=self.log_appended)
+
+    # Catches the target up with this process over one CatchUp stream: the writes newer than the target's
+    # last seq (or from_seq), or the writes appended to the log from from_position on, if the log still holds all
+    # of them, otherwise the whole db in chunks of RECONCILE_CHUNK_SIZE
+    def Reconcile(self, request, context):
+        stub = self.process_stub(request.targetIP)
+        target = stub.GetNumericalDeviation(process_pb2.NumericalDeviationRequest(processID=request.targetProcessID))
+        from_seq = request.from_seq if request.HasField("from_seq") else target.last_seq
+        with self.write_lock:
+            log = self.last_write_operations
+            if request.HasField("from_position"):
+                # Writes may be applied out of seq order (sync mode), the ones applied after the position are sent
+                # whatever their seq
+                skip = request.from_position - (self.log_appended - len(log))
+                covered = skip >= 0
+                if covered:
+                    writes = list(islice(log, skip, None))
+            else:
+                covered = from_seq >= self.log_start_seq and (len(log) < log.maxlen or log[0][2] <= from_seq)
+                if covered:
+                    writes = [write for write in log if write[2] > from_seq]
+            if not covered:
+                keys = self.key_index.snapshot()  # in name order, so the target appends them to its index
+            last_seq, num_writes = self.last_seq, self.num_write_operations
+        start = f"log position {request.from_position}" if request.HasField("from_position") else f"seq {from_seq}"
+        print(f"Reconciling {request.targetProcessID} from {start} to seq {last_seq} "
+              f"with a {'delta' if covered else 'snapshot'}")
+        if covered:
+            stub.CatchUp(self.catch_up_chunks(writes, last_seq, num_writes))
+        else:
+            # Records are read outside of the lock, a write racing with the transfer is caught by the next Reconcile
+            stub.CatchUp(self.snapshot_chunks(self.db.columns(keys), last_seq, num_writes))
+        return Empty()
+
+    def catch_up_chunks(self, writes, last_seq, num_writes):
+        writes = iter(writes)
+        while True:
+            chunk = list(islice(writes, self.reconcile_chunk_size))
+            yield process_pb2.CatchUpChunk(
+                writes=[process_pb2.WriteRequest(key=key, value=value, seq=seq) for key, value, seq in chunk],
+                last_seq=last_seq,
+                num_write_operations=num_writes,
+            )
+            if len(chunk) < self.reconcile_chunk_size:
+                return
+
+    # Streams the snapshot columns (names, values, versions) as packed repeated fields, without a message per book.
+    # The first chunk is sent even if the store is empty, it resets the target
+    def snapshot_chunks(self, columns, last_seq, num_writes):
+        keys, values, versions = columns
+        size = self.reconcile_chunk_size
+        for start in range(0, max(len(keys), 1), size):
+            yield process_pb2.CatchUpChunk(
+                keys=keys[start:start + size],
+                values=values[start:start + size],
+                versions=versions[start:start + size],
+                snapshot=True,
+                last_seq=last_seq,
+                num_write_operations=num_writes,
+            )
+
+    # Applies a state transfer streamed by Reconcile. A snapshot replaces the db, a delta is applied on top of it
+    def CatchUp(self, request_iterator, context):
+        first, count = True, 0
+        for chunk in request_iterator:
+            with self.write_lock:
+                if first and chunk.snapshot:
+                    self.db = new_store()
+                    self.key_index = SortedKeyIndex()
+                    self.tree = MerkleTree(self.tree_fanout, self.tree_depth)
+                    self.last_write_operations.clear()
+                    self.log_start_seq = self.last_seq = chunk.last_seq
+                    if self.storage is not None:
+                        self.storage.reset()
+                first = False
+                for write in chunk.writes:
+                    if self.write_record(write.key, write.value, write.seq, True) and not chunk.snapshot:
+                        self.last_write_operations.append((write.key, write.value, write.seq))
+                        self.log_appended += 1
+                if chunk.keys:
+                    self.key_index.add_many(self.db.load_columns(chunk.keys, chunk.values, chunk.versions))
+                if self.storage is not None and not chunk.snapshot:
+                    self.persist([(WRITE, write.seq, write.key, write.value) for write in chunk.writes])
+                # A restored head must continue numbering after the writes it has been reconciled with
+                self.last_seq = max(self.last_seq, chunk.last_seq)
+                self.num_write_operations = chunk.num_write_operations
+            count += len(chunk.writes) + len(chunk.keys)
+        if not first and chunk.snapshot:
+            with self.write_lock:
+                # Loaded in bulk, the hash tree is built once from the whole snapshot
+                self.tree.rebuild(self.db.items())
+                if self.storage is not None:
+                    items = [(key, record.version, record.value) for key, record in self.db.items()]
+                    self.storage.snapshot(items, self.last_seq, self.num_write_operations)
+        print(f"Process {self.name} caught up to seq {self.last_seq} with {count} writes")
+        return Empty()
+
+    def RawWrite(self, request, context):
+        with self.write_lock:
+            self.write_record(request.key, request.value, request.seq, True)
+            if self.storage is not None:
+                self.persist([(WRITE, request.seq, request.key, request.value)])
+            # A restored head must continue numbering after the writes it has been reconciled with
+            self.last_seq = max(self.last_seq, request.seq)
+        return Empty()
+    
+    def run(self):
+        if self.control_panel_ip is None:
+            print(f"Control Panel is None for {self.name}. Stopping...")
+            return
+        if self.role == ProcessRole.HEAD and (
+                self.predecessor_ip is not None or self.successor_ip is None or self.tail_ip is None):
+            print(f"Head process incorrectly initialized. Stopping...")
+            return
+        if self.role == ProcessRole.TAIL and (
+                self.predecessor_ip is None or self.successor_ip is not None or self.tail_ip is not None):
+            print(f"Tail process incorrectly initialized. Stopping...")
+            return
+        if self.role == ProcessRole.NONE and (
+                self.predecessor_ip is None or self.successor_ip is None or self.tail_ip is None):
+            print(f"Process incorrectly initialized. Stopping...")
+            return
+        if self.role == ProcessRole.DISABLED:
+            print(f"Process {self.name} is disabled. Requests will not be processed")
+        print(f"Process {self.name} started with role {self.role}")
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: protos/control_panel.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
+from protos import metrics_pb2 as protos_dot_metrics__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1aprotos/control_panel.proto\x1a\x1bgoogle/protobuf/empty.proto\x1a\x14protos/metrics.proto\"\"\n\x06NameIP\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\n\n\x02ip\x18\x02 \x01(\t\"-\n\x13\x43reateChainResponse\x12\x16\n\x06\x63hains\x18\x01 \x03(\x0b\x32\x06.Chain\"\x1d\n\x0c\x43hainRequest\x12\r\n\x05\x63hain\x18\x01 \x01(\r\"3\n\x05\x43hain\x12\x1a\n\tprocesses\x18\x01 \x03(\x0b\x32\x07.NameIP\x12\x0e\n\x06weight\x18\x02 \x01(\r\"\"\n\x11ListChainResponse\x12\r\n\x05\x63hain\x18\x01 \x01(\t\"A\n\x08Topology\x12\x16\n\x06\x63hains\x18\x01 \x03(\x0b\x32\x06.Chain\x12\r\n\x05\x65poch\x18\x02 \x01(\x04\x12\x0e\n\x06vnodes\x18\x03 \x01(\r\"%\n\x14WatchTopologyRequest\x12\r\n\x05\x65poch\x18\x01 \x01(\x04\"=\n\x0f\x41\x64\x64\x43hainRequest\x12\x1a\n\tprocesses\x18\x01 \x03(\x0b\x32\x07.NameIP\x12\x0e\n\x06weight\x18\x02 \x01(\r\"#\n\x10RebalanceRequest\x12\x0f\n\x07weights\x18\x01 \x03(\r\"R\n\x13\x41ntiEntropyResponse\x12\x18\n\x10\x64ivergent_leaves\x18\x01 \x01(\r\x12\x10\n\x08repaired\x18\x02 \x01(\r\x12\x0f\n\x07removed\x18\x03 \x01(\r2\xbe\x05\n\x0c\x43ontrolPanel\x12/\n\nAddProcess\x12\x07.NameIP\x1a\x16.google.protobuf.Empty\"\x00\x12=\n\x0b\x43reateChain\x12\x16.google.protobuf.Empty\x1a\x14.CreateChainResponse\"\x00\x12\x39\n\tListChain\x12\x16.google.protobuf.Empty\x1a\x12.ListChainResponse\"\x00\x12\x39\n\x05\x43lear\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\"\x00\x12#\n\x07GetHead\x12\r.ChainRequest\x1a\x07.NameIP\"\x00\x12\x35\n\nRemoveHead\x12\r.ChainRequest\x1a\x16.google.protobuf.Empty\"\x00\x12\x36\n\x0bRestoreHead\x12\r.ChainRequest\x1a\x16.google.protobuf.Empty\"\x00\x12\x32\n\x0bGetTopology\x12\x16.google.protobuf.Empty\x1a\t.Topology\"\x00\x12\x35\n\rWatchTopology\x12\x15.WatchTopologyRequest\x1a\t.Topology\"\x00\x30\x01\x12&\n\x08\x41\x64\x64\x43hain\x12\x10.AddChainRequest\x1a\x06.Chain\"\x00\x12\x38\n\tRebalance\x12\x11.RebalanceRequest\x1a\x16.google.protobuf.Empty\"\x00\x12\x31\n\x05Stats\x12\x16.google.protobuf.Empty\x1a\x0e.StatsResponse\"\x00\x12\x34\n\x0b\x41ntiEntropy\x12\r.ChainRequest\x1a\x14.AntiEntropyResponse\"\x00\x62\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'protos.control_panel_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _NAMEIP._serialized_start=81
+  _NAMEIP._serialized_end=115
+  _CREATECHAINRESPONSE._serialized_start=117
+  _CREATECHAINRESPONSE._serialized_end=162
+  _CHAINREQUEST._serialized_start=164
+  _CHAINREQUEST._serialized_end=193
+  _CHAIN._serialized_start=195
+  _CHAIN._serialized_end=246
+  _LISTCHAINRESPONSE._serialized_start=248
+  _LISTCHAINRESPONSE._serialized_end=282
+  _TOPOLOGY._serialized_start=284
+  _TOPOLOGY._serialized_end=349
+  _WATCHTOPOLOGYREQUEST._serialized_start=351
+  _WATCHTOPOLOGYREQUEST._serialized_end=388
+  _ADDCHAINREQUEST._serialized_start=390
+  _ADDCHAINREQUEST._serialized_end=451
+  _REBALANCEREQUEST._serialized_start=453
+  _REBALANCEREQUEST._serialized_end=488
+  _ANTIENTROPYRESPONSE._serialized_start=490
+  _ANTIENTROPYRESPONSE._serialized_end=572
+  _CONTROLPANEL._serialized_start=575
+  _CONTROLPANEL._serialized_end=1277
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,464 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+
+from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
+from protos import control_panel_pb2 as protos_dot_control__panel__pb2
+from protos import metrics_pb2 as protos_dot_metrics__pb2
+
+
+class ControlPanelStub(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.AddProcess = channel.unary_unary(
+                '/ControlPanel/AddProcess',
+                request_serializer=protos_dot_control__panel__pb2.NameIP.SerializeToString,
+                response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                )
+        self.CreateChain = channel.unary_unary(
+                '/ControlPanel/CreateChain',
+                request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+                response_deserializer=protos_dot_control__panel__pb2.CreateChainResponse.FromString,
+                )
+        self.ListChain = channel.unary_unary(
+                '/ControlPanel/ListChain',
+                request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+                response_deserializer=protos_dot_control__panel__pb2.ListChainResponse.FromString,
+                )
+        self.Clear = channel.unary_unary(
+                '/ControlPanel/Clear',
+                request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+                response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                )
+        self.GetHead = channel.unary_unary(
+                '/ControlPanel/GetHead',
+                request_serializer=protos_dot_control__panel__pb2.ChainRequest.SerializeToString,
+                response_deserializer=protos_dot_control__panel__pb2.NameIP.FromString,
+                )
+        self.RemoveHead = channel.unary_unary(
+                '/ControlPanel/RemoveHead',
+                request_serializer=protos_dot_control__panel__pb2.ChainRequest.SerializeToString,
+                response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                )
+        self.RestoreHead = channel.unary_unary(
+                '/ControlPanel/RestoreHead',
+                request_serializer=protos_dot_control__panel__pb2.ChainRequest.SerializeToString,
+                response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                )
+        self.GetTopology = channel.unary_unary(
+                '/ControlPanel/GetTopology',
+                request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+                response_deserializer=protos_dot_control__panel__pb2.Topology.FromString,
+                )
+        self.WatchTopology = channel.unary_stream(
+                '/ControlPanel/WatchTopology',
+                request_serializer=protos_dot_control__panel__pb2.WatchTopologyRequest.SerializeToString,
+                response_deserializer=protos_dot_control__panel__pb2.Topology.FromString,
+                )
+        self.AddChain = channel.unary_unary(
+                '/ControlPanel/AddChain',
+                request_serializer=protos_dot_control__panel__pb2.AddChainRequest.SerializeToString,
+                response_deserializer=protos_dot_control__panel__pb2.Chain.FromString,
+                )
+        self.Rebalance = channel.unary_unary(
+                '/ControlPanel/Rebalance',
+                request_serializer=protos_dot_control__panel__pb2.RebalanceRequest.SerializeToString,
+                response_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                )
+        self.Stats = channel.unary_unary(
+                '/ControlPanel/Stats',
+                request_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+                response_deserializer=protos_dot_metrics__pb2.StatsResponse.FromString,
+                )
+        self.AntiEntropy = channel.unary_unary(
+                '/ControlPanel/AntiEntropy',
+                request_serializer=protos_dot_control__panel__pb2.ChainRequest.SerializeToString,
+                response_deserializer=protos_dot_control__panel__pb2.AntiEntropyResponse.FromString,
+                )
+
+
+class ControlPanelServicer(object):
+    """Missing associated documentation comment in .proto file."""
+
+    def AddProcess(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CreateChain(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListChain(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Clear(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetHead(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RemoveHead(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def RestoreHead(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def GetTopology(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchTopology(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AddChain(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Rebalance(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def Stats(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def AntiEntropy(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_ControlPanelServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'AddProcess': grpc.unary_unary_rpc_method_handler(
+                    servicer.AddProcess,
+                    request_deserializer=protos_dot_control__panel__pb2.NameIP.FromString,
+                    response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            ),
+            'CreateChain': grpc.unary_unary_rpc_method_handler(
+                    servicer.CreateChain,
+                    request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                    response_serializer=protos_dot_control__panel__pb2.CreateChainResponse.SerializeToString,
+            ),
+            'ListChain': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListChain,
+                    request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                    response_serializer=protos_dot_control__panel__pb2.ListChainResponse.SerializeToString,
+            ),
+            'Clear': grpc.unary_unary_rpc_method_handler(
+                    servicer.Clear,
+                    request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                    response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            ),
+            'GetHead': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetHead,
+                    request_deserializer=protos_dot_control__panel__pb2.ChainRequest.FromString,
+                    response_serializer=protos_dot_control__panel__pb2.NameIP.SerializeToString,
+            ),
+            'RemoveHead': grpc.unary_unary_rpc_method_handler(
+                    servicer.RemoveHead,
+                    request_deserializer=protos_dot_control__panel__pb2.ChainRequest.FromString,
+                    response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            ),
+            'RestoreHead': grpc.unary_unary_rpc_method_handler(
+                    servicer.RestoreHead,
+                    request_deserializer=protos_dot_control__panel__pb2.ChainRequest.FromString,
+                    response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            ),
+            'GetTopology': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetTopology,
+                    request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                    response_serializer=protos_dot_control__panel__pb2.Topology.SerializeToString,
+            ),
+            'WatchTopology': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchTopology,
+                    request_deserializer=protos_dot_control__panel__pb2.WatchTopologyRequest.FromString,
+                    response_serializer=protos_dot_control__panel__pb2.Topology.SerializeToString,
+            ),
+            'AddChain': grpc.unary_unary_rpc_method_handler(
+                    servicer.AddChain,
+                    request_deserializer=protos_dot_control__panel__pb2.AddChainRequest.FromString,
+                    response_serializer=protos_dot_control__panel__pb2.Chain.SerializeToString,
+            ),
+            'Rebalance': grpc.unary_unary_rpc_method_handler(
+                    servicer.Rebalance,
+                    request_deserializer=protos_dot_control__panel__pb2.RebalanceRequest.FromString,
+                    response_serializer=google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            ),
+            'Stats': grpc.unary_unary_rpc_method_handler(
+                    servicer.Stats,
+                    request_deserializer=google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+                    response_serializer=protos_dot_metrics__pb2.StatsResponse.SerializeToString,
+            ),
+            'AntiEntropy': grpc.unary_unary_rpc_method_handler(
+                    servicer.AntiEntropy,
+                    request_deserializer=protos_dot_control__panel__pb2.ChainRequest.FromString,
+                    response_serializer=protos_dot_control__panel__pb2.AntiEntropyResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'ControlPanel', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+
+
+ # This class is part of an EXPERIMENTAL API.
+class ControlPanel(object):
+    """Missing associated documentation comment in .proto file."""
+
+    @staticmethod
+    def AddProcess(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/AddProcess',
+            protos_dot_control__panel__pb2.NameIP.SerializeToString,
+            google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def CreateChain(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/CreateChain',
+            google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            protos_dot_control__panel__pb2.CreateChainResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def ListChain(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/ListChain',
+            google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            protos_dot_control__panel__pb2.ListChainResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Clear(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/Clear',
+            google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetHead(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/GetHead',
+            protos_dot_control__panel__pb2.ChainRequest.SerializeToString,
+            protos_dot_control__panel__pb2.NameIP.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def RemoveHead(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/RemoveHead',
+            protos_dot_control__panel__pb2.ChainRequest.SerializeToString,
+            google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def RestoreHead(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/RestoreHead',
+            protos_dot_control__panel__pb2.ChainRequest.SerializeToString,
+            google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def GetTopology(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/GetTopology',
+            google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            protos_dot_control__panel__pb2.Topology.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def WatchTopology(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(request, target, '/ControlPanel/WatchTopology',
+            protos_dot_control__panel__pb2.WatchTopologyRequest.SerializeToString,
+            protos_dot_control__panel__pb2.Topology.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def AddChain(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/AddChain',
+            protos_dot_control__panel__pb2.AddChainRequest.SerializeToString,
+            protos_dot_control__panel__pb2.Chain.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Rebalance(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/Rebalance',
+            protos_dot_control__panel__pb2.RebalanceRequest.SerializeToString,
+            google_dot_protobuf_dot_empty__pb2.Empty.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def Stats(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/Stats',
+            google_dot_protobuf_dot_empty__pb2.Empty.SerializeToString,
+            protos_dot_metrics__pb2.StatsResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
+
+    @staticmethod
+    def AntiEntropy(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(request, target, '/ControlPanel/AntiEntropy',
+            protos_dot_control__panel__pb2.ChainRequest.SerializeToString,
+            protos_dot_control__panel__pb2.AntiEntropyResponse.FromString,
+            options, channel_credentials,
+            insecure, call_credentials, compression, wait_for_ready, timeout, metadata)
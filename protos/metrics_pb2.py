@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: protos/metrics.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14protos/metrics.proto\"\xeb\x01\n\rStatsResponse\x12.\n\x08\x63ounters\x18\x01 \x03(\x0b\x32\x1c.StatsResponse.CountersEntry\x12*\n\x06gauges\x18\x02 \x03(\x0b\x32\x1a.StatsResponse.GaugesEntry\x12\x1e\n\nhistograms\x18\x03 \x03(\x0b\x32\n.Histogram\x1a/\n\rCountersEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\x1a-\n\x0bGaugesEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\"\xac\x01\n\tHistogram\x12\x0c\n\x04name\x18\x01 \x01(\t\x12&\n\x06labels\x18\x02 \x03(\x0b\x32\x16.Histogram.LabelsEntry\x12\x0e\n\x06\x62ounds\x18\x03 \x03(\x01\x12\x0e\n\x06\x63ounts\x18\x04 \x03(\x04\x12\x0b\n\x03sum\x18\x05 \x01(\x01\x12\r\n\x05\x63ount\x18\x06 \x01(\x04\x1a-\n\x0bLabelsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\x62\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'protos.metrics_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _STATSRESPONSE_COUNTERSENTRY._options = None
+  _STATSRESPONSE_COUNTERSENTRY._serialized_options = b'8\001'
+  _STATSRESPONSE_GAUGESENTRY._options = None
+  _STATSRESPONSE_GAUGESENTRY._serialized_options = b'8\001'
+  _HISTOGRAM_LABELSENTRY._options = None
+  _HISTOGRAM_LABELSENTRY._serialized_options = b'8\001'
+  _STATSRESPONSE._serialized_start=25
+  _STATSRESPONSE._serialized_end=260
+  _STATSRESPONSE_COUNTERSENTRY._serialized_start=166
+  _STATSRESPONSE_COUNTERSENTRY._serialized_end=213
+  _STATSRESPONSE_GAUGESENTRY._serialized_start=215
+  _STATSRESPONSE_GAUGESENTRY._serialized_end=260
+  _HISTOGRAM._serialized_start=263
+  _HISTOGRAM._serialized_end=435
+  _HISTOGRAM_LABELSENTRY._serialized_start=390
+  _HISTOGRAM_LABELSENTRY._serialized_end=435
+# @@protoc_insertion_point(module_scope)
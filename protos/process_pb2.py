@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# source: protos/process.proto
+"""Generated protocol buffer code."""
+from google.protobuf.internal import builder as _builder
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import symbol_database as _symbol_database
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+from google.protobuf import empty_pb2 as google_dot_protobuf_dot_empty__pb2
+from protos import metrics_pb2 as protos_dot_metrics__pb2
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x14protos/process.proto\x1a\x1bgoogle/protobuf/empty.proto\x1a\x14protos/metrics.proto\"\x80\x01\n\x11InitializeRequest\x12\x11\n\tprocessID\x18\x01 \x01(\t\x12\x15\n\rpredecessorIP\x18\x03 \x01(\t\x12\x13\n\x0bsuccessorIP\x18\x04 \x01(\t\x12\x0e\n\x06tailIP\x18\x05 \x01(\t\x12\x0e\n\x06headIP\x18\x06 \x01(\t\x12\x0c\n\x04role\x18\x07 \x01(\x05\"8\n\x17SetPredecessorIPRequest\x12\x11\n\tprocessID\x18\x01 \x01(\t\x12\n\n\x02ip\x18\x02 \x01(\t\"1\n\x10SetHeadIPRequest\x12\x11\n\tprocessID\x18\x01 \x01(\t\x12\n\n\x02ip\x18\x02 \x01(\t\"6\n\x15SetSuccessorIPRequest\x12\x11\n\tprocessID\x18\x01 \x01(\t\x12\n\n\x02ip\x18\x02 \x01(\t\"1\n\x10SetTailIPRequest\x12\x11\n\tprocessID\x18\x01 \x01(\t\x12\n\n\x02ip\x18\x02 \x01(\t\".\n\x0bProcessRole\x12\x11\n\tprocessID\x18\x01 \x01(\t\x12\x0c\n\x04role\x18\x02 \x01(\x05\".\n\x19NumericalDeviationRequest\x12\x11\n\tprocessID\x18\x01 \x01(\t\"b\n\x12NumericalDeviation\x12\x11\n\tprocessID\x18\x01 \x01(\t\x12\x11\n\tdeviation\x18\x02 \x01(\x05\x12\x10\n\x08last_seq\x18\x03 \x01(\x04\x12\x14\n\x0clog_position\x18\x04 \x01(\x04\"\xa8\x01\n\x10ReconcileRequest\x12\x17\n\x0fsourceProcessID\x18\x01 \x01(\t\x12\x17\n\x0ftargetProcessID\x18\x02 \x01(\t\x12\x10\n\x08targetIP\x18\x03 \x01(\t\x12\x15\n\x08\x66rom_seq\x18\x04 \x01(\x04H\x00\x88\x01\x01\x12\x1a\n\rfrom_position\x18\x05 \x01(\x04H\x01\x88\x01\x01\x42\x0b\n\t_from_seqB\x10\n\x0e_from_position\"M\n\x0fRawWriteRequest\x12\x11\n\tprocessID\x18\x01 \x01(\t\x12\x0b\n\x03key\x18\x02 \x01(\t\x12\r\n\x05value\x18\x03 \x01(\x02\x12\x0b\n\x03seq\x18\x04 \x01(\x04\"\x9f\x01\n\x0c\x43\x61tchUpChunk\x12\x1d\n\x06writes\x18\x01 \x03(\x0b\x32\r.WriteRequest\x12\x10\n\x08snapshot\x18\x02 \x01(\x08\x12\x10\n\x08last_seq\x18\x03 \x01(\x04\x12\x1c\n\x14num_write_operations\x18\x04 \x01(\x04\x12\x0c\n\x04keys\x18\x05 \x03(\t\x12\x0e\n\x06values\x18\x06 \x03(\x02\x12\x10\n\x08versions\x18\x07 \x03(\x04\"R\n\x0cWriteRequest\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02\x12\r\n\x05\x64\x65lay\x18\x03 \x01(\r\x12\x0b\n\x03seq\x18\x04 \x01(\x04\x12\n\n\x02id\x18\x05 \x01(\t\"g\n\x11WriteBatchRequest\x12\x1d\n\x06writes\x18\x01 \x03(\x0b\x32\r.WriteRequest\x12\r\n\x05\x64\x65lay\x18\x02 \x01(\r\x12\x11\n\tcoalesced\x18\x03 \x01(\r\x12\x11\n\tmigration\x18\x04 \x01(\x08\"\x1c\n\rCommitRequest\x12\x0b\n\x03seq\x18\x01 \x01(\x04\"\x1a\n\x0bReadRequest\x12\x0b\n\x03key\x18\x01 \x01(\t\".\n\x0cReadResponse\x12\r\n\x05value\x18\x01 \x01(\x02\x12\x0f\n\x07success\x18\x02 \x01(\x08\"\x1f\n\x0f\x42ulkReadRequest\x12\x0c\n\x04keys\x18\x01 \x03(\t\"3\n\x0fVersionResponse\x12\x0f\n\x07version\x18\x01 \x01(\x04\x12\x0f\n\x07success\x18\x02 \x01(\x08\"l\n\x0eStatusResponse\x12+\n\x06status\x18\x01 \x03(\x0b\x32\x1b.StatusResponse.StatusEntry\x1a-\n\x0bStatusEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\t:\x02\x38\x01\"]\n\x08\x42ookList\x12#\n\x05\x62ooks\x18\x01 \x03(\x0b\x32\x14.BookList.BooksEntry\x1a,\n\nBooksEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x02:\x02\x38\x01\"T\n\x10ListBooksRequest\x12\x11\n\tpage_size\x18\x01 \x01(\r\x12\x0e\n\x06\x63ursor\x18\x02 \x01(\t\x12\x0e\n\x06prefix\x18\x03 \x01(\t\x12\r\n\x05limit\x18\x04 \x01(\r\"#\n\x04\x42ook\x12\x0c\n\x04name\x18\x01 \x01(\t\x12\r\n\x05price\x18\x02 \x01(\x02\"5\n\x08\x42ookPage\x12\x14\n\x05\x62ooks\x18\x01 \x03(\x0b\x32\x05.Book\x12\x13\n\x0bnext_cursor\x18\x02 \x01(\t\"\"\n\rExportRequest\x12\x11\n\tpage_size\x18\x01 \x01(\r\">\n\x0b\x42ookColumns\x12\r\n\x05names\x18\x01 \x03(\t\x12\x0e\n\x06prices\x18\x02 \x03(\x02\x12\x10\n\x08last_seq\x18\x03 \x01(\x04\"Q\n\x0cShardRequest\x12\x11\n\tprocessID\x18\x01 \x01(\t\x12\r\n\x05\x63hain\x18\x02 \x01(\r\x12\x0f\n\x07weights\x18\x03 \x03(\r\x12\x0e\n\x06vnodes\x18\x04 \x01(\r\"#\n\x12MigrateKeysRequest\x12\r\n\x05heads\x18\x01 \x03(\t\"\x19\n\x08KeyCount\x12\r\n\x05\x63ount\x18\x01 \x01(\x04\"2\n\x12TreeDigestsRequest\x12\r\n\x05level\x18\x01 \x01(\r\x12\r\n\x05nodes\x18\x02 \x03(\r\"E\n\x13TreeDigestsResponse\x12\x0f\n\x07\x64igests\x18\x01 \x03(\x06\x12\x0e\n\x06\x66\x61nout\x18\x02 \x01(\r\x12\r\n\x05\x64\x65pth\x18\x03 \x01(\r\"$\n\x12LeafEntriesRequest\x12\x0e\n\x06leaves\x18\x01 \x03(\r\"f\n\x13LeafEntriesResponse\x12\x0c\n\x04keys\x18\x01 \x03(\t\x12\x0e\n\x06values\x18\x02 \x03(\x02\x12\x10\n\x08versions\x18\x03 \x03(\x04\x12\r\n\x05\x64irty\x18\x04 \x03(\x08\x12\x10\n\x08last_seq\x18\x05 \x01(\x04\"P\n\x11\x41ntiEntropyReport\x12\x18\n\x10\x64ivergent_leaves\x18\x01 \x01(\r\x12\x10\n\x08repaired\x18\x02 \x01(\r\x12\x0f\n\x07removed\x18\x03 \x01(\r2\xa0\r\n\x07Process\x12:\n\nInitialize\x12\x12.InitializeRequest\x1a\x16.google.protobuf.Empty\"\x00\x12\x39\n\x05\x43lear\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\"\x00\x12\x46\n\x10SetPredecessorIP\x12\x18.SetPredecessorIPRequest\x1a\x16.google.protobuf.Empty\"\x00\x12\x38\n\tSetHeadIP\x12\x11.SetHeadIPRequest\x1a\x16.google.protobuf.Empty\"\x00\x12\x42\n\x0eSetSuccessorIP\x12\x16.SetSuccessorIPRequest\x1a\x16.google.protobuf.Empty\"\x00\x12\x38\n\tSetTailIP\x12\x11.SetTailIPRequest\x1a\x16.google.protobuf.Empty\"\x00\x12=\n\tHeartbeat\x12\x16.google.protobuf.Empty\x1a\x16.google.protobuf.Empty\"\x00\x12\x31\n\x07SetRole\x12\x0c.ProcessRole\x1a\x16.google.protobuf.Empty\"\x00\x12J\n\x15GetNumericalDeviation\x12\x1a.NumericalDeviationRequest\x1a\x13.NumericalDeviation\"\x00\x12\x38\n\tReconcile\x12\x11.ReconcileRequest\x1a\x16.google.protobuf.Empty\"\x00\x12\x36\n\x08RawWrite\x12\x10.RawWriteRequest\x1a\x16.google.protobuf.Empty\"\x00\x12\x34\n\x07\x43\x61tchUp\x12\r.CatchUpChunk\x1a\x16.google.protobuf.Empty\"\x00(\x01\x12\x30\n\x05Write\x12\r.WriteRequest\x1a\x16.google.protobuf.Empty\"\x00\x12:\n\nWriteBatch\x12\x12.WriteBatchRequest\x1a\x16.google.protobuf.Empty\"\x00\x12;\n\tReplicate\x12\x12.WriteBatchRequest\x1a\x16.google.protobuf.Empty\"\x00(\x01\x12\x32\n\x06\x43ommit\x12\x0e.CommitRequest\x1a\x16.google.protobuf.Empty\"\x00\x12%\n\x04Read\x12\x0c.ReadRequest\x1a\r.ReadResponse\"\x00\x12\x30\n\x0cVersionQuery\x12\x0c.ReadRequest\x1a\x10.VersionResponse\"\x00\x12\x37\n\nDataStatus\x12\x16.google.protobuf.Empty\x1a\x0f.StatusResponse\"\x00\x12\x30\n\tListBooks\x12\x16.google.protobuf.Empty\x1a\t.BookList\"\x00\x12\x33\n\x0fListBooksStream\x12\x11.ListBooksRequest\x1a\t.BookPage\"\x00\x30\x01\x12)\n\x08\x42ulkRead\x12\x10.BulkReadRequest\x1a\t.BookList\"\x00\x12/\n\x0b\x45xportBooks\x12\x0e.ExportRequest\x1a\x0c.BookColumns\"\x00\x30\x01\x12\x33\n\x08SetShard\x12\r.ShardRequest\x1a\x16.google.protobuf.Empty\"\x00\x12/\n\x0bMigrateKeys\x12\x13.MigrateKeysRequest\x1a\t.KeyCount\"\x00\x12\x36\n\x0f\x44ropForeignKeys\x12\x16.google.protobuf.Empty\x1a\t.KeyCount\"\x00\x12\x31\n\x05Stats\x12\x16.google.protobuf.Empty\x1a\x0e.StatsResponse\"\x00\x12:\n\x0bTreeDigests\x12\x13.TreeDigestsRequest\x1a\x14.TreeDigestsResponse\"\x00\x12:\n\x0bLeafEntries\x12\x13.LeafEntriesRequest\x1a\x14.LeafEntriesResponse\"\x00\x12;\n\x0b\x41ntiEntropy\x12\x16.google.protobuf.Empty\x1a\x12.AntiEntropyReport\"\x00\x62\x06proto3')
+
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, globals())
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'protos.process_pb2', globals())
+if _descriptor._USE_C_DESCRIPTORS == False:
+
+  DESCRIPTOR._options = None
+  _STATUSRESPONSE_STATUSENTRY._options = None
+  _STATUSRESPONSE_STATUSENTRY._serialized_options = b'8\001'
+  _BOOKLIST_BOOKSENTRY._options = None
+  _BOOKLIST_BOOKSENTRY._serialized_options = b'8\001'
+  _INITIALIZEREQUEST._serialized_start=76
+  _INITIALIZEREQUEST._serialized_end=204
+  _SETPREDECESSORIPREQUEST._serialized_start=206
+  _SETPREDECESSORIPREQUEST._serialized_end=262
+  _SETHEADIPREQUEST._serialized_start=264
+  _SETHEADIPREQUEST._serialized_end=313
+  _SETSUCCESSORIPREQUEST._serialized_start=315
+  _SETSUCCESSORIPREQUEST._serialized_end=369
+  _SETTAILIPREQUEST._serialized_start=371
+  _SETTAILIPREQUEST._serialized_end=420
+  _PROCESSROLE._serialized_start=422
+  _PROCESSROLE._serialized_end=468
+  _NUMERICALDEVIATIONREQUEST._serialized_start=470
+  _NUMERICALDEVIATIONREQUEST._serialized_end=516
+  _NUMERICALDEVIATION._serialized_start=518
+  _NUMERICALDEVIATION._serialized_end=616
+  _RECONCILEREQUEST._serialized_start=619
+  _RECONCILEREQUEST._serialized_end=787
+  _RAWWRITEREQUEST._serialized_start=789
+  _RAWWRITEREQUEST._serialized_end=866
+  _CATCHUPCHUNK._serialized_start=869
+  _CATCHUPCHUNK._serialized_end=1028
+  _WRITEREQUEST._serialized_start=1030
+  _WRITEREQUEST._serialized_end=1112
+  _WRITEBATCHREQUEST._serialized_start=1114
+  _WRITEBATCHREQUEST._serialized_end=1217
+  _COMMITREQUEST._serialized_start=1219
+  _COMMITREQUEST._serialized_end=1247
+  _READREQUEST._serialized_start=1249
+  _READREQUEST._serialized_end=1275
+  _READRESPONSE._serialized_start=1277
+  _READRESPONSE._serialized_end=1323
+  _BULKREADREQUEST._serialized_start=1325
+  _BULKREADREQUEST._serialized_end=1356
+  _VERSIONRESPONSE._serialized_start=1358
+  _VERSIONRESPONSE._serialized_end=1409
+  _STATUSRESPONSE._serialized_start=1411
+  _STATUSRESPONSE._serialized_end=1519
+  _STATUSRESPONSE_STATUSENTRY._serialized_start=1474
+  _STATUSRESPONSE_STATUSENTRY._serialized_end=1519
+  _BOOKLIST._serialized_start=1521
+  _BOOKLIST._serialized_end=1614
+  _BOOKLIST_BOOKSENTRY._serialized_start=1570
+  _BOOKLIST_BOOKSENTRY._serialized_end=1614
+  _LISTBOOKSREQUEST._serialized_start=1616
+  _LISTBOOKSREQUEST._serialized_end=1700
+  _BOOK._serialized_start=1702
+  _BOOK._serialized_end=1737
+  _BOOKPAGE._serialized_start=1739
+  _BOOKPAGE._serialized_end=1792
+  _EXPORTREQUEST._serialized_start=1794
+  _EXPORTREQUEST._serialized_end=1828
+  _BOOKCOLUMNS._serialized_start=1830
+  _BOOKCOLUMNS._serialized_end=1892
+  _SHARDREQUEST._serialized_start=1894
+  _SHARDREQUEST._serialized_end=1975
+  _MIGRATEKEYSREQUEST._serialized_start=1977
+  _MIGRATEKEYSREQUEST._serialized_end=2012
+  _KEYCOUNT._serialized_start=2014
+  _KEYCOUNT._serialized_end=2039
+  _TREEDIGESTSREQUEST._serialized_start=2041
+  _TREEDIGESTSREQUEST._serialized_end=2091
+  _TREEDIGESTSRESPONSE._serialized_start=2093
+  _TREEDIGESTSRESPONSE._serialized_end=2162
+  _LEAFENTRIESREQUEST._serialized_start=2164
+  _LEAFENTRIESREQUEST._serialized_end=2200
+  _LEAFENTRIESRESPONSE._serialized_start=2202
+  _LEAFENTRIESRESPONSE._serialized_end=2304
+  _ANTIENTROPYREPORT._serialized_start=2306
+  _ANTIENTROPYREPORT._serialized_end=2386
+  _PROCESS._serialized_start=2389
+  _PROCESS._serialized_end=4085
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,69 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# Bounded LRU cache of the values the tail has returned for the dirty books of a non-tail replica, so repeated reads
+# of hot books that are written all the time do not all go to the tail.
+# An entry is served for lease seconds after it was filled, and only while the book has not committed a newer write
+# on this replica: entries remember the committed version of the local record when the tail was asked, and the
+# commit acks (pipelined mode) or the successor's return (sync mode) that move it past that version invalidate them.
+# A hit is therefore at most a lease and a round trip behind the tail
+class ReadCache:
+    def __init__(self, size, lease, metrics):
+        self.size = size
+        self.lease = lease
+        self.metrics = metrics
+        self.entries = OrderedDict()  # book name -> (value, local committed version, expiry), least recent first
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    # The cached value of the book, or None if it is missing, expired or older than the local committed version
+    def get(self, key, committed_version):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == committed_version and entry[2] > time.monotonic():
+                self.entries.move_to_end(key)
+                self.metrics.inc("read_cache_hits_total")
+                return entry[0]
+            if entry is not None:
+                del self.entries[key]
+            self.metrics.inc("read_cache_misses_total")
+            return None
+
+    # Splits the books, given as name -> local committed version, into the cached values and the names to ask for
+    def get_many(self, versions):
+        books, missing = {}, []
+        for key, committed_version in versions.items():
+            value = self.get(key, committed_version)
+            if value is None:
+                missing.append(key)
+            else:
+                books[key] = value
+        return books, missing
+
+    # Caches the values returned by the tail, with the local committed versions read before asking for them
+    def put_many(self, books, versions):
+        expiry = time.monotonic() + self.lease
+        with self.lock:
+            for key, value in books.items():
+                self.entries[key] = (value, versions[key], expiry)
+                self.entries.move_to_end(key)
+            evicted = len(self.entries) - self.size
+            for _ in range(evicted):
+                self.entries.popitem(last=False)
+        if evicted > 0:
+            self.metrics.inc("read_cache_evictions_total", evicted)
+
+    def put(self, key, value, committed_version):
+        self.put_many({key: value}, {key: committed_version})
+
+    def discard(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries = OrderedDict()
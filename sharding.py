@@ -0,0 +1,33 @@
+import bisect
+import hashlib
+
+DEFAULT_VNODES = 64
+
+
+# Position of a book name (or of a virtual node) on the ring: the first 8 bytes of its md5, so every client,
+# process and the control panel map a name to the same chain
+def key_hash(key):
+    return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+
+# Consistent hashing of book names over the chains of the store. Chain i owns weights[i] * vnodes points of
+# the ring and every name belongs to the chain of the first point after its hash. The points of a chain do not
+# depend on the other chains, so raising the weight of a chain or adding one only moves names to that chain,
+# and lowering a weight only moves names away from it
+class HashRing:
+    def __init__(self, weights, vnodes=DEFAULT_VNODES):
+        self.weights = list(weights)
+        self.vnodes = vnodes
+        points = sorted((key_hash(f"chain-{chain}-{i}"), chain)
+                        for chain, weight in enumerate(self.weights) for i in range(weight * vnodes))
+        if not points:
+            raise ValueError("At least one chain needs a positive weight")
+        self.tokens = [token for token, _ in points]
+        self.chains = [chain for _, chain in points]
+        # With a single chain owning the whole ring, names need not be hashed
+        self.only_chain = self.chains[0] if len(set(self.chains)) == 1 else None
+
+    def chain_for(self, key):
+        if self.only_chain is not None:
+            return self.only_chain
+        return self.chains[bisect.bisect(self.tokens, key_hash(key)) % len(self.tokens)]
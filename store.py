@@ -0,0 +1,344 @@
+import bisect
+import os
+import sys
+import threading
+from array import array
+from enum import Enum
+
+
+# Uncommitted writes of a book, version -> value, together with its committed state, which a clean book does not
+# keep apart from its latest value and version
+class PendingWrites(dict):
+    __slots__ = ('committed_value', 'committed_version')
+
+    def __init__(self, committed_value, committed_version):
+        super().__init__()
+        self.committed_value = committed_value
+        self.committed_version = committed_version
+
+    # Commits version and the older pending ones, as writes are committed in version order.
+    # Returns False once no write is pending anymore
+    def commit(self, version):
+        value = self.pop(version)
+        if version > self.committed_version:
+            self.committed_value = value
+            self.committed_version = version
+        for pending_version in [v for v in self if v < version]:
+            del self[pending_version]
+        return bool(self)
+
+
+# Per-key replica state. Versions are the sequence numbers assigned by the head, so a key stays dirty
+# until every write to it that this process has applied is committed by the tail
+class KeyRecord:
+    __slots__ = ('value', 'version', 'pending')
+
+    def __init__(self):
+        self.value = 0.0  # value of the latest applied version
+        self.version = 0
+        self.pending = None  # PendingWrites, None while the key is clean
+
+    @property
+    def committed_value(self):
+        return self.value if self.pending is None else self.pending.committed_value
+
+    @property
+    def committed_version(self):
+        return self.version if self.pending is None else self.pending.committed_version
+
+    @property
+    def dirty(self):
+        return self.pending is not None
+
+    @property
+    def status(self):
+        return 'clean' if self.pending is None else 'dirty'
+
+    def write(self, value, version):
+        if version < self.version:
+            return  # an older write replayed after a newer one
+        if self.pending is None:
+            self.pending = PendingWrites(self.value, self.version)
+        self.value = value
+        self.version = version
+        self.pending[version] = value
+
+    # A write is applied once: a replayed one with the current version is ignored like an older one
+    def write_committed(self, value, version):
+        if version <= self.version:
+            return
+        self.value = value
+        self.version = version
+        self.pending = None
+
+    def commit(self, version):
+        if self.pending is not None and version in self.pending and not self.pending.commit(version):
+            self.pending = None
+
+
+class StoreBackend(Enum):
+    DICT = 'dict'  # a KeyRecord per book
+    COMPACT = 'compact'  # prices and versions in typed arrays indexed by slot, records only for dirty books
+
+
+def new_store():
+    if StoreBackend(os.environ.get("STORE_BACKEND", StoreBackend.DICT.value)) == StoreBackend.COMPACT:
+        return CompactStore()
+    return DictStore()
+
+
+# Applies committed values one book at a time. Returns the names of the books that were not in the store
+def load_each(store, keys, values, versions):
+    added = []
+    for key, value, version in zip(keys, values, versions):
+        record = store.get(key)
+        if record is None:
+            record = store.create(key)
+            added.append(key)
+        record.write_committed(value, version)
+    return added
+
+
+# Book name -> KeyRecord
+class DictStore(dict):
+    def create(self, key):
+        record = self[key] = KeyRecord()
+        return record
+
+    def dirty_count(self):
+        return sum(1 for record in list(self.values()) if record.pending)
+
+    # Names, values and versions of the books, as the columns of a snapshot
+    def columns(self, keys):
+        records = list(map(self.__getitem__, keys))
+        return keys, [record.value for record in records], [record.version for record in records]
+
+    def load_columns(self, keys, values, versions):
+        return load_each(self, keys, values, versions)
+
+    # Returns the values of the books, and apart the dirty ones unless include_dirty
+    def local_values(self, keys, include_dirty):
+        books, dirty_keys = {}, []
+        for key in keys:
+            record = self[key]
+            if include_dirty or not record.pending:
+                books[key] = record.value
+            else:
+                dirty_keys.append(key)
+        return books, dirty_keys
+
+
+# Store for large catalogs: interned book names map to slots of a float32 array of values, which is the precision
+# of the price field of the protos, and of a parallel array of versions. A clean book costs its name, an index entry
+# and 12 bytes instead of a KeyRecord. Same interface as DictStore, records are views created on access
+class CompactStore:
+    def __init__(self):
+        self.index = {}  # book name -> slot
+        self.slot_values = array('f')
+        self.slot_versions = array('Q')
+        self.dirty = {}  # slot -> PendingWrites of the books with uncommitted writes
+        self.free = []  # slots of deleted books, reused by new ones
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def __getitem__(self, key):
+        return CompactRecord(self, self.index[key])
+
+    def get(self, key, default=None):
+        slot = self.index.get(key)
+        return default if slot is None else CompactRecord(self, slot)
+
+    def items(self):
+        return ((key, CompactRecord(self, slot)) for key, slot in self.index.items())
+
+    def values(self):
+        return (CompactRecord(self, slot) for slot in self.index.values())
+
+    def create(self, key):
+        if self.free:
+            slot = self.free.pop()
+            self.slot_values[slot] = 0.0
+            self.slot_versions[slot] = 0
+        else:
+            slot = len(self.slot_values)
+            self.slot_values.append(0.0)
+            self.slot_versions.append(0)
+        self.index[sys.intern(key)] = slot
+        return CompactRecord(self, slot)
+
+    def pop(self, key, default=None):
+        slot = self.index.pop(key, None)
+        if slot is None:
+            return default
+        self.dirty.pop(slot, None)
+        self.free.append(slot)
+        return CompactRecord(self, slot)
+
+    def dirty_count(self):
+        return len(self.dirty)
+
+    # Gathers the columns with C-level loops over the index and the arrays
+    def columns(self, keys):
+        slots = list(map(self.index.__getitem__, keys))
+        return (keys, array('f', map(self.slot_values.__getitem__, slots)),
+                array('Q', map(self.slot_versions.__getitem__, slots)))
+
+    # Books that are all new, e.g. a snapshot loaded into an empty store, are appended to the arrays in bulk
+    def load_columns(self, keys, values, versions):
+        if self.free or any(map(self.index.__contains__, keys)):
+            return load_each(self, keys, values, versions)
+        start = len(self.slot_values)
+        keys = list(map(sys.intern, keys))
+        self.index.update(zip(keys, range(start, start + len(keys))))
+        self.slot_values.extend(values)
+        self.slot_versions.extend(versions)
+        return keys
+
+    def local_values(self, keys, include_dirty):
+        if include_dirty or not self.dirty:
+            slots = map(self.index.__getitem__, keys)
+            return dict(zip(keys, map(self.slot_values.__getitem__, slots))), []
+        books, dirty_keys = {}, []
+        for key in keys:
+            slot = self.index[key]
+            if slot in self.dirty:
+                dirty_keys.append(key)
+            else:
+                books[key] = self.slot_values[slot]
+        return books, dirty_keys
+
+
+# KeyRecord interface over a slot of a CompactStore
+class CompactRecord:
+    __slots__ = ('store', 'slot')
+
+    def __init__(self, store, slot):
+        self.store = store
+        self.slot = slot
+
+    @property
+    def value(self):
+        return self.store.slot_values[self.slot]
+
+    @property
+    def version(self):
+        return self.store.slot_versions[self.slot]
+
+    @property
+    def pending(self):
+        return self.store.dirty.get(self.slot)
+
+    @property
+    def committed_value(self):
+        state = self.store.dirty.get(self.slot)
+        return self.store.slot_values[self.slot] if state is None else state.committed_value
+
+    @property
+    def committed_version(self):
+        state = self.store.dirty.get(self.slot)
+        return self.store.slot_versions[self.slot] if state is None else state.committed_version
+
+    @property
+    def dirty(self):
+        return self.slot in self.store.dirty
+
+    @property
+    def status(self):
+        return 'dirty' if self.slot in self.store.dirty else 'clean'
+
+    def write(self, value, version):
+        store, slot = self.store, self.slot
+        if version < store.slot_versions[slot]:
+            return
+        state = store.dirty.get(slot)
+        if state is None:
+            state = store.dirty[slot] = PendingWrites(store.slot_values[slot], store.slot_versions[slot])
+        store.slot_values[slot] = value
+        store.slot_versions[slot] = version
+        state[version] = store.slot_values[slot]
+
+    def write_committed(self, value, version):
+        store, slot = self.store, self.slot
+        if version <= store.slot_versions[slot]:
+            return
+        store.slot_values[slot] = value
+        store.slot_versions[slot] = version
+        store.dirty.pop(slot, None)
+
+    def commit(self, version):
+        store, slot = self.store, self.slot
+        state = store.dirty.get(slot)
+        if state is not None and version in state and not state.commit(version):
+            del store.dirty[slot]
+
+
+# Keys in sorted order, maintained incrementally as keys are created,
+# so pages and prefix scans cost O(log n + page size) instead of a scan of the whole db.
+# New keys wait in an unsorted buffer until the next read: inserting them one by one moves half the list per key,
+# which dominates bulk writes to a large catalog, while merging a buffer is a single sort of two sorted runs.
+# Reads may come from other threads than the writes, so the buffer and the list are changed under a lock
+class SortedKeyIndex:
+    MERGE_THRESHOLD = 32  # buffers up to this size are inserted key by key, larger ones sorted in
+
+    def __init__(self):
+        self.keys = []
+        self.pending = []  # keys added since the last read, not in keys yet
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.keys) + len(self.pending)
+
+    # The key must not be in the index already, as for the keys of records just created
+    def add(self, key):
+        with self.lock:
+            self.pending.append(key)
+
+    # Appends keys given in sorted order that all come after the current ones, e.g. a snapshot streamed in name
+    # order into an empty index, and buffers them otherwise
+    def add_many(self, keys):
+        with self.lock:
+            if (keys and not self.pending and (not self.keys or keys[0] > self.keys[-1])
+                    and all(map(str.__lt__, keys, keys[1:]))):
+                self.keys.extend(keys)
+            else:
+                self.pending.extend(keys)
+
+    def flush(self):
+        if len(self.pending) <= self.MERGE_THRESHOLD:
+            for key in self.pending:
+                bisect.insort(self.keys, key)
+        else:
+            self.keys.extend(self.pending)
+            self.keys.sort()
+        self.pending = []
+
+    def remove(self, key):
+        with self.lock:
+            self.flush()
+            i = bisect.bisect_left(self.keys, key)
+            if i < len(self.keys) and self.keys[i] == key:
+                del self.keys[i]
+
+    # Copy of every key in sorted order
+    def snapshot(self):
+        with self.lock:
+            self.flush()
+            return list(self.keys)
+
+    # Returns up to limit keys greater than cursor that start with prefix
+    def page(self, cursor='', prefix='', limit=100):
+        with self.lock:
+            if self.pending:
+                self.flush()
+            start = max(bisect.bisect_right(self.keys, cursor), bisect.bisect_left(self.keys, prefix))
+            page = self.keys[start:start + limit]
+        if prefix and page and not page[-1].startswith(prefix):
+            page = [key for key in page if key.startswith(prefix)]
+        return page